@@ -0,0 +1,4 @@
+"""Offline benchmark suite for plan generation, validation, serialization and the API.
+
+Run ``python -m benchmarks --help`` from the repository root.
+"""
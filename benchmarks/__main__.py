@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.runner import compare, format_results, load_document, run_suite
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the bp-gen benchmark suite")
+    parser.add_argument(
+        "--sizes",
+        default="1,1000,10000",
+        help="Comma-separated KPI counts for synthetic plans (up to 1000000)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repeats per stage")
+    parser.add_argument("--stages", default=None, help="Comma-separated stage names to run")
+    parser.add_argument("--skip-api", action="store_true", help="Skip the in-process API stage")
+    parser.add_argument("--output", default=None, help="Write results JSON to this path")
+    parser.add_argument("--baseline", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed slowdown or memory growth before failing (0.1 = 10%%)",
+    )
+    args = parser.parse_args()
+
+    document = run_suite(
+        sizes=[int(size) for size in args.sizes.split(",") if size],
+        repeat=args.repeat,
+        include_api=not args.skip_api,
+        stages=args.stages.split(",") if args.stages else None,
+    )
+    print(format_results(document), file=sys.stderr)
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(document, indent=2))
+
+    if args.baseline:
+        regressions = compare(document, load_document(args.baseline), args.threshold)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['benchmark']} {regression['metric']}: "
+                f"{regression['baseline']:.6g} -> {regression['current']:.6g} "
+                f"({regression['ratio']:.2f}x)",
+                file=sys.stderr,
+            )
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
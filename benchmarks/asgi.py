@@ -0,0 +1,85 @@
+"""Minimal in-process ASGI driver so API benchmarks need no network or HTTP client."""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class ASGIResponse:
+    def __init__(
+        self,
+        status: int,
+        headers: List[Tuple[bytes, bytes]],
+        body: bytes,
+        first_byte_seconds: Optional[float] = None,
+    ) -> None:
+        self.status = status
+        self.headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in headers}
+        self.body = body
+        # Time from sending the request to the first non-empty body chunk.
+        self.first_byte_seconds = first_byte_seconds
+
+
+async def asgi_request(
+    app,
+    method: str,
+    path: str,
+    body: bytes = b"",
+    headers: Optional[Dict[str, str]] = None,
+    query_string: bytes = b"",
+) -> ASGIResponse:
+    """Send one HTTP request through ``app`` and collect the full response."""
+    raw_headers: Sequence[Tuple[bytes, bytes]] = [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in {"content-type": "application/json", **(headers or {})}.items()
+    ]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "query_string": query_string,
+        "root_path": "",
+        "headers": list(raw_headers) + [(b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    request_sent = False
+    status = 0
+    response_headers: List[Tuple[bytes, bytes]] = []
+    chunks: List[bytes] = []
+    first_byte_at: Optional[float] = None
+    started = time.perf_counter()
+
+    response_complete = asyncio.Event()
+
+    async def receive() -> Dict[str, object]:
+        nonlocal request_sent
+        if request_sent:
+            # Like a real client, stay connected until the response is read;
+            # streaming responses stop early once they see a disconnect.
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, object]) -> None:
+        nonlocal status, response_headers, first_byte_at
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = list(message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if chunk and first_byte_at is None:
+                first_byte_at = time.perf_counter()
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+    first_byte_seconds = None if first_byte_at is None else first_byte_at - started
+    return ASGIResponse(status, response_headers, b"".join(chunks), first_byte_seconds)
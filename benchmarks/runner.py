@@ -0,0 +1,353 @@
+"""Timing, peak-memory measurement and baseline comparison for the benchmark suite."""
+from __future__ import annotations
+
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from benchmarks.asgi import asgi_request
+from benchmarks.synthetic import (
+    ALL_FLAGS,
+    example_request,
+    sized_request,
+    synthetic_plan,
+    synthetic_plan_dict,
+)
+from bp_gen.parallel_validator import PARALLEL_MIN_ITEMS, validate_business_plan_parallel
+from bp_gen.schemas import BusinessPlan
+from bp_gen.serialization import dump_result, iter_result_json
+from bp_gen.services.plan_generator import MAX_PLAN_KPIS, generate_plan
+from bp_gen.validator import validate_business_plan
+
+Result = Dict[str, object]
+
+# Metrics compared against a baseline; each is only compared when both runs have it.
+METRICS = ("seconds_min", "peak_bytes", "ttfb_seconds", "peak_rss_bytes", "retained_bytes")
+
+# Retention stages hold at most this many plans, and at most this many KPIs
+# across them.
+_MAX_RETAINED_PLANS = 100
+_MAX_RETAINED_KPIS = 100_000
+
+# Worker counts for the parallel validation stages, which only run on plans
+# large enough to take the parallel path.
+PARALLEL_WORKERS = (2, 4, 8)
+_PARALLEL_STAGE = "validate_parallel_"
+
+# Target wall time for one repeat of a stage; cheap stages are looped until
+# they take roughly this long so timer resolution does not dominate.
+_TARGET_REPEAT_SECONDS = 0.05
+
+
+def _calibrate(fn: Callable[[], object]) -> int:
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    if elapsed <= 0:
+        return 1000
+    return max(1, min(1000, int(_TARGET_REPEAT_SECONDS / elapsed)))
+
+
+def _peak_bytes(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _current_rss() -> int:
+    with open("/proc/self/statm") as handle:
+        return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _peak_rss_bytes(fn: Callable[[], object]) -> Optional[int]:
+    """Growth of peak resident memory while ``fn`` runs in a forked child.
+
+    Unlike traced allocations this includes interpreter and allocator
+    overhead. The child starts from this process's memory, so only the
+    growth is reported. ``None`` where ``fork`` or ``/proc`` is unavailable.
+    """
+    if not hasattr(os, "fork") or not os.path.exists("/proc/self/statm"):
+        return None
+    import resource
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(read_fd)
+            baseline = _current_rss()
+            fn()
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            os.write(write_fd, str(max(0, peak - baseline)).encode())
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as reader:
+        data = reader.read()
+    os.waitpid(pid, 0)
+    return int(data) if data else None
+
+
+def measure(name: str, size: int, fn: Callable[[], object], repeat: int) -> Result:
+    """Time ``fn`` and record its peak traced allocation and peak RSS growth.
+
+    Memory is measured in separate calls because tracing slows execution.
+    """
+    number = _calibrate(fn)
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) / number)
+    return {
+        "name": name,
+        "size": size,
+        "seconds_min": min(timings),
+        "seconds_mean": statistics.fmean(timings),
+        "peak_bytes": _peak_bytes(fn),
+        "peak_rss_bytes": _peak_rss_bytes(fn),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def measure_stream(
+    name: str,
+    size: int,
+    fn: Callable[[], Iterator[bytes]],
+    repeat: int,
+) -> Result:
+    """Like :func:`measure` for a chunk stream, adding time to its first chunk."""
+
+    def drain() -> None:
+        for _ in fn():
+            pass
+
+    result = measure(name, size, drain, repeat)
+    first_chunks: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = fn()
+        next(chunks, None)
+        first_chunks.append(time.perf_counter() - started)
+        for _ in chunks:
+            pass
+    result["ttfb_seconds"] = min(first_chunks)
+    return result
+
+
+def measure_retained(
+    name: str,
+    size: int,
+    fn: Callable[[], Sequence[object]],
+    repeat: int,
+) -> Result:
+    """Like :func:`measure` for a stage returning many results, adding the
+    traced memory still held per result once they are all built."""
+    result = measure(name, size, fn, repeat)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        held = fn()
+        result["retained_bytes"] = tracemalloc.get_traced_memory()[0] / len(held)
+    finally:
+        tracemalloc.stop()
+    return result
+
+
+class _NullSink:
+    """Binary file object that discards writes, standing in for a socket."""
+
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+
+def plan_stages(size: int) -> Dict[str, Callable[[], object]]:
+    raw = synthetic_plan_dict(size)
+    plan = synthetic_plan(size)
+    stages: Dict[str, Callable[[], object]] = {
+        "parse": lambda: BusinessPlan.model_validate(raw),
+        "validate": lambda: validate_business_plan(plan, ALL_FLAGS),
+        "model_dump": lambda: plan.model_dump(exclude_none=True),
+        "model_dump_json": lambda: plan.model_dump_json(exclude_none=True),
+        # What the CLI used to do before writing a plan file.
+        "json_dumps_indent": lambda: json.dumps(plan.model_dump(exclude_none=True), indent=2),
+        "stream_write_indent": lambda: dump_result(plan, _NullSink(), indent=2),
+    }
+    if len(plan.kpis) + len(plan.links) >= PARALLEL_MIN_ITEMS:
+        for workers in PARALLEL_WORKERS:
+            stages[f"{_PARALLEL_STAGE}{workers}"] = partial(
+                validate_business_plan_parallel, plan, ALL_FLAGS, workers=workers
+            )
+    if size <= MAX_PLAN_KPIS:
+        request = sized_request(size)
+        stages["generate_plan_sized"] = lambda: generate_plan(request)
+    return stages
+
+
+def stream_stages(size: int) -> Dict[str, Callable[[], Iterator[bytes]]]:
+    plan = synthetic_plan(size)
+    return {
+        "stream_json": lambda: iter_result_json(plan),
+    }
+
+
+def retention_stages(size: int) -> Dict[str, Callable[[], Sequence[object]]]:
+    if size > MAX_PLAN_KPIS:
+        return {}
+    request = sized_request(size)
+    count = max(1, min(_MAX_RETAINED_PLANS, _MAX_RETAINED_KPIS // size))
+    return {
+        # Generated plans held at once, as by a caller collecting results.
+        "retain_plans": lambda: [generate_plan(request) for _ in range(count)],
+    }
+
+
+def generation_stages() -> Dict[str, Callable[[], object]]:
+    from bp_gen.api import app
+
+    request = example_request()
+    body = request.model_dump_json().encode("utf-8")
+    headers = {"cache-control": "no-cache"}
+
+    def api_call(query_string: bytes = b"") -> float:
+        response = asyncio.run(
+            asgi_request(app, "POST", "/generate-plan", body, headers, query_string)
+        )
+        if response.status != 200:
+            raise RuntimeError(f"/generate-plan returned {response.status}")
+        return response.first_byte_seconds
+
+    return {
+        "generate_plan": lambda: generate_plan(request),
+        "api_generate_plan": api_call,
+        "api_generate_plan_stream": lambda: api_call(b"stream=true"),
+    }
+
+
+def _with_api_ttfb(result: Result, fn: Callable[[], float], repeat: int) -> Result:
+    result["ttfb_seconds"] = min(fn() for _ in range(repeat))
+    return result
+
+
+def run_suite(
+    sizes: Sequence[int],
+    repeat: int = 5,
+    include_api: bool = True,
+    stages: Optional[Iterable[str]] = None,
+) -> Dict[str, object]:
+    """Run every stage and return a machine-readable result document."""
+    selected = set(stages) if stages is not None else None
+    results: List[Result] = []
+
+    for name, fn in generation_stages().items():
+        if name.startswith("api_") and not include_api:
+            continue
+        if selected is None or name in selected:
+            result = measure(name, 1, fn, repeat)
+            if name.startswith("api_"):
+                result = _with_api_ttfb(result, fn, repeat)
+            results.append(result)
+
+    for size in sizes:
+        for name, fn in plan_stages(size).items():
+            if selected is None or name in selected:
+                results.append(measure(name, size, fn, repeat))
+        for name, stream_fn in stream_stages(size).items():
+            if selected is None or name in selected:
+                results.append(measure_stream(name, size, stream_fn, repeat))
+        for name, retain_fn in retention_stages(size).items():
+            if selected is None or name in selected:
+                results.append(measure_retained(name, size, retain_fn, repeat))
+
+    _add_speedups(results)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+
+
+def _add_speedups(results: List[Result]) -> None:
+    """Record each parallel validation stage's speedup over serial ``validate``."""
+    serial = {result["size"]: result for result in results if result["name"] == "validate"}
+    for result in results:
+        baseline = serial.get(result["size"])
+        if result["name"].startswith(_PARALLEL_STAGE) and baseline is not None:
+            result["speedup"] = baseline["seconds_min"] / result["seconds_min"]
+
+
+def _key(result: Result) -> str:
+    return f"{result['name']}[{result['size']}]"
+
+
+def compare(
+    current: Dict[str, object],
+    baseline: Dict[str, object],
+    threshold: float,
+) -> List[Dict[str, object]]:
+    """Return metrics that regressed by more than ``threshold`` (e.g. ``0.1`` = 10%)."""
+    previous = {_key(result): result for result in baseline["results"]}
+    regressions: List[Dict[str, object]] = []
+    for result in current["results"]:
+        before = previous.get(_key(result))
+        if before is None:
+            continue
+        for metric in METRICS:
+            if not before.get(metric) or result.get(metric) is None:
+                continue
+            ratio = result[metric] / before[metric]
+            if ratio > 1 + threshold:
+                regressions.append(
+                    {
+                        "benchmark": _key(result),
+                        "metric": metric,
+                        "baseline": before[metric],
+                        "current": result[metric],
+                        "ratio": ratio,
+                    }
+                )
+    return regressions
+
+
+def format_results(document: Dict[str, object]) -> str:
+    lines = [
+        f"{'benchmark':<32} {'min':>12} {'mean':>12} {'ttfb':>12} {'peak':>12} "
+        f"{'peak rss':>12} {'retained':>12} {'speedup':>8}"
+    ]
+    for result in document["results"]:
+        ttfb = result.get("ttfb_seconds")
+        rss = result.get("peak_rss_bytes")
+        retained = result.get("retained_bytes")
+        speedup = result.get("speedup")
+        lines.append(
+            f"{_key(result):<32} "
+            f"{result['seconds_min'] * 1e3:>10.3f}ms "
+            f"{result['seconds_mean'] * 1e3:>10.3f}ms "
+            + (f"{ttfb * 1e3:>10.3f}ms " if ttfb is not None else f"{'-':>12} ")
+            + f"{result['peak_bytes'] / 1024:>9.1f}KiB "
+            + (f"{rss / 1024:>9.1f}KiB " if rss is not None else f"{'-':>12} ")
+            + (f"{retained / 1024:>9.1f}KiB " if retained is not None else f"{'-':>12} ")
+            + (f"{speedup:>7.2f}x" if speedup is not None else f"{'-':>8}")
+        )
+    return "\n".join(lines)
+
+
+def load_document(path: str) -> Dict[str, object]:
+    with open(path) as handle:
+        return json.load(handle)
@@ -0,0 +1,121 @@
+"""Synthetic plans shaped like ``samples/golden_plan.json`` at configurable sizes."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from bp_gen.schemas import BusinessPlan, GeneratePlanRequest, GenerationFlags
+from bp_gen.services.plan_generator import MAX_OBJECTIVES
+
+SAMPLES = Path(__file__).resolve().parent.parent / "samples"
+
+ALL_FLAGS = GenerationFlags(
+    include_initiatives=True,
+    include_capabilities=True,
+    include_outputs=True,
+)
+
+
+def example_request() -> GeneratePlanRequest:
+    payload = json.loads((SAMPLES / "example_input.json").read_text())
+    return GeneratePlanRequest.model_validate(payload)
+
+
+def sized_request(kpi_count: int) -> GeneratePlanRequest:
+    """The example request with ``generation_controls`` asking for about ``kpi_count`` KPIs."""
+    kpis_per_objective = max(2, -(-kpi_count // MAX_OBJECTIVES))
+    request = example_request()
+    request.generation_controls = {
+        "max_objectives": str(max(1, -(-kpi_count // kpis_per_objective))),
+        "max_kpis_per_objective": str(kpis_per_objective),
+    }
+    return request
+
+
+def synthetic_plan_dict(kpi_count: int, kpis_per_objective: int = 2) -> Dict[str, object]:
+    """Build a raw plan with ``kpi_count`` KPIs.
+
+    Every objective gets ``kpis_per_objective`` KPIs plus one initiative,
+    capability and output, linked the same way as the golden plan, so the
+    link count grows with the KPI count.
+    """
+    objective_count = max(1, -(-kpi_count // kpis_per_objective))
+    objectives: List[Dict[str, object]] = []
+    kpis: List[Dict[str, object]] = []
+    initiatives: List[Dict[str, object]] = []
+    capabilities: List[Dict[str, object]] = []
+    outputs: List[Dict[str, object]] = []
+    links: List[Dict[str, object]] = []
+
+    def link(from_type: str, from_id: str, to_type: str, to_id: str, link_type: str) -> None:
+        links.append(
+            {
+                "from_type": from_type,
+                "from_id": from_id,
+                "to_type": to_type,
+                "to_id": to_id,
+                "type": link_type,
+            }
+        )
+
+    for obj_index in range(objective_count):
+        objective_id = f"obj-{obj_index + 1}"
+        objectives.append(
+            {
+                "id": objective_id,
+                "title": f"Objective {obj_index + 1}",
+                "rationale": "Synthetic objective for benchmarking.",
+                "owner_role": None,
+                "priority": "high" if obj_index == 0 else "medium",
+            }
+        )
+        for kpi_index in range(kpis_per_objective):
+            if len(kpis) == kpi_count:
+                break
+            kpi_id = f"kpi-{obj_index + 1}-{kpi_index + 1}"
+            kpis.append(
+                {
+                    "id": kpi_id,
+                    "objective_id": objective_id,
+                    "name": f"KPI {obj_index + 1}.{kpi_index + 1}",
+                    "definition": "Synthetic KPI for benchmarking.",
+                    "formula": None,
+                    "baseline": None,
+                    "target": "Reduce by 15%",
+                    "frequency": "monthly",
+                    "data_source": None,
+                    "leading_or_lagging": "lagging" if kpi_index == 0 else "leading",
+                }
+            )
+            link("objective", objective_id, "kpi", kpi_id, "objective_to_kpi")
+
+        initiative_id = f"init-{obj_index + 1}"
+        capability_id = f"cap-{obj_index + 1}"
+        output_id = f"out-{obj_index + 1}"
+        initiatives.append({"id": initiative_id, "name": "Initiative", "description": None})
+        capabilities.append({"id": capability_id, "name": "Capability", "description": None})
+        outputs.append({"id": output_id, "name": "Output", "description": None})
+        link("objective", objective_id, "initiative", initiative_id, "objective_to_initiative")
+        link("initiative", initiative_id, "capability", capability_id, "initiative_to_capability")
+        link("initiative", initiative_id, "output", output_id, "initiative_to_output")
+
+    return {
+        "plan": {
+            "name": "Synthetic Plan",
+            "horizon": "12 months",
+            "scope": "Benchmark",
+            "themes": ["Synthetic"],
+        },
+        "objectives": objectives,
+        "kpis": kpis,
+        "initiatives": initiatives,
+        "capabilities": capabilities,
+        "outputs": outputs,
+        "links": links,
+        "assumptions_and_gaps": [],
+    }
+
+
+def synthetic_plan(kpi_count: int, kpis_per_objective: int = 2) -> BusinessPlan:
+    return BusinessPlan.model_validate(synthetic_plan_dict(kpi_count, kpis_per_objective))
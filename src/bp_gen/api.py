@@ -1,16 +1,278 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from itertools import chain, count
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from bp_gen.deadlines import (
+    DeadlineExceeded,
+    check_deadline,
+    deadline_epoch,
+    deadline_scope,
+    deadline_scope_until,
+)
+from bp_gen.http_caching import (
+    ENCODING_GZIP,
+    GZIP_MIN_BYTES,
+    ConditionalStats,
+    accepts_gzip,
+    gzip_body,
+    gzip_chunks,
+    matching_etag,
+    result_etag,
+)
+from bp_gen.instrumentation import StageTimings, activate, stage, timings_enabled
+from bp_gen.metrics import (
+    ADMISSION_WAIT_SECONDS,
+    REGISTRY,
+    REQUEST_SECONDS,
+    RESPONSE_BYTES,
+    STAGE_SECONDS,
+    gauge_lines,
+)
 
 from bp_gen.schemas import (
     BusinessPlan,
     ClarifyingQuestions,
     GeneratePlanRequest,
     GenerationErrorResponse,
+    GenerationFlags,
+)
+from bp_gen.serialization import iter_result_json, result_json, result_record_line
+from bp_gen.services.admission import AdmissionRejected, admission_from_env
+from bp_gen.services.batch import invalid_request_result
+from bp_gen.services.cache import (
+    PlanResult,
+    generate_plan_cached,
+    get_default_cache,
+    request_key,
+)
+from bp_gen.services.coalescing import AsyncSingleFlight
+from bp_gen.services.executor import get_executor, shutdown_executor
+from bp_gen.services.plan_generator import STATUS_PLAN, result_status
+from bp_gen.services.plan_store import PlanFilter, PlanStore, get_plan_store
+from bp_gen.services.plan_validation import validate_plan_text, validate_plans
+
+# Upper bound on the number of requests accepted by a single bulk call.
+MAX_BATCH_SIZE = 1000
+
+_T = TypeVar("_T")
+
+
+class ServerTimingMiddleware:
+    """Report stage timings in a ``Server-Timing`` header and in ``/metrics``.
+
+    Handlers opt in by tagging the request's ``StageTimings`` with a result
+    kind. When timing is disabled requests pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not timings_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        timings = StageTimings()
+        scope.setdefault("state", {})["timings"] = timings
+
+        async def send_with_timings(message: Message) -> None:
+            if message["type"] == "http.response.start" and timings.kind is not None:
+                now = time.perf_counter()
+                if timings.finished is not None:
+                    timings.record("respond", now - timings.finished)
+                for name, seconds in timings.stages:
+                    STAGE_SECONDS.observe(seconds, name, timings.kind)
+                total = now - timings.started
+                REQUEST_SECONDS.observe(total, timings.kind)
+                timings.record("total", total)
+                MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        await self.app(scope, receive, send_with_timings)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # Build (and, for the process backend, warm) the executor before serving.
+    get_executor()
+    yield
+    shutdown_executor()
+
+
+app = FastAPI(title="Business Case Generator Agent", lifespan=lifespan)
+app.add_middleware(ServerTimingMiddleware)
+
+
+def _cache_metrics() -> List[str]:
+    stats = get_default_cache().stats()
+    return gauge_lines(
+        "bp_gen_cache_events_total",
+        "Result cache events by kind.",
+        (({"event": event}, value) for event, value in stats.items() if event != "entries"),
+        metric_type="counter",
+    ) + gauge_lines(
+        "bp_gen_cache_entries",
+        "Entries held in the in-memory result cache.",
+        [({}, stats["entries"])],
+    )
+
+
+REGISTRY.register_collector(_cache_metrics)
+
+# Identical concurrent /generate-plan requests share one computation of the
+# ``(status, body)`` pair; bytes are immutable, so waiters can share them.
+# A leader shed by admission or out of time fails alone; its waiters retry.
+_in_flight: AsyncSingleFlight[Tuple[str, bytes]] = AsyncSingleFlight(
+    retry_on=(DeadlineExceeded, AdmissionRejected)
+)
+
+
+def _coalescing_metrics() -> List[str]:
+    stats = _in_flight.stats()
+    return (
+        gauge_lines(
+            "bp_gen_coalescing_total",
+            "/generate-plan computations run and requests that joined one in flight.",
+            [
+                ({"role": "leader"}, stats["executions"]),
+                ({"role": "waiter"}, stats["coalesced"]),
+            ],
+            metric_type="counter",
+        )
+        + gauge_lines(
+            "bp_gen_coalescing_in_flight",
+            "Distinct /generate-plan computations currently running.",
+            [({}, stats["in_flight"])],
+        )
+        + gauge_lines(
+            "bp_gen_coalescing_waiters",
+            "Requests currently waiting on an identical in-flight computation.",
+            [({}, stats["waiting"])],
+        )
+        + gauge_lines(
+            "bp_gen_coalescing_ratio",
+            "Share of /generate-plan requests served by joining an in-flight computation.",
+            [({}, stats["coalescing_ratio"])],
+        )
+    )
+
+
+REGISTRY.register_collector(_coalescing_metrics)
+
+
+def _executor_metrics() -> List[str]:
+    stats = get_executor().stats()
+    labels = {"backend": stats["backend"]}
+    return (
+        gauge_lines(
+            "bp_gen_executor_workers",
+            "Generation workers available to the configured backend.",
+            [(labels, stats["workers"])],
+        )
+        + gauge_lines(
+            "bp_gen_executor_in_flight",
+            "Generation requests submitted to the executor and not yet finished.",
+            [(labels, stats["in_flight"])],
+        )
+        + gauge_lines(
+            "bp_gen_executor_queue_depth",
+            "Generation requests waiting for a free worker.",
+            [(labels, stats["queue_depth"])],
+        )
+        + gauge_lines(
+            "bp_gen_executor_utilization",
+            "Share of workers currently busy.",
+            [(labels, stats["utilization"])],
+        )
+        + gauge_lines(
+            "bp_gen_executor_busy_seconds_total",
+            "Worker time spent generating plans.",
+            [(labels, stats["busy_seconds"])],
+            metric_type="counter",
+        )
+    )
+
+
+REGISTRY.register_collector(_executor_metrics)
+
+# Bounds concurrent generation and validation requests; see
+# bp_gen.services.admission.
+_admission = admission_from_env(
+    int(os.environ.get("BP_GEN_EXECUTOR_WORKERS", "") or os.cpu_count() or 1)
 )
-from bp_gen.services.plan_generator import generate_plan
 
-app = FastAPI(title="Business Case Generator Agent")
+
+def _admission_metrics() -> List[str]:
+    stats = _admission.stats()
+    return (
+        gauge_lines(
+            "bp_gen_admission_active",
+            "Generation and validation requests currently admitted.",
+            [({}, stats["active"])],
+        )
+        + gauge_lines(
+            "bp_gen_admission_queue_length",
+            "Generation and validation requests waiting for admission.",
+            [({}, stats["queued"])],
+        )
+        + gauge_lines(
+            "bp_gen_admission_shed_total",
+            "Generation and validation requests rejected or abandoned, by reason.",
+            (({"reason": reason}, count) for reason, count in stats["shed"].items()),
+            metric_type="counter",
+        )
+    )
+
+
+REGISTRY.register_collector(_admission_metrics)
+
+
+_conditional = ConditionalStats()
+
+
+def _conditional_metrics() -> List[str]:
+    stats = _conditional.stats()
+    return gauge_lines(
+        "bp_gen_generate_responses_total",
+        "/generate-plan responses, and those answered 304 Not Modified.",
+        [
+            ({"status": "full"}, stats["responses"] - stats["not_modified"]),
+            ({"status": "not_modified"}, stats["not_modified"]),
+        ],
+        metric_type="counter",
+    ) + gauge_lines(
+        "bp_gen_not_modified_ratio",
+        "Share of /generate-plan responses answered 304 Not Modified.",
+        [({}, stats["not_modified_ratio"])],
+    )
+
+
+REGISTRY.register_collector(_conditional_metrics)
+
+# Conditional and compressed responses differ by Accept-Encoding.
+_VARY = {"Vary": "Accept-Encoding"}
+
+
+def _observed(chunks: Iterator[bytes], encoding: str) -> Iterator[bytes]:
+    size = 0
+    try:
+        for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+    finally:
+        RESPONSE_BYTES.observe(size, encoding)
 
 
 @app.post(
@@ -18,6 +280,442 @@ app = FastAPI(title="Business Case Generator Agent")
     response_model=BusinessPlan | ClarifyingQuestions | GenerationErrorResponse,
     response_model_exclude_none=True,
 )
-def generate_plan_endpoint(request: GeneratePlanRequest):
-    result = generate_plan(request)
-    return result
+async def generate_plan_endpoint(
+    request: GeneratePlanRequest,
+    http_request: Request,
+    cache_control: Optional[str] = Header(default=None),
+    x_client_id: Optional[str] = Header(default=None),
+    x_request_timeout: Optional[float] = Header(default=None, gt=0),
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    stream: bool = False,
+):
+    """Generate a plan for ``request``.
+
+    With ``stream=true`` the result is generated in this process and written
+    to a chunked response section by section instead of as one buffered body;
+    such requests are not coalesced with identical ones in flight.
+
+    Responses carry a strong ``ETag``. A request whose ``If-None-Match``
+    lists it is answered ``304 Not Modified`` without generating anything.
+    Bodies are gzip-compressed when ``Accept-Encoding`` allows it.
+    """
+    timings: Optional[StageTimings] = getattr(http_request.state, "timings", None)
+    if timings is not None:
+        timings.record("request_validation", time.perf_counter() - timings.started)
+    key = request_key(request)
+    etag = result_etag(key)
+    gzip_etag = result_etag(key, ENCODING_GZIP)
+    matched = matching_etag(if_none_match, (etag, gzip_etag))
+    _conditional.record(matched is not None)
+    if matched is not None:
+        if timings is not None:
+            timings.kind = "not_modified"
+            timings.finished = time.perf_counter()
+        return Response(status_code=304, headers={"ETag": matched, **_VARY})
+
+    bypass = _bypass_cache(cache_control)
+    client = _client_id(http_request, x_client_id)
+
+    def store_plan(plan: Callable[[], Union[BusinessPlan, Dict[str, object]]]) -> None:
+        # Each request hash is stored once; repeats and cache hits skip the
+        # insert (and building ``plan``) after a cheap indexed lookup.
+        store = get_plan_store()
+        if store is not None:
+            with stage("store"):
+                if store.find(key) is None:
+                    store.add(plan(), request_hash=key)
+
+    def compute() -> Tuple[str, bytes]:
+        # The result is built from validated models, so it is serialized
+        # directly instead of being re-validated against ``response_model``.
+        status, body = get_executor().run(request, bypass)
+        if status == STATUS_PLAN:
+            # The executor may have generated in another process, so only
+            # the serialized plan is at hand here.
+            store_plan(lambda: json.loads(body))
+        return status, body
+
+    def compute_result() -> Tuple[str, PlanResult]:
+        result = generate_plan_cached(request, bypass=bypass)
+        status = result_status(result)
+        if status == STATUS_PLAN:
+            store_plan(lambda: result)
+        return status, result
+
+    async def admitted(work: Callable[[], _T]) -> _T:
+        # Queue on the event loop; a thread is taken only once admitted.
+        async with _admission.admit_async(client) as waited:
+            ADMISSION_WAIT_SECONDS.observe(waited)
+            if timings is not None:
+                timings.record("admission_wait", waited)
+            with activate(timings):
+                return await run_in_threadpool(work)
+
+    try:
+        with deadline_scope(_request_timeout(x_request_timeout)):
+            if stream:
+                status, result = await admitted(compute_result)
+            else:
+                # Coalesce first: only the leader takes an admission slot.
+                status, body = await _in_flight.do(key, lambda: admitted(compute))
+    except AdmissionRejected as exc:
+        raise _shed_error(exc) from exc
+    except DeadlineExceeded as exc:
+        raise _deadline_error() from exc
+    if timings is not None:
+        timings.kind = status
+        timings.finished = time.perf_counter()
+    gzip = accepts_gzip(accept_encoding)
+    if stream:
+        chunks = iter_result_json(result)
+        if gzip:
+            chunks = gzip_chunks(chunks)
+        encoding = ENCODING_GZIP if gzip else "identity"
+    else:
+        gzip = gzip and len(body) >= GZIP_MIN_BYTES
+        if gzip:
+            body = gzip_body(body)
+        encoding = ENCODING_GZIP if gzip else "identity"
+    headers = {"ETag": gzip_etag if gzip else etag, **_VARY}
+    if gzip:
+        headers["Content-Encoding"] = ENCODING_GZIP
+    if stream:
+        return StreamingResponse(
+            _observed(chunks, encoding), media_type="application/json", headers=headers
+        )
+    RESPONSE_BYTES.observe(len(body), encoding)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _request_timeout(requested: Optional[float]) -> Optional[float]:
+    """Return the tighter of ``X-Request-Timeout`` and ``BP_GEN_REQUEST_TIMEOUT``."""
+    configured = os.environ.get("BP_GEN_REQUEST_TIMEOUT", "")
+    limits = [float(value) for value in (requested, configured or None) if value is not None]
+    return min(limits) if limits else None
+
+
+def _client_id(request: Request, x_client_id: Optional[str]) -> str:
+    """Identify the client for admission: ``X-Client-Id``, else its address."""
+    return x_client_id or (request.client.host if request.client else "")
+
+
+def _shed_error(exc: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=exc.status_code,
+        detail=f"Request shed by admission control: {exc.reason}.",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+_DEADLINE_DETAIL = "Request deadline exceeded before the work finished."
+
+
+def _deadline_error() -> HTTPException:
+    _admission.record_deadline_exceeded()
+    return HTTPException(status_code=503, detail=_DEADLINE_DETAIL, headers={"Retry-After": "1"})
+
+
+async def _run_admitted(client: str, work: Callable[..., _T], *args: object) -> _T:
+    """Run ``work(*args)`` on the threadpool once admitted; queueing holds no thread."""
+    async with _admission.admit_async(client) as waited:
+        ADMISSION_WAIT_SECONDS.observe(waited)
+        return await run_in_threadpool(work, *args)
+
+
+class _AdmittedStreamingResponse(StreamingResponse):
+    """A streaming response that releases its client's admission slot once sent."""
+
+    def __init__(
+        self, content: Iterator[str], client: str, started: float, media_type: str
+    ) -> None:
+        super().__init__(content, media_type=media_type)
+        self._client = client
+        self._started = started
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            _admission.release(self._client, time.monotonic() - self._started)
+
+
+async def _admitted_stream(
+    lines: Iterator[str], client: str, timeout: Optional[float]
+) -> StreamingResponse:
+    """Stream NDJSON ``lines`` holding an admission slot, within the request deadline.
+
+    The slot is taken and the first line produced before the response
+    starts, so a shed request still gets its ``429``/``503`` and a deadline
+    missed before any result gets the usual ``503``. A deadline missed
+    mid-stream ends the stream with a ``{"detail": ...}`` line carrying the
+    same message; every earlier line carries its input ``index``.
+    """
+    with deadline_scope(timeout):
+        expires = deadline_epoch()
+        try:
+            waited = await _admission.acquire_async(client)
+        except AdmissionRejected as exc:
+            raise _shed_error(exc) from exc
+    ADMISSION_WAIT_SECONDS.observe(waited)
+    started = time.monotonic()
+    lines = _until_deadline(lines, expires)
+    try:
+        first = await run_in_threadpool(next, lines, None)
+    except BaseException as exc:
+        _admission.release(client, time.monotonic() - started)
+        if isinstance(exc, DeadlineExceeded):
+            raise _deadline_error() from exc
+        raise
+    content = lines if first is None else chain([first], lines)
+    return _AdmittedStreamingResponse(
+        content, client, started, media_type="application/x-ndjson"
+    )
+
+
+def _until_deadline(lines: Iterator[str], expires: Optional[float]) -> Iterator[str]:
+    # Each line is produced inside its own scope: a streamed body is iterated
+    # from worker threads, so a scope cannot stay open across lines. A missed
+    # deadline is raised for the first line and reported in-band after it.
+    try:
+        for position in count():
+            with deadline_scope_until(expires):
+                try:
+                    check_deadline()
+                    line: Optional[str] = next(lines)
+                except StopIteration:
+                    return
+                except DeadlineExceeded:
+                    if not position:
+                        raise
+                    line = None
+            if line is None:
+                _admission.record_deadline_exceeded()
+                yield json.dumps({"detail": _DEADLINE_DETAIL}) + "\n"
+                return
+            yield line
+    finally:
+        close = getattr(lines, "close", None)
+        if close is not None:
+            close()
+
+
+def _bypass_cache(cache_control: Optional[str]) -> bool:
+    """Honour ``Cache-Control: no-cache`` / ``no-store`` from the client."""
+    if not cache_control:
+        return False
+    directives = {directive.strip().lower() for directive in cache_control.split(",")}
+    return bool(directives & {"no-cache", "no-store"})
+
+
+@app.get("/cache/stats")
+def cache_stats_endpoint() -> Dict[str, int]:
+    return get_default_cache().stats()
+
+
+def _require_plan_store() -> PlanStore:
+    store = get_plan_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="No plan store is configured.")
+    return store
+
+
+def _plan_filter(
+    scope: Optional[str] = None,
+    horizon: Optional[str] = None,
+    name: Optional[str] = None,
+    request_hash: Optional[str] = None,
+    leading_or_lagging: Optional[str] = None,
+) -> PlanFilter:
+    return PlanFilter(scope, horizon, name, request_hash, leading_or_lagging)
+
+
+@app.get("/plans")
+def list_plans_endpoint(
+    scope: Optional[str] = None,
+    horizon: Optional[str] = None,
+    name: Optional[str] = None,
+    request_hash: Optional[str] = None,
+    leading_or_lagging: Optional[str] = None,
+    after: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1),
+) -> StreamingResponse:
+    """Stream stored plan summaries as NDJSON in ``plan_id`` order.
+
+    Resume an interrupted listing by passing the last ``plan_id`` as ``after``.
+    """
+    store = _require_plan_store()
+    plan_filter = _plan_filter(scope, horizon, name, request_hash, leading_or_lagging)
+    lines = (
+        json.dumps(summary.as_dict()) + "\n"
+        for summary in store.query(plan_filter, after=after, limit=limit)
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@app.get("/plans/kpis")
+def list_plan_kpis_endpoint(
+    scope: Optional[str] = None,
+    horizon: Optional[str] = None,
+    name: Optional[str] = None,
+    request_hash: Optional[str] = None,
+    leading_or_lagging: Optional[str] = None,
+    after: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1),
+) -> StreamingResponse:
+    """Stream stored KPIs as NDJSON ``{"cursor", "plan_id", "kpi"}`` records.
+
+    Resume by passing the last ``cursor`` as ``after``.
+    """
+    store = _require_plan_store()
+    plan_filter = _plan_filter(scope, horizon, name, request_hash, leading_or_lagging)
+    lines = (
+        f'{{"cursor": {cursor}, "plan_id": {plan_id}, "kpi": '
+        f"{result_json(kpi).decode('utf-8')}}}\n"
+        for cursor, plan_id, kpi in store.query_kpis(plan_filter, after=after, limit=limit)
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@app.get("/plans/{plan_id}")
+def get_plan_endpoint(plan_id: int) -> Response:
+    plan = _require_plan_store().get(plan_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail=f"Plan {plan_id} not found.")
+    return StreamingResponse(iter_result_json(plan), media_type="application/json")
+
+
+def _split_batch_body(text: str, content_type: Optional[str]) -> List[str]:
+    """Split a bulk body into raw JSON texts, one per item.
+
+    A body sent as ``application/x-ndjson``, or one that is not a JSON array,
+    is NDJSON: blank lines are skipped and every other line is kept as is, so
+    a malformed line fails only its own item. Raises ``ValueError`` for a
+    malformed JSON array.
+    """
+    ndjson = (content_type or "").startswith("application/x-ndjson")
+    if ndjson or not text.lstrip().startswith("["):
+        return [line for line in text.splitlines() if line.strip()]
+    return [json.dumps(item) for item in json.loads(text)]
+
+
+@app.post("/validate-plan")
+async def validate_plan_endpoint(
+    request: Request,
+    include_initiatives: bool = False,
+    include_capabilities: bool = False,
+    include_outputs: bool = False,
+    allowed_relationship: Optional[List[str]] = Query(default=None),
+    codes_only: bool = False,
+    max_errors: Optional[int] = Query(default=None, ge=0),
+    x_client_id: Optional[str] = Header(default=None),
+    x_request_timeout: Optional[float] = Header(default=None, gt=0),
+) -> Response:
+    """Validate a plan, or a batch of plans, produced outside the generator.
+
+    A JSON object body is one plan and gets one JSON result. A JSON array, or
+    NDJSON sent as ``application/x-ndjson``, is a batch: results stream back
+    as NDJSON in input order, tagged with ``index``, while plans are
+    validated in parallel on the execution backend. ``codes_only`` returns
+    just ``ok`` and a count per error code, skipping pydantic validation.
+
+    Both forms go through admission control and honour the request deadline.
+    """
+    flags = GenerationFlags(
+        include_initiatives=include_initiatives,
+        include_capabilities=include_capabilities,
+        include_outputs=include_outputs,
+    )
+    text = (await request.body()).decode("utf-8")
+    content_type = request.headers.get("content-type")
+    client = _client_id(request, x_client_id)
+    timeout = _request_timeout(x_request_timeout)
+    ndjson = (content_type or "").startswith("application/x-ndjson")
+    if not ndjson and not text.lstrip().startswith("["):
+        try:
+            with deadline_scope(timeout):
+                result = await _run_admitted(
+                    client,
+                    validate_plan_text,
+                    text,
+                    flags,
+                    allowed_relationship,
+                    codes_only,
+                    max_errors,
+                )
+        except AdmissionRejected as exc:
+            raise _shed_error(exc) from exc
+        except DeadlineExceeded as exc:
+            raise _deadline_error() from exc
+        return Response(content=json.dumps(result), media_type="application/json")
+
+    try:
+        items = _split_batch_body(text, content_type)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {exc}") from exc
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(items)} plans exceeds the limit of {MAX_BATCH_SIZE}.",
+        )
+
+    executor = get_executor()
+    results = validate_plans(
+        enumerate(items),
+        flags,
+        allowed_relationship,
+        codes_only,
+        max_errors,
+        submit=executor.submit,
+        workers=executor.workers or 1,
+    )
+    lines = (json.dumps({"index": index, **result}) + "\n" for index, result in results)
+    return await _admitted_stream(lines, client, timeout)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def _generate_batch_lines(items: List[str], bypass_cache: bool) -> Iterator[str]:
+    for index, item in enumerate(items):
+        try:
+            request = GeneratePlanRequest.model_validate_json(item)
+        except ValidationError as exc:
+            result = invalid_request_result(exc)
+        else:
+            result = generate_plan_cached(request, bypass=bypass_cache)
+        record = {"index": index, "status": result_status(result)}
+        yield result_record_line(record, result) + "\n"
+
+
+@app.post("/generate-plans")
+async def generate_plans_endpoint(
+    request: Request,
+    x_client_id: Optional[str] = Header(default=None),
+    x_request_timeout: Optional[float] = Header(default=None, gt=0),
+) -> StreamingResponse:
+    """Generate plans for a JSON array or NDJSON body of requests.
+
+    One NDJSON line is streamed back per input as soon as it is generated,
+    tagged with the input ``index``. The batch holds one admission slot
+    while it streams and stops at the request deadline.
+    """
+    try:
+        items = _split_batch_body(
+            (await request.body()).decode("utf-8"), request.headers.get("content-type")
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {exc}") from exc
+
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(items)} requests exceeds the limit of {MAX_BATCH_SIZE}.",
+        )
+
+    lines = _generate_batch_lines(items, _bypass_cache(request.headers.get("cache-control")))
+    return await _admitted_stream(
+        lines, _client_id(request, x_client_id), _request_timeout(x_request_timeout)
+    )
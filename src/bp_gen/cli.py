@@ -1,22 +1,212 @@
+"""Command-line entry point.
+
+Only the standard library is imported at module level; each subcommand
+imports the heavy modules (pydantic schemas, the generator) it needs, so
+``bp-gen --help`` and forwarding to a warm worker stay fast.
+"""
 from __future__ import annotations
 
 import argparse
 import json
+import os
+import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from bp_gen.schemas import GenerationFlags
 
-from bp_gen.schemas import (
-    ClarifyingQuestions,
-    GeneratePlanRequest,
-    GenerationErrorResponse,
-)
-from bp_gen.services.plan_generator import generate_plan
+WORKER_SOCKET_ENV = "BP_GEN_WORKER_SOCKET"
 
 
 def _load_payload(path: Path) -> dict:
     return json.loads(path.read_text())
 
 
-def main() -> None:
+def _add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache-path",
+        default=None,
+        help="SQLite file for the on-disk result cache (defaults to $BP_GEN_CACHE_PATH)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the result cache",
+    )
+
+
+def _generate_plan_command(args: argparse.Namespace) -> None:
+    from bp_gen.instrumentation import collect_timings, enable_timings
+    from bp_gen.schemas import (
+        ClarifyingQuestions,
+        GeneratePlanRequest,
+        GenerationErrorResponse,
+    )
+    from bp_gen.serialization import write_result_json
+    from bp_gen.services.cache import configure_default_cache, generate_plan_cached
+
+    payload = _load_payload(Path(args.input))
+    request = GeneratePlanRequest.model_validate(payload)
+    cache_path = Path(args.cache_path) if args.cache_path else None
+    configure_default_cache(path=cache_path)
+    if args.verbose:
+        enable_timings()
+    with collect_timings() as timings:
+        result = generate_plan_cached(request, bypass=args.no_cache)
+    if timings is not None:
+        print(timings.format(), file=sys.stderr)
+
+    write_result_json(result, Path(args.output), indent=None if args.compact else 2)
+
+    if isinstance(result, ClarifyingQuestions):
+        return
+    if isinstance(result, GenerationErrorResponse):
+        raise SystemExit(f"Validation failed: {result.model_dump(exclude_none=True)}")
+
+
+def _generate_plans_command(args: argparse.Namespace) -> None:
+    from bp_gen.services.batch import iter_payloads, run_batch
+    from bp_gen.services.plan_store import PlanStore
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    store = PlanStore(Path(args.store)) if args.store else None
+
+    try:
+        with output_path.open("w") as output:
+            summary = run_batch(
+                iter_payloads(Path(args.input)),
+                output,
+                workers=args.workers,
+                use_cache=not args.no_cache,
+                cache_path=Path(args.cache_path) if args.cache_path else None,
+                store=store,
+            )
+    finally:
+        if store is not None:
+            store.close()
+    print(summary.format(), file=sys.stderr)
+
+
+# Inputs validated as a batch of plans rather than one plan document.
+_BATCH_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def _validate_batch(input_path: Path, flags: GenerationFlags, args: argparse.Namespace) -> None:
+    from bp_gen.services.batch import iter_payloads
+    from bp_gen.services.plan_validation import validate_plans_in_pool
+
+    invalid = 0
+    results = validate_plans_in_pool(
+        iter_payloads(input_path),
+        flags,
+        allowed_relationships=args.allow_relationship,
+        codes_only=args.codes_only,
+        max_errors=args.max_errors,
+        workers=args.workers,
+    )
+    for source, result in results:
+        invalid += not result["ok"]
+        print(json.dumps({"source": source, **result}))
+    if invalid:
+        raise SystemExit(1)
+
+
+def _validate_command(args: argparse.Namespace) -> None:
+    from bp_gen.relationships import compile_relationships
+    from bp_gen.schemas import BusinessPlan, GenerationFlags
+
+    flags = GenerationFlags(
+        include_initiatives=args.include_initiatives,
+        include_capabilities=args.include_capabilities,
+        include_outputs=args.include_outputs,
+    )
+    input_path = Path(args.input)
+    if input_path.is_dir() or input_path.suffix in _BATCH_SUFFIXES:
+        if args.structure:
+            raise SystemExit("--structure cannot be used when validating a batch of plans")
+        _validate_batch(input_path, flags, args)
+        return
+
+    relationships = None
+    if args.allow_relationship is not None:
+        relationships = compile_relationships(args.allow_relationship)
+    if args.stream or args.codes_only:
+        if args.structure:
+            raise SystemExit(
+                "--structure needs the whole graph and cannot be used with --stream or --codes-only"
+            )
+        from bp_gen.stream_validator import validate_plan_stream
+
+        result = validate_plan_stream(
+            Path(args.input),
+            flags,
+            max_errors=args.max_errors,
+            relationships=relationships,
+            codes_only=args.codes_only,
+        )
+    elif args.workers is not None and args.workers > 1:
+        from bp_gen.parallel_validator import validate_business_plan_parallel
+
+        plan = BusinessPlan.model_validate(_load_payload(Path(args.input)))
+        result = validate_business_plan_parallel(
+            plan,
+            flags,
+            max_errors=args.max_errors,
+            relationships=relationships,
+            structure=args.structure,
+            workers=args.workers,
+        )
+    else:
+        from bp_gen.validator import validate_business_plan
+
+        plan = BusinessPlan.model_validate(_load_payload(Path(args.input)))
+        result = validate_business_plan(
+            plan,
+            flags,
+            max_errors=args.max_errors,
+            relationships=relationships,
+            structure=args.structure,
+        )
+
+    print(json.dumps(result, indent=2))
+    if not result["ok"]:
+        raise SystemExit(1)
+
+
+def _diff_command(args: argparse.Namespace) -> None:
+    from bp_gen.diff import UNCHANGED, diff_directories, diff_plan_files
+
+    before, after = Path(args.before), Path(args.after)
+    if before.is_dir() != after.is_dir():
+        raise SystemExit("diff compares two files or two directories, not one of each")
+    if not before.is_dir():
+        plan_diff = diff_plan_files(before, after)
+        print(json.dumps(plan_diff.as_dict(), indent=2))
+        if not plan_diff.identical:
+            raise SystemExit(1)
+        return
+
+    counts: dict = {}
+    for name, status, plan_diff in diff_directories(before, after, workers=args.workers):
+        counts[status] = counts.get(status, 0) + 1
+        record = {"source": name, "status": status}
+        if plan_diff is not None and not plan_diff.identical:
+            record.update(plan_diff.as_dict())
+        print(json.dumps(record))
+    print(", ".join(f"{status}={count}" for status, count in sorted(counts.items())), file=sys.stderr)
+    if set(counts) - {UNCHANGED}:
+        raise SystemExit(1)
+
+
+def _worker_command(args: argparse.Namespace) -> None:
+    from bp_gen.worker import serve
+
+    serve(args.socket)
+
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Business Case Generator Agent")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
@@ -27,24 +217,142 @@ def main() -> None:
         required=True,
         help="Path to write the generated plan JSON",
     )
+    generate_parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact JSON instead of indenting it",
+    )
+    _add_cache_arguments(generate_parser)
+    generate_parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print per-stage timings to stderr",
+    )
+    generate_parser.set_defaults(handler=_generate_plan_command)
+
+    batch_parser = subparsers.add_parser(
+        "generate-plans",
+        help="Generate plans for many requests using a pool of worker processes",
+    )
+    batch_parser.add_argument(
+        "--input",
+        required=True,
+        help="Path to a JSONL file or a directory of JSON input files",
+    )
+    batch_parser.add_argument(
+        "--output",
+        required=True,
+        help="Path to write one JSONL result record per input",
+    )
+    batch_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (defaults to the CPU count; 1 runs inline)",
+    )
+    batch_parser.add_argument(
+        "--store",
+        default=None,
+        help="SQLite plan store to insert generated plans into",
+    )
+    _add_cache_arguments(batch_parser)
+    batch_parser.set_defaults(handler=_generate_plans_command)
 
-    args = parser.parse_args()
+    validate_parser = subparsers.add_parser("validate", help="Validate business plan JSON files")
+    validate_parser.add_argument(
+        "--input",
+        required=True,
+        help="Path to a plan JSON file, or a JSONL file or directory of plans to validate as a batch",
+    )
+    validate_parser.add_argument(
+        "--codes-only",
+        action="store_true",
+        help="Report only ok and a count per error code, skipping pydantic validation",
+    )
+    validate_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=(
+            "Worker processes for batches (defaults to the CPU count; 1 runs inline). "
+            "For a single large plan, shards validation over this many processes"
+        ),
+    )
+    validate_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse and validate incrementally with bounded memory (for very large plans)",
+    )
+    validate_parser.add_argument(
+        "--max-errors",
+        type=int,
+        default=None,
+        help="Keep at most this many detailed errors (counts remain exact)",
+    )
+    for entity in ("initiatives", "capabilities", "outputs"):
+        validate_parser.add_argument(
+            f"--include-{entity}",
+            action="store_true",
+            help=f"Allow {entity} in the plan",
+        )
+    validate_parser.add_argument(
+        "--allow-relationship",
+        action="append",
+        default=None,
+        metavar="NAME",
+        help="Check link types against this allowed relationship (repeatable)",
+    )
+    validate_parser.add_argument(
+        "--structure",
+        action="store_true",
+        help="Also check for cycles, orphan, unreachable and untraceable nodes",
+    )
+    validate_parser.set_defaults(handler=_validate_command)
 
-    if args.command == "generate-plan":
-        payload = _load_payload(Path(args.input))
-        request = GeneratePlanRequest.model_validate(payload)
-        result = generate_plan(request)
+    diff_parser = subparsers.add_parser(
+        "diff",
+        help="Structurally compare two plan files or two directories of plans",
+    )
+    diff_parser.add_argument("before", help="Baseline plan JSON file or directory")
+    diff_parser.add_argument("after", help="Plan JSON file or directory to compare")
+    diff_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for directory diffs (defaults to the CPU count; 1 runs inline)",
+    )
+    diff_parser.set_defaults(handler=_diff_command)
+
+    worker_parser = subparsers.add_parser(
+        "worker",
+        help=f"Serve CLI commands from a warm process (clients set ${WORKER_SOCKET_ENV})",
+    )
+    worker_parser.add_argument("--socket", required=True, help="Unix socket path to listen on")
+    worker_parser.set_defaults(handler=_worker_command)
+
+    return parser
 
-        output_path = Path(args.output)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        payload = result.model_dump(exclude_none=True)
-        output_path.write_text(json.dumps(payload, indent=2))
+def run(argv: List[str]) -> None:
+    """Parse ``argv`` and run the selected subcommand in this process."""
+    args = _build_parser().parse_args(argv)
+    args.handler(args)
 
-        if isinstance(result, ClarifyingQuestions):
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+
+    socket_path = os.environ.get(WORKER_SOCKET_ENV)
+    if socket_path and argv[:1] != ["worker"]:
+        from bp_gen.worker import call_worker
+
+        exit_code = call_worker(socket_path, argv)
+        if exit_code is not None:
+            if exit_code:
+                raise SystemExit(exit_code)
             return
-        if isinstance(result, GenerationErrorResponse):
-            raise SystemExit(f"Validation failed: {payload}")
+
+    run(argv)
 
 
 if __name__ == "__main__":
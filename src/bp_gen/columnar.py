@@ -0,0 +1,373 @@
+"""Columnar, array-backed storage for very large plan graphs.
+
+A :class:`ColumnarPlan` holds each plan section as a table of integer
+columns. Every string is stored once in a shared :class:`StringPool` and
+columns hold its code, so repeated values such as ``frequency`` or link
+``type`` cost four bytes per row instead of a Python object. References are
+resolved to row numbers up front (``kpis.objective_row``, ``links.from_row``
+and ``links.to_row``), which lets the validator work on integers alone.
+
+Plans convert losslessly to and from :class:`~bp_gen.schemas.BusinessPlan`
+and can be saved as a directory of raw column files that :meth:`ColumnarPlan.load`
+memory-maps back without parsing.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from bp_gen.graph import NODE_TYPES, SECTION_BY_NODE_TYPE
+from bp_gen.schemas import (
+    KPI,
+    BusinessPlan,
+    Capability,
+    Gap,
+    Initiative,
+    Link,
+    Objective,
+    Output,
+    PlanMeta,
+    construct_trusted,
+)
+
+COLUMNAR_FORMAT_VERSION = 1
+
+# array typecodes for string codes / row numbers and for string offsets.
+CODE_TYPECODE = "i"
+OFFSET_TYPECODE = "q"
+
+# Code stored for ``None`` string values.
+NULL_CODE = -1
+
+# Row stored for references to an ID that no node of the target type has,
+# and for link endpoints whose type is not a known node type.
+UNKNOWN_ROW = -1
+UNKNOWN_TYPE_ROW = -2
+
+# Plan sections in BusinessPlan field order, with their node type (if any).
+SECTIONS: Tuple[Tuple[str, Type[BaseModel], Optional[str]], ...] = (
+    ("objectives", Objective, "objective"),
+    ("kpis", KPI, "kpi"),
+    ("initiatives", Initiative, "initiative"),
+    ("capabilities", Capability, "capability"),
+    ("outputs", Output, "output"),
+    ("links", Link, None),
+    ("assumptions_and_gaps", Gap, None),
+)
+OPTIONAL_SECTIONS = ("initiatives", "capabilities", "outputs")
+
+# Derived reference columns: (section, column, id column, target type column or type).
+_REFERENCES = (
+    ("kpis", "objective_row", "objective_id", "objective"),
+    ("links", "from_row", "from_id", "from_type"),
+    ("links", "to_row", "to_id", "to_type"),
+)
+
+Column = Sequence[int]
+
+
+class StringPool:
+    """Interned strings addressed by integer code."""
+
+    __slots__ = ("strings", "_codes")
+
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return NULL_CODE
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def lookup(self, value: str) -> int:
+        """Return the code of ``value`` without interning it (``NULL_CODE`` if absent)."""
+        return self._codes.get(value, NULL_CODE)
+
+    def value(self, code: int) -> Optional[str]:
+        return None if code == NULL_CODE else self.strings[code]
+
+
+class MappedStringPool:
+    """Read-only string pool backed by memory-mapped UTF-8 data and offsets."""
+
+    __slots__ = ("_data", "_offsets", "_decoded")
+
+    def __init__(self, data: Union[bytes, memoryview, mmap.mmap], offsets: Column) -> None:
+        self._data = data
+        self._offsets = offsets
+        # Decoded strings are kept so each distinct value is one object.
+        self._decoded: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def value(self, code: int) -> Optional[str]:
+        if code == NULL_CODE:
+            return None
+        text = self._decoded.get(code)
+        if text is None:
+            start, end = self._offsets[code], self._offsets[code + 1]
+            text = self._decoded[code] = str(self._data[start:end], "utf-8")
+        return text
+
+
+Pool = Union[StringPool, MappedStringPool]
+
+
+class ColumnTable:
+    """One plan section stored as equal-length integer columns.
+
+    ``columns`` holds a string-code column per model field plus any derived
+    reference columns such as ``objective_row``.
+    """
+
+    __slots__ = ("model", "fields", "columns", "pool")
+
+    def __init__(self, model: Type[BaseModel], columns: Dict[str, Column], pool: Pool) -> None:
+        self.model = model
+        self.fields = tuple(model.model_fields)
+        self.columns = columns
+        self.pool = pool
+
+    def __len__(self) -> int:
+        return len(self.columns[self.fields[0]])
+
+    def values(self, field: str) -> Iterator[Optional[str]]:
+        value = self.pool.value
+        return (value(code) for code in self.columns[field])
+
+    def row(self, index: int) -> Dict[str, Optional[str]]:
+        value = self.pool.value
+        return {field: value(self.columns[field][index]) for field in self.fields}
+
+    def models(self) -> List[BaseModel]:
+        value = self.pool.value
+        columns = [self.columns[field] for field in self.fields]
+        return [
+            construct_trusted(
+                self.model,
+                **{field: value(column[row]) for field, column in zip(self.fields, columns)},
+            )
+            for row in range(len(self))
+        ]
+
+
+class ColumnarPlanBuilder:
+    """Accumulates rows section by section and resolves references in :meth:`build`."""
+
+    def __init__(self) -> None:
+        self.pool = StringPool()
+        self.meta: Dict[str, object] = {}
+        self._columns: Dict[str, Optional[Dict[str, array]]] = {}
+        for name, model, _ in SECTIONS:
+            if name not in OPTIONAL_SECTIONS:
+                self._columns[name] = {field: array(CODE_TYPECODE) for field in model.model_fields}
+            else:
+                self._columns[name] = None
+        self._models = {name: model for name, model, _ in SECTIONS}
+
+    def set_meta(self, meta: PlanMeta) -> None:
+        self.meta = meta.model_dump()
+
+    def include(self, section: str) -> None:
+        """Mark an optional section as present (an empty list rather than ``None``)."""
+        if self._columns[section] is None:
+            model = self._models[section]
+            self._columns[section] = {field: array(CODE_TYPECODE) for field in model.model_fields}
+
+    def append(self, section: str, fields: Mapping[str, Optional[str]]) -> None:
+        self.include(section)
+        code = self.pool.code
+        for field, column in self._columns[section].items():
+            column.append(code(fields.get(field)))
+
+    def extend(self, section: str, items: Sequence[BaseModel]) -> None:
+        self.include(section)
+        code = self.pool.code
+        for field, column in self._columns[section].items():
+            column.extend([code(getattr(item, field)) for item in items])
+
+    def build(self) -> "ColumnarPlan":
+        tables = {
+            name: None
+            if columns is None
+            else ColumnTable(self._models[name], dict(columns), self.pool)
+            for name, columns in self._columns.items()
+        }
+        plan = ColumnarPlan(self.pool, dict(self.meta), tables)
+        plan._resolve_references()
+        return plan
+
+
+class ColumnarPlan:
+    """Array-backed business plan; see the module docstring."""
+
+    __slots__ = ("pool", "meta", "tables")
+
+    def __init__(
+        self,
+        pool: Pool,
+        meta: Dict[str, object],
+        tables: Dict[str, Optional[ColumnTable]],
+    ) -> None:
+        self.pool = pool
+        self.meta = meta
+        self.tables = tables
+
+    def __getattr__(self, name: str) -> Optional[ColumnTable]:
+        tables = object.__getattribute__(self, "tables")
+        if name in tables:
+            return tables[name]
+        raise AttributeError(name)
+
+    def section_length(self, section: str) -> int:
+        table = self.tables[section]
+        return 0 if table is None else len(table)
+
+    def _resolve_references(self) -> None:
+        # Row lookup per node type, keyed by string code (the first row wins
+        # when IDs repeat, matching PlanGraphIndex).
+        rows_by_code: Dict[str, Dict[int, int]] = {}
+        for node_type in NODE_TYPES:
+            table = self.tables[SECTION_BY_NODE_TYPE[node_type]]
+            rows: Dict[int, int] = {}
+            if table is not None:
+                for row, code in enumerate(table.columns["id"]):
+                    rows.setdefault(code, row)
+            rows_by_code[node_type] = rows
+        type_by_code = {self.pool.lookup(node_type): node_type for node_type in NODE_TYPES}
+
+        for section, column, id_column, target in _REFERENCES:
+            table = self.tables[section]
+            resolved = array(CODE_TYPECODE)
+            ids = table.columns[id_column]
+            if target in rows_by_code:
+                rows = rows_by_code[target]
+                resolved.extend([rows.get(code, UNKNOWN_ROW) for code in ids])
+            else:
+                for code, type_code in zip(ids, table.columns[target]):
+                    node_type = type_by_code.get(type_code)
+                    if node_type is None:
+                        resolved.append(UNKNOWN_TYPE_ROW)
+                    else:
+                        resolved.append(rows_by_code[node_type].get(code, UNKNOWN_ROW))
+            table.columns[column] = resolved
+
+    @classmethod
+    def from_business_plan(cls, plan: BusinessPlan) -> "ColumnarPlan":
+        builder = ColumnarPlanBuilder()
+        builder.set_meta(plan.plan)
+        for name, _, _ in SECTIONS:
+            items = getattr(plan, name)
+            if items is not None:
+                builder.extend(name, items)
+        return builder.build()
+
+    def to_business_plan(self) -> BusinessPlan:
+        sections = {
+            name: None if table is None else table.models()
+            for name, table in self.tables.items()
+        }
+        return construct_trusted(
+            BusinessPlan,
+            plan=construct_trusted(PlanMeta, **self.meta),
+            **sections,
+        )
+
+    def save(self, directory: Union[str, Path]) -> None:
+        """Write raw column files plus a ``manifest.json`` into ``directory``."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        offsets = array(OFFSET_TYPECODE, [0])
+        with open(directory / "strings.bin", "wb") as handle:
+            for code in range(len(self.pool)):
+                encoded = self.pool.value(code).encode("utf-8")
+                handle.write(encoded)
+                offsets.append(offsets[-1] + len(encoded))
+        _write_column(directory / "strings.offsets", offsets)
+
+        tables: Dict[str, Optional[Dict[str, object]]] = {}
+        for name, table in self.tables.items():
+            if table is None:
+                tables[name] = None
+                continue
+            for column_name, column in table.columns.items():
+                _write_column(directory / f"{name}.{column_name}.col", column)
+            tables[name] = {"length": len(table), "columns": list(table.columns)}
+
+        manifest = {
+            "format_version": COLUMNAR_FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "code_itemsize": array(CODE_TYPECODE).itemsize,
+            "offset_itemsize": array(OFFSET_TYPECODE).itemsize,
+            "strings": len(self.pool),
+            "meta": self.meta,
+            "tables": tables,
+        }
+        (directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    @classmethod
+    def load(cls, directory: Union[str, Path]) -> "ColumnarPlan":
+        """Memory-map a plan written by :meth:`save`; columns are not copied."""
+        directory = Path(directory)
+        manifest = json.loads((directory / "manifest.json").read_text())
+        if manifest.get("format_version") != COLUMNAR_FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar format: {manifest.get('format_version')!r}")
+        if (
+            manifest["byteorder"] != sys.byteorder
+            or manifest["code_itemsize"] != array(CODE_TYPECODE).itemsize
+            or manifest["offset_itemsize"] != array(OFFSET_TYPECODE).itemsize
+        ):
+            raise ValueError("Columnar files were written on an incompatible platform.")
+
+        pool = MappedStringPool(
+            _map_file(directory / "strings.bin"),
+            _map_column(directory / "strings.offsets", OFFSET_TYPECODE),
+        )
+        models = {name: model for name, model, _ in SECTIONS}
+        tables: Dict[str, Optional[ColumnTable]] = {}
+        for name, entry in manifest["tables"].items():
+            if entry is None:
+                tables[name] = None
+                continue
+            columns = {
+                column: _map_column(directory / f"{name}.{column}.col", CODE_TYPECODE)
+                for column in entry["columns"]
+            }
+            tables[name] = ColumnTable(models[name], columns, pool)
+        return cls(pool, manifest["meta"], tables)
+
+
+def _write_column(path: Path, column: Column) -> None:
+    with open(path, "wb") as handle:
+        handle.write(column if isinstance(column, (array, memoryview)) else bytes(column))
+
+
+def _map_file(path: Path) -> Union[bytes, mmap.mmap]:
+    with open(path, "rb") as handle:
+        if handle.seek(0, 2) == 0:
+            # mmap cannot map empty files.
+            return b""
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _map_column(path: Path, typecode: str) -> Column:
+    data = _map_file(path)
+    if not data:
+        return array(typecode)
+    return memoryview(data).cast(typecode)
@@ -0,0 +1,84 @@
+"""Per-request deadlines carried through generation and validation.
+
+A deadline is entered with :func:`deadline_scope` and lives in a context
+variable, like stage timings, so it reaches ``generate_plan`` and
+``validate_business_plan`` without threading a parameter through every
+call. Long-running code calls :func:`check_deadline` at safe points and
+abandons the work with :class:`DeadlineExceeded` once the client's budget
+is spent. Work handed to another process carries the deadline as a
+wall-clock time (:func:`deadline_epoch`) and re-enters it there with
+:func:`deadline_scope_until`, so time spent queued still counts.
+"""
+from __future__ import annotations
+
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work continues past its request deadline."""
+
+
+# Absolute ``time.monotonic()`` expiry for the current context.
+_expires_at: ContextVar[Optional[float]] = ContextVar("bp_gen_deadline", default=None)
+
+
+def remaining_seconds() -> Optional[float]:
+    """Seconds left before the current deadline, or ``None`` without one."""
+    expires_at = _expires_at.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def check_deadline() -> None:
+    expires_at = _expires_at.get()
+    if expires_at is not None and time.monotonic() >= expires_at:
+        raise DeadlineExceeded("Request deadline exceeded.")
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """Run the block with a deadline ``seconds`` from now.
+
+    ``None`` adds no deadline. A nested scope never extends an outer one.
+    """
+    expires_at = _expires_at.get()
+    if seconds is not None:
+        candidate = time.monotonic() + seconds
+        if expires_at is None or candidate < expires_at:
+            expires_at = candidate
+    token = _expires_at.set(expires_at)
+    try:
+        yield
+    finally:
+        _expires_at.reset(token)
+
+
+def deadline_epoch() -> Optional[float]:
+    """The current deadline as a ``time.time()`` value, or ``None`` without one."""
+    remaining = remaining_seconds()
+    if remaining is None:
+        return None
+    return time.time() + remaining
+
+
+@contextmanager
+def deadline_scope_until(epoch: Optional[float]) -> Iterator[None]:
+    """Run the block with a deadline at wall-clock ``epoch`` (see :func:`deadline_epoch`)."""
+    with deadline_scope(None if epoch is None else epoch - time.time()):
+        yield
+
+
+def future_result(future: "Future[T]") -> T:
+    """Wait for ``future`` until the current deadline, then cancel it and give up."""
+    try:
+        return future.result(timeout=remaining_seconds())
+    except FutureTimeoutError:
+        future.cancel()
+        raise DeadlineExceeded("Request deadline exceeded waiting for a worker.") from None
@@ -0,0 +1,263 @@
+"""Structural diff of business plans.
+
+Nodes are matched by identity rather than position: objectives, KPIs,
+initiatives, capabilities and outputs by ``id``, links by
+``(from_type, from_id, to_type, to_id, type)`` and assumptions/gaps by
+``item``. Reordering a section is therefore not a change. Each section is
+fingerprinted first, so unchanged sections are skipped without matching
+their nodes; the rest is matched with dictionaries, keeping the whole diff
+linear in the size of the plans.
+
+:func:`diff_directories` compares two directories of plan files across a
+pool of worker processes, skipping files whose bytes are identical.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from bp_gen.schemas import BusinessPlan
+
+CHANGE_ADDED = "added"
+CHANGE_REMOVED = "removed"
+CHANGE_CHANGED = "changed"
+# Directory-diff status of a file whose plan did not change.
+UNCHANGED = "identical"
+
+# Section -> fields identifying a node in it. Sections are diffed in this order.
+NODE_KEYS: Dict[str, Tuple[str, ...]] = {
+    "plan": (),
+    "objectives": ("id",),
+    "kpis": ("id",),
+    "initiatives": ("id",),
+    "capabilities": ("id",),
+    "outputs": ("id",),
+    "links": ("from_type", "from_id", "to_type", "to_id", "type"),
+    "assumptions_and_gaps": ("item",),
+}
+
+# Most files compared per task handed to a directory-diff worker.
+_DIRECTORY_CHUNK_SIZE = 16
+
+PlanData = Union[BusinessPlan, Dict[str, object]]
+NodeKey = Union[str, Tuple[str, ...]]
+
+
+@dataclass(frozen=True)
+class FieldChange:
+    """One field whose value differs between the two versions of a node."""
+
+    field: str
+    before: object
+    after: object
+
+
+@dataclass(frozen=True)
+class NodeChange:
+    """A node added, removed or changed in ``section``.
+
+    ``occurrence`` tells apart nodes that share a key within one plan.
+    """
+
+    section: str
+    key: NodeKey
+    change: str
+    fields: Tuple[FieldChange, ...] = ()
+    occurrence: int = 0
+
+    def as_dict(self) -> Dict[str, object]:
+        record: Dict[str, object] = {
+            "section": self.section,
+            "key": list(self.key) if isinstance(self.key, tuple) else self.key,
+            "change": self.change,
+        }
+        if self.occurrence:
+            record["occurrence"] = self.occurrence
+        if self.fields:
+            record["fields"] = [
+                {"field": item.field, "before": item.before, "after": item.after}
+                for item in self.fields
+            ]
+        return record
+
+
+@dataclass
+class PlanDiff:
+    """Node changes between two plans, in section order."""
+
+    changes: List[NodeChange] = field(default_factory=list)
+
+    @property
+    def identical(self) -> bool:
+        return not self.changes
+
+    def summary(self) -> Dict[str, int]:
+        counts = {CHANGE_ADDED: 0, CHANGE_REMOVED: 0, CHANGE_CHANGED: 0}
+        for change in self.changes:
+            counts[change.change] += 1
+        return counts
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "identical": self.identical,
+            "summary": self.summary(),
+            "changes": [change.as_dict() for change in self.changes],
+        }
+
+
+def _canonical(value: object) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def fingerprint(value: object) -> bytes:
+    """Digest of a JSON-compatible value that ignores dict key order."""
+    return hashlib.blake2b(_canonical(value), digest_size=16).digest()
+
+
+def _plan_dict(plan: PlanData) -> Dict[str, object]:
+    if isinstance(plan, BusinessPlan):
+        return plan.model_dump(mode="json")
+    return plan
+
+
+def _section_nodes(plan: Dict[str, object], section: str) -> List[Dict[str, object]]:
+    value = plan.get(section)
+    if value is None:
+        return []
+    if section == "plan":
+        return [value]
+    return value
+
+
+def _keyed(
+    nodes: Sequence[Dict[str, object]],
+    key_fields: Tuple[str, ...],
+) -> Dict[Tuple[NodeKey, int], Dict[str, object]]:
+    keyed: Dict[Tuple[NodeKey, int], Dict[str, object]] = {}
+    occurrences: Dict[NodeKey, int] = {}
+    for node in nodes:
+        if not key_fields:
+            key: NodeKey = "plan"
+        elif len(key_fields) == 1:
+            key = node.get(key_fields[0])
+        else:
+            key = tuple(node.get(name) for name in key_fields)
+        occurrence = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+        keyed[(key, occurrence)] = node
+    return keyed
+
+
+def _field_changes(before: Dict[str, object], after: Dict[str, object]) -> Tuple[FieldChange, ...]:
+    # A missing field and an explicit ``None`` are the same value, so plans
+    # serialized with and without ``exclude_none`` compare equal.
+    names = list(before)
+    names.extend(name for name in after if name not in before)
+    return tuple(
+        FieldChange(name, before.get(name), after.get(name))
+        for name in names
+        if before.get(name) != after.get(name)
+    )
+
+
+def _diff_section(
+    section: str,
+    before: Sequence[Dict[str, object]],
+    after: Sequence[Dict[str, object]],
+    changes: List[NodeChange],
+) -> None:
+    key_fields = NODE_KEYS[section]
+    before_nodes = _keyed(before, key_fields)
+    after_nodes = _keyed(after, key_fields)
+    for (key, occurrence), node in before_nodes.items():
+        other = after_nodes.get((key, occurrence))
+        if other is None:
+            changes.append(NodeChange(section, key, CHANGE_REMOVED, occurrence=occurrence))
+        elif other != node:
+            fields = _field_changes(node, other)
+            if fields:
+                changes.append(NodeChange(section, key, CHANGE_CHANGED, fields, occurrence))
+    for (key, occurrence), node in after_nodes.items():
+        if (key, occurrence) not in before_nodes:
+            changes.append(NodeChange(section, key, CHANGE_ADDED, occurrence=occurrence))
+
+
+def diff_plans(before: PlanData, after: PlanData) -> PlanDiff:
+    """Return the structural differences from ``before`` to ``after``.
+
+    Plans may be models or their JSON dicts (as loaded from a file), which
+    avoids building models when diffing stored plans.
+    """
+    before_data = _plan_dict(before)
+    after_data = _plan_dict(after)
+    result = PlanDiff()
+    for section in NODE_KEYS:
+        before_nodes = _section_nodes(before_data, section)
+        after_nodes = _section_nodes(after_data, section)
+        if fingerprint(before_nodes) == fingerprint(after_nodes):
+            continue
+        _diff_section(section, before_nodes, after_nodes, result.changes)
+    return result
+
+
+def diff_plan_files(before: Path, after: Path) -> PlanDiff:
+    """Diff two plan JSON files; byte-identical files are not parsed."""
+    before_bytes = Path(before).read_bytes()
+    after_bytes = Path(after).read_bytes()
+    if before_bytes == after_bytes:
+        return PlanDiff()
+    return diff_plans(json.loads(before_bytes), json.loads(after_bytes))
+
+
+def _diff_named_files(
+    before_dir: str,
+    after_dir: str,
+    names: List[str],
+) -> List[Tuple[str, PlanDiff]]:
+    return [
+        (name, diff_plan_files(Path(before_dir, name), Path(after_dir, name))) for name in names
+    ]
+
+
+def diff_directories(
+    before_dir: Path,
+    after_dir: Path,
+    workers: Optional[int] = None,
+) -> Iterator[Tuple[str, str, Optional[PlanDiff]]]:
+    """Compare same-named ``*.json`` plans in two directories.
+
+    Yields ``(name, status, diff)`` in name order, where ``status`` is
+    ``"identical"``, ``"changed"``, or ``"added"``/``"removed"`` (with no
+    diff) for files present on one side only. With ``workers=1`` files are
+    compared inline without a process pool.
+    """
+    before_names = {path.name for path in Path(before_dir).glob("*.json")}
+    after_names = {path.name for path in Path(after_dir).glob("*.json")}
+    shared = sorted(before_names & after_names)
+    workers = workers or os.cpu_count() or 1
+    # Small directories are still spread over every worker.
+    chunk_size = max(1, min(_DIRECTORY_CHUNK_SIZE, -(-len(shared) // workers)))
+    chunks = [shared[start : start + chunk_size] for start in range(0, len(shared), chunk_size)]
+    args = (str(before_dir), str(after_dir))
+
+    if workers == 1 or len(chunks) <= 1:
+        results = (_diff_named_files(*args, chunk) for chunk in chunks)
+        diffs = dict(pair for chunk in results for pair in chunk)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            futures = [pool.submit(_diff_named_files, *args, chunk) for chunk in chunks]
+            diffs = dict(pair for future in futures for pair in future.result())
+
+    for name in sorted(before_names | after_names):
+        if name not in after_names:
+            yield name, CHANGE_REMOVED, None
+        elif name not in before_names:
+            yield name, CHANGE_ADDED, None
+        else:
+            plan_diff = diffs[name]
+            yield name, UNCHANGED if plan_diff.identical else CHANGE_CHANGED, plan_diff
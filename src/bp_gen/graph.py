@@ -0,0 +1,266 @@
+"""Indexed, read-only view over a plan graph.
+
+A :class:`PlanGraphIndex` is built in one pass over a ``BusinessPlan`` (or a
+legacy ``models.PlanGraph``) and answers node and neighbour lookups in O(1),
+so callers no longer rebuild ID sets or scan ``links`` for every question.
+The module also provides iterative, linear-time algorithms (strongly
+connected components, reachability) over integer-numbered graphs.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bp_gen.models import PlanGraph
+from bp_gen.schemas import BusinessPlan
+
+NODE_TYPES = ("objective", "kpi", "initiative", "capability", "output")
+
+# BusinessPlan field holding the nodes of each type.
+SECTION_BY_NODE_TYPE = {
+    "objective": "objectives",
+    "kpi": "kpis",
+    "initiative": "initiatives",
+    "capability": "capabilities",
+    "output": "outputs",
+}
+
+# Endpoint type recorded for legacy links whose IDs match no node.
+UNKNOWN_NODE_TYPE = "unknown"
+
+Node = Tuple[str, str]
+
+_EMPTY: Tuple[Node, ...] = ()
+
+
+class PlanGraphIndex:
+    """ID registries, typed adjacency lists and degree counts for a plan.
+
+    ``nodes[node_type][node_id]`` maps to the model instance (the first one
+    when IDs repeat). ``forward[link_type][(from_type, from_id)]`` and
+    ``reverse[link_type][(to_type, to_id)]`` list neighbours as
+    ``(type, id)`` pairs in link order. Nodes reference the plan's own
+    objects and strings, so the index adds only the adjacency structure.
+    Returned neighbour sequences are shared and must not be mutated.
+    """
+
+    __slots__ = (
+        "nodes",
+        "forward",
+        "reverse",
+        "out_degree",
+        "in_degree",
+        "kpis_by_objective",
+    )
+
+    def __init__(self) -> None:
+        self.nodes: Dict[str, Dict[str, object]] = {node_type: {} for node_type in NODE_TYPES}
+        self.forward: Dict[str, Dict[Node, List[Node]]] = {}
+        self.reverse: Dict[str, Dict[Node, List[Node]]] = {}
+        self.out_degree: Dict[Node, int] = {}
+        self.in_degree: Dict[Node, int] = {}
+        self.kpis_by_objective: Dict[str, List[str]] = {}
+
+    @classmethod
+    def from_business_plan(cls, plan: BusinessPlan, links: bool = True) -> "PlanGraphIndex":
+        """Index ``plan``; with ``links=False`` only the ID registries are built."""
+        index = cls()
+        index._add_nodes("objective", plan.objectives or [])
+        index._add_kpis(plan.kpis or [])
+        index._add_nodes("initiative", plan.initiatives or [])
+        index._add_nodes("capability", plan.capabilities or [])
+        index._add_nodes("output", plan.outputs or [])
+        if not links:
+            return index
+        for link in plan.links:
+            index._add_edge(link.type, (link.from_type, link.from_id), (link.to_type, link.to_id))
+        return index
+
+    @classmethod
+    def from_plan_graph(cls, graph: PlanGraph) -> "PlanGraphIndex":
+        """Index a legacy plan graph; link endpoint types are resolved by ID."""
+        index = cls()
+        index._add_nodes("objective", graph.objectives)
+        index._add_kpis(graph.kpis)
+        index._add_nodes("initiative", graph.initiatives or [])
+        index._add_nodes("capability", graph.capabilities or [])
+        index._add_nodes("output", graph.outputs or [])
+
+        type_by_id: Dict[str, str] = {}
+        for node_type in reversed(NODE_TYPES):
+            type_by_id.update(dict.fromkeys(index.nodes[node_type], node_type))
+        for link in graph.links:
+            source = (type_by_id.get(link.source_id, UNKNOWN_NODE_TYPE), link.source_id)
+            target = (type_by_id.get(link.target_id, UNKNOWN_NODE_TYPE), link.target_id)
+            index._add_edge(link.type, source, target)
+        return index
+
+    def add_node(self, node_type: str, item: object) -> None:
+        """Index one node while a plan is being built; KPIs go through :meth:`add_kpi`."""
+        self.nodes[node_type].setdefault(item.id, item)
+
+    def add_kpi(self, kpi: object) -> None:
+        self.nodes["kpi"].setdefault(kpi.id, kpi)
+        self.kpis_by_objective.setdefault(kpi.objective_id, []).append(kpi.id)
+
+    def _add_nodes(self, node_type: str, items: Iterable[object]) -> None:
+        registry = self.nodes[node_type]
+        for item in items:
+            registry.setdefault(item.id, item)
+
+    def _add_kpis(self, kpis: Iterable[object]) -> None:
+        registry = self.nodes["kpi"]
+        by_objective = self.kpis_by_objective
+        for kpi in kpis:
+            registry.setdefault(kpi.id, kpi)
+            by_objective.setdefault(kpi.objective_id, []).append(kpi.id)
+
+    def _add_edge(self, link_type: str, source: Node, target: Node) -> None:
+        forward = self.forward.get(link_type)
+        if forward is None:
+            forward = self.forward[link_type] = {}
+            self.reverse[link_type] = {}
+        forward.setdefault(source, []).append(target)
+        self.reverse[link_type].setdefault(target, []).append(source)
+        self.out_degree[source] = self.out_degree.get(source, 0) + 1
+        self.in_degree[target] = self.in_degree.get(target, 0) + 1
+
+    def has(self, node_type: str, node_id: str) -> bool:
+        registry = self.nodes.get(node_type)
+        return registry is not None and node_id in registry
+
+    def get(self, node_type: str, node_id: str) -> Optional[object]:
+        registry = self.nodes.get(node_type)
+        return registry.get(node_id) if registry is not None else None
+
+    def successors(
+        self, node_type: str, node_id: str, link_type: Optional[str] = None
+    ) -> Sequence[Node]:
+        """Return nodes linked from ``(node_type, node_id)``, optionally for one link type."""
+        return self._neighbours(self.forward, (node_type, node_id), link_type)
+
+    def predecessors(
+        self, node_type: str, node_id: str, link_type: Optional[str] = None
+    ) -> Sequence[Node]:
+        """Return nodes linking to ``(node_type, node_id)``, optionally for one link type."""
+        return self._neighbours(self.reverse, (node_type, node_id), link_type)
+
+    def degree(self, node_type: str, node_id: str) -> Tuple[int, int]:
+        """Return ``(in_degree, out_degree)`` for a node."""
+        node = (node_type, node_id)
+        return self.in_degree.get(node, 0), self.out_degree.get(node, 0)
+
+    @staticmethod
+    def _neighbours(
+        adjacency: Dict[str, Dict[Node, List[Node]]],
+        node: Node,
+        link_type: Optional[str],
+    ) -> Sequence[Node]:
+        if link_type is not None:
+            return adjacency.get(link_type, {}).get(node, _EMPTY)
+        neighbours: List[Node] = []
+        for by_node in adjacency.values():
+            neighbours.extend(by_node.get(node, _EMPTY))
+        return neighbours
+
+
+# Integer-graph algorithms used by the validator's structure checks. Nodes are
+# numbered 0..n-1 and ``adjacency[n]`` lists successors; every traversal is
+# iterative so very large plans cannot hit the recursion limit.
+
+
+def strongly_connected_components(adjacency: Sequence[Sequence[int]]) -> List[List[int]]:
+    """Return the strongly connected components (Tarjan), each in O(V+E) total."""
+    count = len(adjacency)
+    order = [-1] * count
+    low = [0] * count
+    on_stack = bytearray(count)
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(count):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        # Explicit call stack of (node, next successor position).
+        work: List[Tuple[int, int]] = [(root, 0)]
+        while work:
+            node, position = work[-1]
+            successors = adjacency[node]
+            if position < len(successors):
+                work[-1] = (node, position + 1)
+                successor = successors[position]
+                if order[successor] == -1:
+                    order[successor] = low[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack[successor] = 1
+                    work.append((successor, 0))
+                elif on_stack[successor] and order[successor] < low[node]:
+                    low[node] = order[successor]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+            if low[node] == order[node]:
+                component: List[int] = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def reachable_from(adjacency: Sequence[Sequence[int]], sources: Iterable[int]) -> bytearray:
+    """Mark every node reachable from ``sources`` (sources included)."""
+    seen = bytearray(len(adjacency))
+    pending = []
+    for source in sources:
+        if not seen[source]:
+            seen[source] = 1
+            pending.append(source)
+    while pending:
+        for successor in adjacency[pending.pop()]:
+            if not seen[successor]:
+                seen[successor] = 1
+                pending.append(successor)
+    return seen
+
+
+def find_cycle(adjacency: Sequence[Sequence[int]], component: Sequence[int]) -> List[int]:
+    """Return a shortest cycle through the smallest node of ``component``.
+
+    The result starts and ends with that node. ``component`` must be a
+    strongly connected component with a cycle (more than one node, or a
+    self-loop).
+    """
+    members = set(component)
+    start = min(component)
+    parents: Dict[int, int] = {start: start}
+    frontier = [start]
+    while frontier:
+        following: List[int] = []
+        for node in frontier:
+            for successor in adjacency[node]:
+                if successor == start:
+                    path = [start]
+                    while node != start:
+                        path.append(node)
+                        node = parents[node]
+                    path.append(start)
+                    path.reverse()
+                    return path
+                if successor in members and successor not in parents:
+                    parents[successor] = node
+                    following.append(successor)
+        frontier = following
+    raise ValueError("component has no cycle")
@@ -0,0 +1,117 @@
+"""Entity tags and content encoding for ``/generate-plan`` responses.
+
+A generation result is fully determined by the normalized request, the
+generator (:data:`~bp_gen.services.plan_generator.GENERATOR_VERSION`) and the
+result schemas, all of which go into the request's cache key, so its ETag is
+computed from that key alone and a client's ``If-None-Match`` is answered
+without generating anything. Responses may be
+gzip-compressed; compression is deterministic, so each encoding of a result
+has its own stable strong ETag.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import zlib
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
+ENCODING_GZIP = "gzip"
+
+# Buffered bodies smaller than this are sent uncompressed.
+GZIP_MIN_BYTES = 512
+GZIP_LEVEL = 6
+# zlib window bits selecting a gzip wrapper (header time is always zero).
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def result_etag(key: str, encoding: Optional[str] = None) -> str:
+    """Strong ETag for the result of the request hashed to ``key``.
+
+    :func:`~bp_gen.services.cache.request_key` already covers the generator
+    and schema versions, so the tag changes whenever the result can.
+
+    ``encoding`` tags a compressed representation, whose bytes differ.
+    """
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def matching_etag(if_none_match: Optional[str], etags: Sequence[str]) -> Optional[str]:
+    """Return the first of ``etags`` listed in an ``If-None-Match`` header.
+
+    Comparison is weak, as RFC 9110 requires for ``If-None-Match``, and
+    ``*`` matches the first tag.
+    """
+    if not if_none_match:
+        return None
+    listed = set()
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return etags[0]
+        listed.add(tag[2:] if tag.startswith("W/") else tag)
+    for etag in etags:
+        if etag in listed:
+            return etag
+    return None
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an ``Accept-Encoding`` header allows a gzip response."""
+    if not accept_encoding:
+        return False
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            field, _, value = param.strip().partition("=")
+            if field == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    return qualities.get(ENCODING_GZIP, qualities.get("*", 0.0)) > 0
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Gzip a byte stream.
+
+    The output depends only on the concatenated input, not on how it is
+    chunked, so a streamed body matches the buffered one byte for byte.
+    """
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, _GZIP_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def gzip_body(body: bytes) -> bytes:
+    return b"".join(gzip_chunks((body,)))
+
+
+class ConditionalStats:
+    """Counts ``/generate-plan`` responses and those answered with ``304``."""
+
+    def __init__(self) -> None:
+        self.responses = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def record(self, not_modified: bool) -> None:
+        with self._lock:
+            self.responses += 1
+            self.not_modified += not_modified
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            responses = self.responses
+            not_modified = self.not_modified
+        return {
+            "responses": responses,
+            "not_modified": not_modified,
+            "not_modified_ratio": not_modified / responses if responses else 0.0,
+        }
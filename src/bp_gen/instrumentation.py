@@ -0,0 +1,107 @@
+"""Lightweight per-stage timing for the generation hot path.
+
+Timing is off unless ``BP_GEN_TIMINGS=1`` is set or :func:`enable_timings`
+is called. While off, :func:`stage` returns a shared no-op context manager,
+so instrumented code pays for one context-variable lookup per stage.
+"""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+_enabled = os.environ.get("BP_GEN_TIMINGS", "") not in ("", "0", "false")
+
+
+def timings_enabled() -> bool:
+    return _enabled
+
+
+def enable_timings(enabled: bool = True) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+class StageTimings:
+    """Ordered ``(stage, seconds)`` measurements for one request."""
+
+    __slots__ = ("stages", "started", "finished", "kind")
+
+    def __init__(self) -> None:
+        self.stages: List[Tuple[str, float]] = []
+        self.started = time.perf_counter()
+        # Set by a request handler when it returns and tags the result kind.
+        self.finished: Optional[float] = None
+        self.kind: Optional[str] = None
+
+    def record(self, name: str, seconds: float) -> None:
+        self.stages.append((name, seconds))
+
+    def server_timing(self) -> str:
+        """Format the measurements as a ``Server-Timing`` header value (ms)."""
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.stages)
+
+    def format(self) -> str:
+        return "\n".join(f"{name:<20} {seconds * 1000:>10.3f} ms" for name, seconds in self.stages)
+
+
+_current: ContextVar[Optional[StageTimings]] = ContextVar("bp_gen_stage_timings", default=None)
+
+
+class _Stage:
+    __slots__ = ("_timings", "_name", "_started")
+
+    def __init__(self, timings: StageTimings, name: str) -> None:
+        self._timings = timings
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._timings.record(self._name, time.perf_counter() - self._started)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str) -> _Stage | _NullStage:
+    """Time the enclosed block as ``name`` when a collector is active."""
+    timings = _current.get()
+    if timings is None:
+        return _NULL_STAGE
+    return _Stage(timings, name)
+
+
+def current_timings() -> Optional[StageTimings]:
+    """Return the collector active in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def activate(timings: Optional[StageTimings]) -> Iterator[Optional[StageTimings]]:
+    """Make ``timings`` the collector for stages run in this context."""
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Optional[StageTimings]]:
+    """Collect stage timings if enabled; yields ``None`` when timing is off."""
+    with activate(StageTimings() if _enabled else None) as timings:
+        yield timings
@@ -0,0 +1,157 @@
+"""Process-wide metrics rendered in the Prometheus text exposition format."""
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][position] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            snapshot = {
+                labels: (list(counts), total[0])
+                for labels, (counts, total) in self._series.items()
+            }
+        for label_values, (counts, total) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.label_names, label_values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += counts[-1]
+            labels = _format_labels(self.label_names, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def gauge_lines(
+    name: str,
+    documentation: str,
+    samples: Iterable[Tuple[Dict[str, str], float]],
+    metric_type: str = "gauge",
+) -> List[str]:
+    """Render a gauge or counter family from ``(labels, value)`` samples."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {value}")
+    return lines
+
+
+class MetricsRegistry:
+    """Holds histograms plus callbacks that render point-in-time metrics."""
+
+    def __init__(self) -> None:
+        self._histograms: List[Histogram] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, label_names, buckets)
+        self._histograms.append(histogram)
+        return histogram
+
+    def register_collector(self, collector: Callable[[], List[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "bp_gen_stage_duration_seconds",
+    "Time spent in each plan generation stage by result kind.",
+    ("stage", "kind"),
+)
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "bp_gen_request_duration_seconds",
+    "End-to-end /generate-plan latency by result kind.",
+    ("kind",),
+)
+
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "bp_gen_admission_wait_seconds",
+    "Time /generate-plan requests spent queued before admission.",
+    (),
+)
+
+# Powers of four from 256 B to 16 MiB.
+SIZE_BUCKETS = tuple(float(256 * 4**power) for power in range(9))
+
+RESPONSE_BYTES = REGISTRY.histogram(
+    "bp_gen_response_bytes",
+    "/generate-plan response body size by content encoding.",
+    ("encoding",),
+    SIZE_BUCKETS,
+)
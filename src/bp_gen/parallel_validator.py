@@ -0,0 +1,344 @@
+"""Sharded validation of very large plans across worker processes.
+
+:func:`validate_business_plan_parallel` returns exactly what
+:func:`bp_gen.validator.validate_business_plan` returns, with the per-KPI and
+per-link checks spread over a pool of forked workers. The ID registries are
+built once in the parent and registered with the plan before the pool
+starts; workers inherit both through ``fork`` and read them in place, so
+nothing is pickled or rebuilt per worker. Each shard reports into an
+:class:`~bp_gen.validator.OrderedValidationReport` keyed by the serial check
+order, and the merged report matches a serial run error for error.
+
+Relationship cardinality depends on every earlier link with the same
+endpoint, so it runs as a second phase: shards bucket bounded links by
+endpoint, and each worker counts whole buckets in link order.
+"""
+from __future__ import annotations
+
+import gc
+import multiprocessing
+import os
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import count
+from typing import AbstractSet, Dict, List, Optional, Tuple
+
+from bp_gen.deadlines import check_deadline
+from bp_gen.graph import PlanGraphIndex
+from bp_gen.relationships import CompiledRelationships
+from bp_gen.schemas import BusinessPlan, GenerationFlags
+from bp_gen.validator import (
+    FLAG_RULES,
+    RANK_FLAGS,
+    RANK_KPI_UNKNOWN_OBJECTIVE,
+    RANK_KPIS_REQUIRED,
+    RANK_LINKS,
+    RANK_OBJECTIVE_MISSING_KPI,
+    RANK_OBJECTIVES_REQUIRED,
+    RANK_STRUCTURE,
+    ErrorPath,
+    OrderedValidationReport,
+    _business_plan_graph,
+    _run_structure_checks,
+    validate_business_plan,
+)
+
+# Plans with fewer KPIs and links than this are validated serially; starting
+# the pool would cost more than it saves.
+PARALLEL_MIN_ITEMS = 100_000
+
+# Shards per worker, so one slow shard does not leave the others idle.
+SHARDS_PER_WORKER = 4
+
+# Link indices per worker bucket, in link order.
+_Buckets = List[array]
+
+
+@dataclass(frozen=True)
+class _SharedPlan:
+    plan: BusinessPlan
+    index: PlanGraphIndex
+    relationships: Optional[CompiledRelationships]
+    max_errors: Optional[int]
+
+
+# Plans being validated, by token. Forked workers inherit the registry as it
+# was when their pool started.
+_shared: Dict[int, _SharedPlan] = {}
+_shared_lock = threading.Lock()
+_tokens = count()
+
+
+def fork_available() -> bool:
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def validate_business_plan_parallel(
+    plan: BusinessPlan,
+    flags: GenerationFlags,
+    max_errors: Optional[int] = None,
+    relationships: Optional[CompiledRelationships] = None,
+    structure: bool = False,
+    workers: Optional[int] = None,
+    min_items: Optional[int] = None,
+) -> Dict[str, object]:
+    """Validate ``plan`` on ``workers`` processes (default: CPU count).
+
+    Arguments and result match :func:`validate_business_plan`; ``structure``
+    checks run in the parent once the shards are merged. Plans with fewer
+    than ``min_items`` (default :data:`PARALLEL_MIN_ITEMS`) KPIs and links,
+    ``workers=1`` and platforms without ``fork`` use the serial validator.
+    The request deadline is checked between phases.
+
+    Each call forks a fresh pool, so call it from a CLI or batch job rather
+    than from a process whose other threads may hold locks.
+    """
+    workers = workers or os.cpu_count() or 1
+    if min_items is None:
+        min_items = PARALLEL_MIN_ITEMS
+    kpis = plan.kpis or []
+    if workers == 1 or len(kpis) + len(plan.links) < min_items or not fork_available():
+        return validate_business_plan(
+            plan,
+            flags,
+            max_errors=max_errors,
+            relationships=relationships,
+            structure=structure,
+        )
+
+    check_deadline()
+    index = PlanGraphIndex.from_business_plan(plan, links=False)
+    report = OrderedValidationReport(max_errors=max_errors)
+    _check_plan(plan, flags, index, report)
+
+    token = next(_tokens)
+    with _shared_lock:
+        _shared[token] = _SharedPlan(plan, index, relationships, max_errors)
+    # Frozen objects are skipped by the collector, which would otherwise
+    # write to (and so copy) every inherited page in each worker.
+    gc.freeze()
+    try:
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            shards = workers * SHARDS_PER_WORKER
+            kpi_futures = [
+                pool.submit(_check_kpis, token, start, stop)
+                for start, stop in _shards(len(kpis), shards)
+            ]
+            link_futures = [
+                pool.submit(_check_links, token, start, stop, workers)
+                for start, stop in _shards(len(plan.links), shards)
+            ]
+            for future in kpi_futures:
+                report.merge(future.result())
+            sources: _Buckets = [array("q") for _ in range(workers)]
+            targets: _Buckets = [array("q") for _ in range(workers)]
+            for future in link_futures:
+                shard_report, shard_sources, shard_targets = future.result()
+                report.merge(shard_report)
+                for bucket, indices in enumerate(shard_sources):
+                    sources[bucket].extend(indices)
+                for bucket, indices in enumerate(shard_targets):
+                    targets[bucket].extend(indices)
+
+            # A link over its source limit is not counted against its target.
+            check_deadline()
+            violated = set()
+            for future in [
+                pool.submit(_count_cardinality, token, indices, True, frozenset())
+                for indices in sources
+                if indices
+            ]:
+                shard_report, shard_violated = future.result()
+                report.merge(shard_report)
+                violated.update(shard_violated)
+            excluded = frozenset(violated)
+            for future in [
+                pool.submit(_count_cardinality, token, indices, False, excluded)
+                for indices in targets
+                if indices
+            ]:
+                report.merge(future.result()[0])
+    finally:
+        gc.unfreeze()
+        with _shared_lock:
+            del _shared[token]
+
+    if structure:
+        check_deadline()
+        _run_structure_checks(*_business_plan_graph(plan), _StructureReport(report))
+    return report.as_result()
+
+
+def _shards(length: int, shards: int) -> List[Tuple[int, int]]:
+    size = max(1, -(-length // shards))
+    return [(start, min(start + size, length)) for start in range(0, length, size)]
+
+
+def _check_plan(
+    plan: BusinessPlan,
+    flags: GenerationFlags,
+    index: PlanGraphIndex,
+    report: OrderedValidationReport,
+) -> None:
+    # The plan-level checks of _run_business_plan_checks; all are O(objectives).
+    if not plan.objectives:
+        report.add_at(
+            (RANK_OBJECTIVES_REQUIRED, 0, 0, 0),
+            "objectives_required",
+            "At least one objective is required.",
+            (),
+            ("objectives", None, None),
+        )
+    if not plan.kpis:
+        report.add_at(
+            (RANK_KPIS_REQUIRED, 0, 0, 0),
+            "kpis_required",
+            "At least one KPI is required.",
+            (),
+            ("kpis", None, None),
+        )
+    for position, objective in enumerate(plan.objectives or []):
+        if objective.id not in index.kpis_by_objective:
+            report.add_at(
+                (RANK_OBJECTIVE_MISSING_KPI, position, 0, 0),
+                "objective_missing_kpi",
+                "Objective '{}' must have at least one KPI.",
+                (objective.id,),
+                ("objectives", position, "id"),
+            )
+    for position, (section, flag, code, label) in enumerate(FLAG_RULES):
+        if not getattr(flags, flag) and getattr(plan, section):
+            report.add_at(
+                (RANK_FLAGS, position, 0, 0),
+                code,
+                f"{label} are present but disabled by flags.",
+                (),
+                (section, None, None),
+            )
+
+
+def _check_kpis(token: int, start: int, stop: int) -> OrderedValidationReport:
+    shared = _shared[token]
+    report = OrderedValidationReport(max_errors=shared.max_errors)
+    objective_ids = shared.index.nodes["objective"]
+    kpis = shared.plan.kpis
+    for index in range(start, stop):
+        kpi = kpis[index]
+        if kpi.objective_id not in objective_ids:
+            report.add_at(
+                (RANK_KPI_UNKNOWN_OBJECTIVE, index, 0, 0),
+                "kpi_unknown_objective",
+                "KPI '{}' references unknown objective '{}'.",
+                (kpi.id, kpi.objective_id),
+                ("kpis", index, "objective_id"),
+            )
+    return report
+
+
+def _check_links(
+    token: int, start: int, stop: int, buckets: int
+) -> Tuple[OrderedValidationReport, _Buckets, _Buckets]:
+    shared = _shared[token]
+    report = OrderedValidationReport(max_errors=shared.max_errors)
+    add_at = report.add_at
+    id_registry = shared.index.nodes
+    relationships = shared.relationships
+    table = None if relationships is None else relationships.table
+    sources: _Buckets = [array("q") for _ in range(buckets)]
+    targets: _Buckets = [array("q") for _ in range(buckets)]
+    links = shared.plan.links
+    for index in range(start, stop):
+        link = links[index]
+        from_ids = id_registry.get(link.from_type)
+        if from_ids is None:
+            add_at(
+                (RANK_LINKS, index, 0, 0),
+                "link_unknown_type",
+                "Link from_type '{}' is not recognized.",
+                (link.from_type,),
+                ("links", index, "from_type"),
+            )
+        elif link.from_id not in from_ids:
+            add_at(
+                (RANK_LINKS, index, 0, 0),
+                "link_unknown_id",
+                "Link from_id '{}' not found for type '{}'.",
+                (link.from_id, link.from_type),
+                ("links", index, "from_id"),
+            )
+
+        to_ids = id_registry.get(link.to_type)
+        if to_ids is None:
+            add_at(
+                (RANK_LINKS, index, 1, 0),
+                "link_unknown_type",
+                "Link to_type '{}' is not recognized.",
+                (link.to_type,),
+                ("links", index, "to_type"),
+            )
+        elif link.to_id not in to_ids:
+            add_at(
+                (RANK_LINKS, index, 1, 0),
+                "link_unknown_id",
+                "Link to_id '{}' not found for type '{}'.",
+                (link.to_id, link.to_type),
+                ("links", index, "to_id"),
+            )
+
+        if table is None:
+            continue
+        rule = table.get((link.type, link.from_type, link.to_type))
+        if rule is None:
+            violation = relationships.type_violation(link.type, link.from_type, link.to_type)
+            if violation is not None:
+                code, template, args, field = violation
+                add_at((RANK_LINKS, index, 2, 0), code, template, args, ("links", index, field))
+            continue
+        # Every link counted against one endpoint lands in the same bucket.
+        if rule.max_sources is not None:
+            sources[hash((rule.name, link.to_id)) % buckets].append(index)
+        if rule.max_targets is not None:
+            targets[hash((rule.name, link.from_id)) % buckets].append(index)
+    return report, sources, targets
+
+
+def _count_cardinality(
+    token: int, indices: array, into: bool, excluded: AbstractSet[int]
+) -> Tuple[OrderedValidationReport, array]:
+    """Count links into (``into``) or out of their endpoints, in link order."""
+    shared = _shared[token]
+    report = OrderedValidationReport(max_errors=shared.max_errors)
+    relationships = shared.relationships
+    table = relationships.table
+    checker = relationships.checker()
+    links = shared.plan.links
+    violated = array("q")
+    for index in indices:
+        if index in excluded:
+            continue
+        link = links[index]
+        rule = table[(link.type, link.from_type, link.to_type)]
+        if into:
+            violation = checker.count_source(rule, link.to_type, link.to_id)
+        else:
+            violation = checker.count_target(rule, link.from_type, link.from_id)
+        if violation is not None:
+            code, template, args, field = violation
+            report.add_at((RANK_LINKS, index, 2, 0), code, template, args, ("links", index, field))
+            violated.append(index)
+    return report, violated
+
+
+class _StructureReport:
+    """Feeds the serial structure checks into an ordered report, after every link check."""
+
+    def __init__(self, report: OrderedValidationReport) -> None:
+        self._report = report
+        self._position = 0
+
+    def add(self, code: str, template: str, args: Tuple[object, ...], path: ErrorPath) -> None:
+        self._report.add_at((RANK_STRUCTURE, self._position, 0, 0), code, template, args, path)
+        self._position += 1
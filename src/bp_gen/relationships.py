@@ -0,0 +1,169 @@
+"""Relationship schema and the per-request rule table compiled from it.
+
+``RELATIONSHIP_SCHEMA`` maps each known relationship name to the node types
+it connects and its cardinality. :func:`compile_relationships` turns a
+request's ``allowed_relationships`` into a :class:`CompiledRelationships`
+whose table is keyed by ``(type, from_type, to_type)``, so checking a link
+is a single dictionary probe plus, for bounded relationships, a counter
+update.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Sequence, Tuple
+
+# Cardinality bound meaning "any number".
+MANY: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class RelationshipRule:
+    """Endpoint types and cardinality for one relationship name.
+
+    ``max_sources`` bounds how many links of this type may point at one
+    target node; ``max_targets`` bounds how many may leave one source node.
+    """
+
+    name: str
+    from_type: str
+    to_type: str
+    max_sources: Optional[int] = MANY
+    max_targets: Optional[int] = MANY
+
+
+RELATIONSHIP_SCHEMA: Dict[str, RelationshipRule] = {
+    rule.name: rule
+    for rule in (
+        # A KPI measures exactly one objective.
+        RelationshipRule("objective_to_kpi", "objective", "kpi", max_sources=1),
+        RelationshipRule("objective_to_initiative", "objective", "initiative"),
+        RelationshipRule("initiative_to_capability", "initiative", "capability"),
+        # An output is delivered by a single initiative.
+        RelationshipRule("initiative_to_output", "initiative", "output", max_sources=1),
+        RelationshipRule("kpi_to_initiative", "kpi", "initiative"),
+        RelationshipRule("capability_to_output", "capability", "output"),
+    )
+}
+
+# (code, message template, template args, offending link field)
+Violation = Tuple[str, str, Tuple[object, ...], str]
+
+
+class CompiledRelationships:
+    """Lookup table for one ``allowed_relationships`` list.
+
+    Allowed names missing from ``RELATIONSHIP_SCHEMA`` have no known
+    endpoints and are accepted between any node types.
+    """
+
+    __slots__ = ("allowed", "table", "_by_endpoints")
+
+    def __init__(self, allowed: Sequence[str]) -> None:
+        self.allowed: FrozenSet[str] = frozenset(allowed)
+        # (type, from_type, to_type) -> rule for every well-typed allowed link.
+        self.table: Dict[Tuple[str, str, str], RelationshipRule] = {}
+        # (from_type, to_type) -> first allowed relationship name, in request order.
+        self._by_endpoints: Dict[Tuple[str, str], str] = {}
+        for name in allowed:
+            rule = RELATIONSHIP_SCHEMA.get(name)
+            if rule is None:
+                continue
+            self.table[(name, rule.from_type, rule.to_type)] = rule
+            self._by_endpoints.setdefault((rule.from_type, rule.to_type), name)
+
+    def relationship_for(self, from_type: str, to_type: str) -> Optional[str]:
+        """Return the allowed relationship name connecting the two node types."""
+        return self._by_endpoints.get((from_type, to_type))
+
+    def type_violation(self, link_type: str, from_type: str, to_type: str) -> Optional[Violation]:
+        """Return the rule broken by a link type missing from :attr:`table`, if any."""
+        if link_type not in self.allowed:
+            return (
+                "relationship_not_allowed",
+                "Link type '{}' is not in allowed_relationships.",
+                (link_type,),
+                "type",
+            )
+        expected = RELATIONSHIP_SCHEMA.get(link_type)
+        if expected is None:
+            return None
+        return (
+            "relationship_endpoint_mismatch",
+            "Link type '{}' must connect {} to {}, found {} to {}.",
+            (link_type, expected.from_type, expected.to_type, from_type, to_type),
+            "type",
+        )
+
+    def checker(self) -> "RelationshipChecker":
+        return RelationshipChecker(self)
+
+
+class RelationshipChecker:
+    """Checks links one at a time, tracking cardinality across calls."""
+
+    __slots__ = ("_compiled", "_sources", "_targets")
+
+    def __init__(self, compiled: CompiledRelationships) -> None:
+        self._compiled = compiled
+        self._sources: Dict[Tuple[str, str], int] = {}
+        self._targets: Dict[Tuple[str, str], int] = {}
+
+    def check(
+        self,
+        link_type: str,
+        from_type: str,
+        from_id: str,
+        to_type: str,
+        to_id: str,
+    ) -> Optional[Violation]:
+        """Return the first rule this link breaks, or ``None``."""
+        compiled = self._compiled
+        rule = compiled.table.get((link_type, from_type, to_type))
+        if rule is None:
+            return compiled.type_violation(link_type, from_type, to_type)
+        if rule.max_sources is not None:
+            violation = self.count_source(rule, to_type, to_id)
+            if violation is not None:
+                return violation
+        if rule.max_targets is not None:
+            return self.count_target(rule, from_type, from_id)
+        return None
+
+    def count_source(self, rule: RelationshipRule, to_type: str, to_id: str) -> Optional[Violation]:
+        """Count a link into ``to_id`` against ``rule.max_sources``."""
+        key = (rule.name, to_id)
+        count = self._sources[key] = self._sources.get(key, 0) + 1
+        if count > rule.max_sources:
+            return (
+                "relationship_cardinality",
+                "Link type '{}' allows at most {} link(s) into {} '{}'.",
+                (rule.name, rule.max_sources, to_type, to_id),
+                "to_id",
+            )
+        return None
+
+    def count_target(
+        self, rule: RelationshipRule, from_type: str, from_id: str
+    ) -> Optional[Violation]:
+        """Count a link out of ``from_id`` against ``rule.max_targets``."""
+        key = (rule.name, from_id)
+        count = self._targets[key] = self._targets.get(key, 0) + 1
+        if count > rule.max_targets:
+            return (
+                "relationship_cardinality",
+                "Link type '{}' allows at most {} link(s) out of {} '{}'.",
+                (rule.name, rule.max_targets, from_type, from_id),
+                "from_id",
+            )
+        return None
+
+
+@lru_cache(maxsize=256)
+def _compile(allowed: Tuple[str, ...]) -> CompiledRelationships:
+    return CompiledRelationships(allowed)
+
+
+def compile_relationships(allowed: Sequence[str]) -> CompiledRelationships:
+    """Compile (or reuse) the rule table for an ``allowed_relationships`` list."""
+    return _compile(tuple(allowed))
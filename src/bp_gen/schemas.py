@@ -1,9 +1,34 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Type, TypeVar
 
 from pydantic import BaseModel, Field
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Strict construction runs full pydantic validation for internally built
+# models; tests enable it so the trusted fast path cannot drift from the schema.
+_strict_construction = os.environ.get("BP_GEN_STRICT_MODELS", "") not in ("", "0", "false")
+
+
+def set_strict_construction(enabled: bool) -> None:
+    global _strict_construction
+    _strict_construction = enabled
+
+
+def construct_trusted(model: Type[ModelT], **fields: object) -> ModelT:
+    """Build a model from values the caller guarantees already match its schema.
+
+    Skips validation via ``model_construct`` unless strict construction is on.
+    """
+    if _strict_construction:
+        return model(**fields)
+    return model.model_construct(**fields)
+
 
 class PlanMeta(BaseModel):
     """Top-level plan metadata for the business plan graph."""
@@ -150,3 +175,14 @@ class GenerationErrorResponse(BaseModel):
 
     errors: List[Dict[str, str]] = Field(default_factory=list)
     required_user_inputs: List[str] = Field(default_factory=list)
+
+
+@lru_cache(maxsize=None)
+def result_schema_version() -> str:
+    """Digest of the JSON schemas of every plan generation result type."""
+    schemas = [
+        model.model_json_schema()
+        for model in (BusinessPlan, ClarifyingQuestions, GenerationErrorResponse)
+    ]
+    canonical = json.dumps(schemas, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
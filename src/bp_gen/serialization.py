@@ -0,0 +1,157 @@
+"""Direct JSON serialization of already-validated results.
+
+Besides whole-document serialization, :func:`iter_result_json` streams a
+result section by section and node by node, so large plans are written to a
+file or socket without first building the whole dict tree or JSON string.
+"""
+from __future__ import annotations
+
+import json
+import os
+import stat
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+# Bytes buffered before a chunk is yielded by ``iter_result_json``.
+STREAM_CHUNK_SIZE = 1 << 16
+# List nodes serialized per call; one call per node spends most of its time
+# crossing into the serializer.
+STREAM_BATCH_SIZE = 256
+
+
+def result_json(result: BaseModel) -> bytes:
+    """Serialize a result with its class's compiled serializer, omitting ``None`` fields.
+
+    The result is not re-validated, unlike FastAPI's ``response_model`` path.
+    """
+    return type(result).__pydantic_serializer__.to_json(result, exclude_none=True)
+
+
+def result_record_line(fields: Dict[str, object], result: BaseModel) -> str:
+    """Return a JSONL line holding ``fields`` plus the serialized ``result``."""
+    head = json.dumps(fields)[:-1]
+    separator = ", " if fields else ""
+    return f'{head}{separator}"result": {result_json(result).decode("utf-8")}}}'
+
+
+def _node_json(node: object, indent: Optional[int], depth: int) -> bytes:
+    data = to_json(node, indent=indent, exclude_none=True)
+    if indent is None:
+        return data
+    # Pretty-printed JSON never has raw newlines inside strings, so nesting
+    # the node is a matter of indenting every line after the first.
+    return data.replace(b"\n", b"\n" + b" " * (indent * depth))
+
+
+def _nodes_json(nodes: List[object], indent: Optional[int]) -> bytes:
+    """Serialize list items at depth 2, without the surrounding brackets."""
+    data = to_json(nodes, indent=indent, exclude_none=True)
+    if indent is None:
+        return data[1:-1]
+    # Strip "[\n" and "\n]"; items come back indented one level too shallow.
+    return data[2:-2].replace(b"\n", b"\n" + b" " * indent)
+
+
+def iter_result_json(
+    result: BaseModel,
+    indent: Optional[int] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yield the JSON serialization of ``result`` in chunks of about ``chunk_size`` bytes.
+
+    Top-level lists (``objectives``, ``kpis``, ``links``, ...) are serialized
+    a batch of nodes at a time, so memory stays bounded by the largest batch
+    rather than the whole document. With ``indent=None`` the output is compact and
+    byte-identical to :func:`result_json`; ``None`` fields are omitted.
+    """
+    newline = b"" if indent is None else b"\n"
+    pad = b"" if indent is None else b" " * indent
+    colon = b":" if indent is None else b": "
+    buffer: List[bytes] = [b"{"]
+    size = 1
+    first_field = True
+    for name in type(result).model_fields:
+        value = getattr(result, name)
+        if value is None:
+            continue
+        head = (b"" if first_field else b",") + newline + pad + json.dumps(name).encode() + colon
+        first_field = False
+        if not isinstance(value, list):
+            part = head + _node_json(value, indent, 1)
+        elif not value:
+            part = head + b"[]"
+        else:
+            part = head + b"["
+        buffer.append(part)
+        size += len(part)
+        if not isinstance(value, list) or not value:
+            continue
+        for start in range(0, len(value), STREAM_BATCH_SIZE):
+            nodes = value[start : start + STREAM_BATCH_SIZE]
+            part = (b"," if start else b"") + newline + pad + _nodes_json(nodes, indent)
+            buffer.append(part)
+            size += len(part)
+            if size >= chunk_size:
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+        buffer.append(newline + pad + b"]")
+        size += len(buffer[-1])
+    buffer.append(newline + b"}")
+    yield b"".join(buffer)
+
+
+def dump_result(result: BaseModel, handle: BinaryIO, indent: Optional[int] = None) -> None:
+    """Stream ``result`` as JSON to a binary file or socket file object."""
+    for chunk in iter_result_json(result, indent=indent):
+        handle.write(chunk)
+
+
+def _file_mode(path: Path) -> int:
+    """Mode for a file written to ``path``: the existing file's, else umask-derived."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        # The umask can only be read by setting it.
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_result_json(
+    result: BaseModel,
+    path: Path,
+    indent: Optional[int] = None,
+    atomic: bool = True,
+) -> None:
+    """Stream ``result`` as JSON to ``path``.
+
+    With ``atomic`` the document is written to a temporary file next to
+    ``path`` and renamed over it once complete, so readers never observe a
+    partially written plan. The file keeps the mode it had, or gets the
+    usual umask-derived mode if it is new.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not atomic:
+        with path.open("wb") as handle:
+            dump_result(result, handle, indent)
+        return
+    handle = tempfile.NamedTemporaryFile(
+        "wb", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    )
+    try:
+        with handle:
+            dump_result(result, handle, indent)
+            handle.flush()
+            # Temporary files are created owner-only.
+            os.fchmod(handle.fileno(), _file_mode(path))
+            os.fsync(handle.fileno())
+        os.replace(handle.name, path)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
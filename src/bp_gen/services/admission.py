@@ -0,0 +1,262 @@
+"""Admission control in front of API plan generation and validation.
+
+At most ``max_concurrency`` requests generate at once; the rest wait in a
+bounded FIFO queue for at most ``max_queue_wait`` seconds (or their own
+deadline, if sooner). A client may hold at most ``max_per_client`` running or
+queued requests. Anything beyond those limits is shed immediately with
+:class:`AdmissionRejected`, which carries the HTTP status (429 for a client
+over its limit, 503 when the service is saturated) and a ``Retry-After``
+hint, so load degrades gracefully instead of growing every request's latency.
+
+The API queues with :meth:`AdmissionController.admit_async`, so a waiting
+request holds no server thread; sync callers use
+:meth:`AdmissionController.admit`. Both wait in the same queue.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Deque, Dict, Iterator, Optional
+
+from bp_gen.deadlines import remaining_seconds
+
+SHED_CLIENT_LIMIT = "client_limit"
+SHED_QUEUE_FULL = "queue_full"
+SHED_QUEUE_TIMEOUT = "queue_timeout"
+# Admitted work abandoned because the request deadline passed.
+SHED_DEADLINE = "deadline_exceeded"
+SHED_REASONS = (SHED_CLIENT_LIMIT, SHED_QUEUE_FULL, SHED_QUEUE_TIMEOUT, SHED_DEADLINE)
+
+DEFAULT_MAX_QUEUE = 128
+DEFAULT_MAX_QUEUE_WAIT = 10.0
+
+# Weight of the newest sample in the moving average of service time.
+_SERVICE_TIME_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    """A request was shed; ``status_code`` and ``retry_after`` shape the response."""
+
+    def __init__(self, reason: str, status_code: int, retry_after: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class _AsyncTicket:
+    """A queued coroutine, woken on its own event loop from any thread."""
+
+    __slots__ = ("loop", "event")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.event = asyncio.Event()
+
+    def wake(self) -> None:
+        self.loop.call_soon_threadsafe(self.event.set)
+
+
+class AdmissionController:
+    """Bounded FIFO admission with per-client limits; see the module docstring.
+
+    ``max_per_client=None`` disables the per-client limit.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_queue_wait: float = DEFAULT_MAX_QUEUE_WAIT,
+        max_per_client: Optional[int] = None,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.max_per_client = max_per_client
+        self._condition = threading.Condition()
+        self._active = 0
+        self._queue: Deque[object] = deque()
+        self._per_client: Dict[str, int] = {}
+        self._service_seconds = 0.0
+        self.admitted = 0
+        self.shed: Dict[str, int] = dict.fromkeys(SHED_REASONS, 0)
+
+    def _retry_after(self) -> int:
+        # Time for the current queue to drain at the observed service rate.
+        backlog = len(self._queue) + 1
+        return max(1, math.ceil(self._service_seconds * backlog / self.max_concurrency))
+
+    def _reject(self, reason: str, status_code: int) -> AdmissionRejected:
+        self.shed[reason] += 1
+        return AdmissionRejected(reason, status_code, self._retry_after())
+
+    def _release_client(self, client: str) -> None:
+        count = self._per_client[client] - 1
+        if count:
+            self._per_client[client] = count
+        else:
+            del self._per_client[client]
+
+    def _enter(self, client: str) -> bool:
+        """Take a free slot (``True``) or room in the queue (``False``), or shed.
+
+        Called with the lock held; a queued client is counted against its limit.
+        """
+        if (
+            self.max_per_client is not None
+            and self._per_client.get(client, 0) >= self.max_per_client
+        ):
+            raise self._reject(SHED_CLIENT_LIMIT, 429)
+        if self._active < self.max_concurrency and not self._queue:
+            self._active += 1
+            self._per_client[client] = self._per_client.get(client, 0) + 1
+            self.admitted += 1
+            return True
+        if len(self._queue) >= self.max_queue:
+            raise self._reject(SHED_QUEUE_FULL, 503)
+        self._per_client[client] = self._per_client.get(client, 0) + 1
+        return False
+
+    def _queue_timeout(self) -> float:
+        timeout = self.max_queue_wait
+        remaining = remaining_seconds()
+        if remaining is not None:
+            timeout = min(timeout, max(0.0, remaining))
+        return timeout
+
+    def _ready(self, ticket: object) -> bool:
+        return self._queue[0] is ticket and self._active < self.max_concurrency
+
+    def _leave_queue(self, ticket: object, client: str, admitted: bool) -> None:
+        self._queue.remove(ticket)
+        if admitted:
+            self._active += 1
+            self.admitted += 1
+        else:
+            self._release_client(client)
+        # The next waiter may now be at the head with a free slot.
+        self._notify()
+
+    def _notify(self) -> None:
+        self._condition.notify_all()
+        if self._queue and isinstance(self._queue[0], _AsyncTicket):
+            self._queue[0].wake()
+
+    def acquire(self, client: str) -> float:
+        """Wait for a generation slot and return the seconds spent queued."""
+        with self._condition:
+            if self._enter(client):
+                return 0.0
+            ticket = object()
+            self._queue.append(ticket)
+            started = time.monotonic()
+            admitted = self._condition.wait_for(
+                lambda: self._ready(ticket), timeout=self._queue_timeout()
+            )
+            self._leave_queue(ticket, client, admitted)
+            if not admitted:
+                raise self._reject(SHED_QUEUE_TIMEOUT, 503)
+            return time.monotonic() - started
+
+    async def acquire_async(self, client: str) -> float:
+        """Like :meth:`acquire`, but queues on the event loop instead of a thread."""
+        with self._condition:
+            if self._enter(client):
+                return 0.0
+            ticket = _AsyncTicket(asyncio.get_running_loop())
+            self._queue.append(ticket)
+        timeout = self._queue_timeout()
+        started = time.monotonic()
+        admitted = False
+        try:
+            while True:
+                with self._condition:
+                    if self._ready(ticket):
+                        admitted = True
+                        break
+                    ticket.event.clear()
+                left = timeout - (time.monotonic() - started)
+                if left <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(ticket.event.wait(), left)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._condition:
+                self._leave_queue(ticket, client, admitted)
+        if not admitted:
+            with self._condition:
+                raise self._reject(SHED_QUEUE_TIMEOUT, 503)
+        return time.monotonic() - started
+
+    def record_deadline_exceeded(self) -> None:
+        with self._condition:
+            self.shed[SHED_DEADLINE] += 1
+
+    def release(self, client: str, service_seconds: float) -> None:
+        with self._condition:
+            self._active -= 1
+            self._release_client(client)
+            self._service_seconds += _SERVICE_TIME_SMOOTHING * (
+                service_seconds - self._service_seconds
+            )
+            self._notify()
+
+    @contextmanager
+    def admit(self, client: str) -> Iterator[float]:
+        """Hold a generation slot for the block; yields the queue wait in seconds."""
+        waited = self.acquire(client)
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(client, time.monotonic() - started)
+
+    @asynccontextmanager
+    async def admit_async(self, client: str) -> AsyncIterator[float]:
+        """:meth:`admit` for coroutines, queueing without holding a thread."""
+        waited = await self.acquire_async(client)
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(client, time.monotonic() - started)
+
+    def stats(self) -> Dict[str, object]:
+        with self._condition:
+            return {
+                "active": self._active,
+                "queued": len(self._queue),
+                "clients": len(self._per_client),
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+                "service_seconds": self._service_seconds,
+            }
+
+
+def _env_number(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.environ.get(name, "")
+    return float(value) if value else default
+
+
+def admission_from_env(default_concurrency: int) -> AdmissionController:
+    """Build a controller configured by the ``BP_GEN_MAX_*`` environment variables.
+
+    ``BP_GEN_MAX_CONCURRENCY`` (default ``default_concurrency``),
+    ``BP_GEN_MAX_QUEUE``, ``BP_GEN_MAX_QUEUE_WAIT`` (seconds) and
+    ``BP_GEN_MAX_PER_CLIENT`` (unset means unlimited).
+    """
+    max_per_client = _env_number("BP_GEN_MAX_PER_CLIENT", None)
+    return AdmissionController(
+        max_concurrency=int(_env_number("BP_GEN_MAX_CONCURRENCY", default_concurrency)),
+        max_queue=int(_env_number("BP_GEN_MAX_QUEUE", DEFAULT_MAX_QUEUE)),
+        max_queue_wait=_env_number("BP_GEN_MAX_QUEUE_WAIT", DEFAULT_MAX_QUEUE_WAIT),
+        max_per_client=None if max_per_client is None else int(max_per_client),
+    )
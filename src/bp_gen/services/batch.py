@@ -0,0 +1,185 @@
+"""Batch plan generation across a pool of worker processes."""
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from pydantic import ValidationError
+
+from bp_gen.schemas import GeneratePlanRequest, GenerationErrorResponse
+from bp_gen.serialization import result_record_line
+from bp_gen.services.cache import configure_default_cache, generate_plan_cached, request_key
+from bp_gen.services.plan_generator import (
+    STATUS_CLARIFYING_QUESTIONS,
+    STATUS_ERRORS,
+    STATUS_PLAN,
+    result_status,
+)
+from bp_gen.services.plan_store import DEFAULT_INSERT_BATCH, PlanStore
+
+
+# Records submitted to the pool but not yet written, per worker. Keeps memory
+# bounded no matter how large the input is.
+IN_FLIGHT_PER_WORKER = 4
+
+
+def invalid_request_result(exc: Exception) -> GenerationErrorResponse:
+    """Describe an input record that could not be parsed as a request."""
+    if isinstance(exc, ValidationError):
+        errors = [
+            {
+                "code": "invalid_request",
+                "message": error["msg"],
+                "path": ".".join(str(part) for part in error["loc"]),
+            }
+            for error in exc.errors()
+        ]
+    else:
+        errors = [{"code": "invalid_request", "message": str(exc), "path": ""}]
+    return GenerationErrorResponse(
+        errors=errors,
+        required_user_inputs=["Provide a valid GeneratePlanRequest payload."],
+    )
+
+
+def generate_record(
+    source: str,
+    raw: str,
+    use_cache: bool = True,
+) -> Tuple[str, str, Optional[str]]:
+    """Generate a plan for one raw JSON payload.
+
+    Returns ``(status, jsonl_line, request_hash)``; the hash is ``None`` when
+    the payload is not a valid request.
+    """
+    key = None
+    try:
+        request = GeneratePlanRequest.model_validate_json(raw)
+    except (ValidationError, ValueError) as exc:
+        result = invalid_request_result(exc)
+    else:
+        key = request_key(request)
+        result = generate_plan_cached(request, bypass=not use_cache)
+
+    status = result_status(result)
+    return status, result_record_line({"source": source, "status": status}, result), key
+
+
+def iter_payloads(path: Path) -> Iterator[Tuple[str, str]]:
+    """Yield ``(source, raw_json)`` pairs from a JSONL file or a directory of JSON files.
+
+    Records are read lazily so the input never has to fit in memory.
+    """
+    if path.is_dir():
+        for file_path in sorted(path.glob("*.json")):
+            yield file_path.name, file_path.read_text()
+        return
+
+    with path.open() as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if line.strip():
+                yield f"{path.name}:{line_number}", line
+
+
+@dataclass
+class BatchSummary:
+    """Counts and throughput for a finished batch run."""
+
+    counts: Dict[str, int] = field(
+        default_factory=lambda: {
+            STATUS_PLAN: 0,
+            STATUS_CLARIFYING_QUESTIONS: 0,
+            STATUS_ERRORS: 0,
+        }
+    )
+    elapsed_seconds: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def records_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.total / self.elapsed_seconds
+
+    def format(self) -> str:
+        breakdown = ", ".join(f"{status}={count}" for status, count in self.counts.items())
+        return (
+            f"Processed {self.total} records in {self.elapsed_seconds:.2f}s "
+            f"({self.records_per_second:.1f} records/s): {breakdown}"
+        )
+
+
+def run_batch(
+    payloads: Iterable[Tuple[str, str]],
+    output: TextIO,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+    cache_path: Optional[Path] = None,
+    store: Optional[PlanStore] = None,
+) -> BatchSummary:
+    """Generate plans for ``payloads`` and write one JSONL record per input.
+
+    Records are written as they finish, so output order follows completion
+    order rather than input order; each record carries its ``source``. With
+    ``workers=1`` generation runs inline without a process pool. Every worker
+    keeps its own in-memory cache; pass ``cache_path`` to share an on-disk tier.
+    With a ``store``, generated plans are also inserted into it from this
+    process in batched transactions.
+    """
+    workers = workers or os.cpu_count() or 1
+    summary = BatchSummary()
+    started = time.perf_counter()
+    to_store: List[Tuple[Dict[str, object], Optional[str]]] = []
+
+    def flush() -> None:
+        if to_store:
+            store.add_many(to_store)
+            to_store.clear()
+
+    def emit(status: str, line: str, key: Optional[str]) -> None:
+        summary.counts[status] += 1
+        output.write(line + "\n")
+        if store is not None and status == STATUS_PLAN:
+            to_store.append((json.loads(line)["result"], key))
+            if len(to_store) >= DEFAULT_INSERT_BATCH:
+                flush()
+
+    if workers == 1:
+        if cache_path is not None:
+            configure_default_cache(path=cache_path)
+        for source, raw in payloads:
+            emit(*generate_record(source, raw, use_cache))
+    else:
+        max_in_flight = workers * IN_FLIGHT_PER_WORKER
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=configure_default_cache,
+            initargs=(None, None, cache_path),
+        ) as pool:
+            pending: Set[Future] = set()
+            for source, raw in payloads:
+                pending.add(pool.submit(generate_record, source, raw, use_cache))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        emit(*future.result())
+            for future in as_completed(pending):
+                emit(*future.result())
+    flush()
+
+    summary.elapsed_seconds = time.perf_counter() - started
+    return summary
@@ -0,0 +1,315 @@
+"""Content-addressed result cache for plan generation.
+
+``generate_plan`` is deterministic for a given request, so results are keyed
+by a hash of the normalized request. Entries live in an in-memory LRU with an
+optional SQLite tier that survives restarts and can be shared between the CLI
+and the API.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from bp_gen.instrumentation import stage
+from bp_gen.schemas import (
+    BusinessPlan,
+    ClarifyingQuestions,
+    GeneratePlanRequest,
+    GenerationErrorResponse,
+    result_schema_version,
+)
+from bp_gen.services.plan_generator import (
+    GENERATOR_VERSION,
+    STATUS_CLARIFYING_QUESTIONS,
+    STATUS_ERRORS,
+    STATUS_PLAN,
+    generate_plan,
+    result_status,
+)
+
+# Bump when the stored entry format changes. Generator output changes are
+# covered by GENERATOR_VERSION and result_schema_version(), which are also
+# part of every key, so stale on-disk entries are never served.
+CACHE_FORMAT_VERSION = "1"
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_DISK_ENTRIES = 100_000
+# Seconds between sweeps of expired and surplus rows from the SQLite tier.
+DISK_PURGE_INTERVAL = 60.0
+
+_RESULT_TYPES: Dict[str, Type[BaseModel]] = {
+    STATUS_PLAN: BusinessPlan,
+    STATUS_CLARIFYING_QUESTIONS: ClarifyingQuestions,
+    STATUS_ERRORS: GenerationErrorResponse,
+}
+
+PlanResult = BusinessPlan | ClarifyingQuestions | GenerationErrorResponse
+
+
+def request_key(request: GeneratePlanRequest) -> str:
+    """Return a canonical hash of the normalized request.
+
+    Defaults are filled in before hashing, so payloads that differ only by
+    omitted default values share a key. The generator and result schema
+    versions are hashed in too, so a new build never reuses old results.
+    """
+    canonical = json.dumps(
+        request.model_dump(mode="json"),
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    versions = f"{CACHE_FORMAT_VERSION}:{GENERATOR_VERSION}:{result_schema_version()}"
+    digest = hashlib.sha256(f"{versions}:{canonical}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PlanCache:
+    """LRU cache of generation results with optional TTL and SQLite tier.
+
+    Results are stored serialized and rebuilt on every hit, so callers always
+    receive their own model instances. The memory tier and the SQLite tier
+    have separate locks, so memory hits never wait behind disk I/O. An entry
+    expires ``ttl_seconds`` after it was first stored, whichever tier serves
+    it. The SQLite tier keeps at most ``max_disk_entries`` rows, trimming the
+    least recently used and purging expired ones every
+    :data:`DISK_PURGE_INTERVAL` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: Optional[float] = None,
+        path: Optional[Path] = None,
+        max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = Path(path) if path is not None else None
+        self.max_disk_entries = max_disk_entries
+        # key -> (wall-clock time first stored, kind, payload)
+        self._entries: OrderedDict[str, Tuple[float, str, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self._next_purge = 0.0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_errors = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_errors": self.disk_errors,
+        }
+
+    def get(self, key: str) -> Optional[PlanResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0], time.time()):
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is not None:
+            _, kind, payload = entry
+        else:
+            stored = self._disk_get(key)
+            with self._lock:
+                if stored is None:
+                    self.misses += 1
+                    return None
+                stored_at, kind, payload = stored
+                self.disk_hits += 1
+                self._remember(key, stored_at, kind, payload)
+        return _RESULT_TYPES[kind].model_validate_json(payload)
+
+    def set(self, key: str, result: PlanResult) -> None:
+        kind = result_status(result)
+        payload = result.model_dump_json()
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, stored_at, kind, payload)
+        self._disk_set(key, stored_at, kind, payload)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        with self._disk_lock:
+            connection = self._disk()
+            if connection is not None:
+                with connection:
+                    connection.execute("DELETE FROM plan_cache")
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    def _remember(self, key: str, stored_at: float, kind: str, payload: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (stored_at, kind, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        # Connections must not be shared across a fork; worker processes of
+        # the batch CLI open their own.
+        if self._connection is None or self._connection_pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS plan_cache ("
+                "key TEXT PRIMARY KEY, kind TEXT NOT NULL, "
+                "payload TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(plan_cache)")}
+            if "used_at" not in columns:
+                # Files written before the tier was bounded lack the LRU column.
+                connection.execute(
+                    "ALTER TABLE plan_cache ADD COLUMN used_at REAL NOT NULL DEFAULT 0"
+                )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS plan_cache_used_at ON plan_cache (used_at)"
+            )
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, str, str]]:
+        try:
+            with self._disk_lock:
+                connection = self._disk()
+                if connection is None:
+                    return None
+                row = connection.execute(
+                    "SELECT kind, payload, stored_at FROM plan_cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is None or self._expired(row[2], time.time()):
+                    return None
+                with connection:
+                    connection.execute(
+                        "UPDATE plan_cache SET used_at = ? WHERE key = ?", (time.time(), key)
+                    )
+        except sqlite3.Error:
+            with self._lock:
+                self.disk_errors += 1
+            return None
+        kind, payload, stored_at = row
+        return stored_at, kind, payload
+
+    def _disk_set(self, key: str, stored_at: float, kind: str, payload: str) -> None:
+        try:
+            with self._disk_lock:
+                connection = self._disk()
+                if connection is None:
+                    return
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO plan_cache "
+                        "(key, kind, payload, stored_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                        (key, kind, payload, stored_at, stored_at),
+                    )
+                    if time.monotonic() >= self._next_purge:
+                        self._purge(connection)
+        except sqlite3.Error:
+            with self._lock:
+                self.disk_errors += 1
+
+    def _purge(self, connection: sqlite3.Connection) -> None:
+        """Delete expired rows and the least recently used beyond the size bound."""
+        self._next_purge = time.monotonic() + DISK_PURGE_INTERVAL
+        if self.ttl_seconds is not None:
+            connection.execute(
+                "DELETE FROM plan_cache WHERE stored_at < ?", (time.time() - self.ttl_seconds,)
+            )
+        connection.execute(
+            "DELETE FROM plan_cache WHERE key IN "
+            "(SELECT key FROM plan_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (max(0, self.max_disk_entries),),
+        )
+
+
+_default_cache: Optional[PlanCache] = None
+
+
+def configure_default_cache(
+    max_entries: Optional[int] = None,
+    ttl_seconds: Optional[float] = None,
+    path: Optional[Path] = None,
+    max_disk_entries: Optional[int] = None,
+) -> PlanCache:
+    """Replace the process-wide cache used by the CLI and the API.
+
+    Unset arguments fall back to ``BP_GEN_CACHE_SIZE``, ``BP_GEN_CACHE_TTL``,
+    ``BP_GEN_CACHE_PATH`` and ``BP_GEN_CACHE_DISK_SIZE``.
+    """
+    global _default_cache
+    if max_entries is None:
+        max_entries = int(os.environ.get("BP_GEN_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+    if ttl_seconds is None and os.environ.get("BP_GEN_CACHE_TTL"):
+        ttl_seconds = float(os.environ["BP_GEN_CACHE_TTL"])
+    if path is None and os.environ.get("BP_GEN_CACHE_PATH"):
+        path = Path(os.environ["BP_GEN_CACHE_PATH"])
+    if max_disk_entries is None:
+        max_disk_entries = int(
+            os.environ.get("BP_GEN_CACHE_DISK_SIZE", DEFAULT_MAX_DISK_ENTRIES)
+        )
+    _default_cache = PlanCache(
+        max_entries=max_entries,
+        ttl_seconds=ttl_seconds,
+        path=path,
+        max_disk_entries=max_disk_entries,
+    )
+    return _default_cache
+
+
+def get_default_cache() -> PlanCache:
+    if _default_cache is None:
+        return configure_default_cache()
+    return _default_cache
+
+
+def generate_plan_cached(
+    request: GeneratePlanRequest,
+    cache: Optional[PlanCache] = None,
+    bypass: bool = False,
+) -> PlanResult:
+    """Return the cached result for ``request``, generating it on a miss.
+
+    With ``bypass=True`` the cache is neither read nor written.
+    """
+    if bypass:
+        return generate_plan(request)
+
+    cache = cache if cache is not None else get_default_cache()
+    with stage("cache_lookup"):
+        key = request_key(request)
+        result = cache.get(key)
+    if result is None:
+        result = generate_plan(request)
+        with stage("cache_store"):
+            cache.set(key, result)
+    return result
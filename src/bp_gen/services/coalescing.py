@@ -0,0 +1,177 @@
+"""Single-flight coalescing of identical concurrent computations.
+
+:class:`SingleFlight` coalesces callers on threads; :class:`AsyncSingleFlight`
+coalesces coroutines, whose waiters then hold no thread while they wait.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+
+from bp_gen.deadlines import DeadlineExceeded, remaining_seconds
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class _AsyncCall(Generic[T]):
+    __slots__ = ("result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+        # One future per waiter, on that waiter's own event loop.
+        self.waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class SingleFlight(Generic[T]):
+    """Share one in-flight computation among concurrent callers with the same key.
+
+    Nothing is kept once a computation finishes, so this complements rather
+    than replaces the result cache. Results are handed to every waiter as-is
+    and should therefore be immutable.
+
+    Waiters give up with :class:`~bp_gen.deadlines.DeadlineExceeded` when
+    their own request deadline passes. A leader failure listed in
+    ``retry_on`` (by default only its own deadline) belongs to the leader's
+    request alone, so its waiters retry and one of them leads; any other
+    error is raised to every waiter.
+    """
+
+    def __init__(self, retry_on: Tuple[Type[BaseException], ...] = (DeadlineExceeded,)) -> None:
+        self._retry_on = retry_on
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call[T]] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: str, compute: Callable[[], T]) -> T:
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self.executions += 1
+                else:
+                    call.waiters += 1
+                    self.coalesced += 1
+
+            if leader:
+                return self._lead(key, call, compute)
+
+            done = call.done.wait(remaining_seconds())
+            with self._lock:
+                call.waiters -= 1
+            if not done:
+                raise DeadlineExceeded("Request deadline exceeded waiting for an identical request.")
+            if isinstance(call.error, self._retry_on):
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    def _lead(self, key: str, call: _Call[T], compute: Callable[[], T]) -> T:
+        try:
+            call.result = compute()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            in_flight = len(self._calls)
+            waiting = sum(self._waiting(call) for call in self._calls.values())
+        total = self.executions + self.coalesced
+        return {
+            "in_flight": in_flight,
+            "waiting": waiting,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalescing_ratio": self.coalesced / total if total else 0.0,
+        }
+
+    @staticmethod
+    def _waiting(call: _Call[T]) -> int:
+        return call.waiters
+
+
+class AsyncSingleFlight(SingleFlight[T]):
+    """:class:`SingleFlight` for coroutines; ``compute`` returns an awaitable.
+
+    A leader cancelled with its request counts as a ``retry_on`` failure.
+    """
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[T]]) -> T:  # type: ignore[override]
+        loop = asyncio.get_running_loop()
+        while True:
+            waiter: Optional[asyncio.Future] = None
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _AsyncCall()
+                    self.executions += 1
+                else:
+                    waiter = loop.create_future()
+                    call.waiters.append((loop, waiter))
+                    self.coalesced += 1
+
+            if leader:
+                return await self._lead_async(key, call, compute)
+
+            try:
+                await asyncio.wait_for(waiter, remaining_seconds())
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(
+                    "Request deadline exceeded waiting for an identical request."
+                ) from None
+            finally:
+                with self._lock:
+                    if (loop, waiter) in call.waiters:
+                        call.waiters.remove((loop, waiter))
+            if isinstance(call.error, self._retry_on + (asyncio.CancelledError,)):
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    async def _lead_async(
+        self, key: str, call: _AsyncCall[T], compute: Callable[[], Awaitable[T]]
+    ) -> T:
+        try:
+            call.result = await compute()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                waiters, call.waiters = call.waiters, []
+            for loop, waiter in waiters:
+                loop.call_soon_threadsafe(_wake, waiter)
+        return call.result
+
+    @staticmethod
+    def _waiting(call: _AsyncCall[T]) -> int:  # type: ignore[override]
+        return len(call.waiters)
@@ -0,0 +1,244 @@
+"""Execution backends that run API plan generation off the request thread.
+
+``inline`` generates in the calling thread (the server's threadpool), as
+before. ``thread`` hands work to a dedicated, bounded thread pool. ``process``
+sends each request as compact JSON to a pool of pre-warmed worker processes,
+which generate, serialize and return ``(status, body)`` bytes, so CPU-bound
+generation uses every core instead of contending for one GIL.
+
+The backend is chosen with ``BP_GEN_EXECUTOR`` (``inline``, ``thread`` or
+``process``) and sized with ``BP_GEN_EXECUTOR_WORKERS`` (default: CPU count).
+The caller's request deadline (:mod:`bp_gen.deadlines`) follows the work
+onto every backend.
+"""
+from __future__ import annotations
+
+import contextvars
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bp_gen.deadlines import check_deadline, deadline_epoch, deadline_scope_until, future_result
+from bp_gen.instrumentation import StageTimings, activate, current_timings, stage
+from bp_gen.schemas import GeneratePlanRequest
+from bp_gen.serialization import result_json
+from bp_gen.services.cache import configure_default_cache, generate_plan_cached
+from bp_gen.services.plan_generator import result_status
+
+BACKEND_INLINE = "inline"
+BACKEND_THREAD = "thread"
+BACKEND_PROCESS = "process"
+BACKENDS = (BACKEND_INLINE, BACKEND_THREAD, BACKEND_PROCESS)
+
+# ``(status, serialized result)`` as returned to the API.
+SerializedResult = Tuple[str, bytes]
+
+# Stage timings measured in a worker process, shipped back with the result.
+_WorkerStages = Optional[List[Tuple[str, float]]]
+
+
+def generate_serialized(request: GeneratePlanRequest, bypass: bool = False) -> SerializedResult:
+    """Generate (or fetch from cache) and serialize the result for ``request``."""
+    result = generate_plan_cached(request, bypass=bypass)
+    with stage("serialize"):
+        return result_status(result), result_json(result)
+
+
+def _generate_in_worker(
+    payload: bytes,
+    bypass: bool,
+    timed: bool,
+    deadline: Optional[float],
+) -> Tuple[str, bytes, _WorkerStages, float]:
+    started = time.perf_counter()
+    # ``deadline`` is wall-clock, so time spent in the pool's queue counts.
+    with deadline_scope_until(deadline), activate(StageTimings() if timed else None) as timings:
+        with stage("request_decode"):
+            request = GeneratePlanRequest.model_validate_json(payload)
+        status, body = generate_serialized(request, bypass)
+    stages = None if timings is None else timings.stages
+    return status, body, stages, time.perf_counter() - started
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+class GenerationExecutor:
+    """Runs generation on the configured backend and tracks its load.
+
+    :meth:`run` blocks the calling thread until the result is ready. With the
+    process backend each worker keeps its own in-memory result cache; set
+    ``BP_GEN_CACHE_PATH`` to share the SQLite tier between them.
+    """
+
+    def __init__(
+        self,
+        backend: str = BACKEND_INLINE,
+        workers: Optional[int] = None,
+        cache_path: Optional[Path] = None,
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown executor backend {backend!r}; expected one of {BACKENDS}.")
+        self.backend = backend
+        self.workers = 0 if backend == BACKEND_INLINE else workers or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._busy_seconds = 0.0
+        self._pool: Optional[Executor] = None
+        if backend == BACKEND_THREAD:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bp-gen")
+        elif backend == BACKEND_PROCESS:
+            # Spawned rather than forked: the server process runs threads, and
+            # forking a threaded process can deadlock the children.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=configure_default_cache,
+                initargs=(None, None, cache_path),
+            )
+            self._warm_up()
+
+    def _warm_up(self) -> None:
+        # Start every worker (and run its imports) before the first request.
+        wait([self._pool.submit(_worker_ready) for _ in range(self.workers)])
+
+    def run(self, request: GeneratePlanRequest, bypass: bool = False) -> SerializedResult:
+        with self._lock:
+            self._in_flight += 1
+        started = time.perf_counter()
+        # Time spent generating; the call's wall time unless a worker reports it.
+        busy: Optional[float] = None
+        try:
+            if self._pool is None:
+                return generate_serialized(request, bypass)
+            if self.backend == BACKEND_THREAD:
+                # Run in a copy of this context so stage timings still reach
+                # the request's collector.
+                context = contextvars.copy_context()
+                future = self._pool.submit(context.run, self._timed, request, bypass)
+                result, busy = future_result(future)
+                return result
+            status, body, busy = self._run_in_process(request, bypass, started)
+            return status, body
+        finally:
+            if busy is None:
+                busy = time.perf_counter() - started
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+                self._busy_seconds += busy
+
+    @staticmethod
+    def _timed(request: GeneratePlanRequest, bypass: bool) -> Tuple[SerializedResult, float]:
+        started = time.perf_counter()
+        result = generate_serialized(request, bypass)
+        return result, time.perf_counter() - started
+
+    def _run_in_process(
+        self,
+        request: GeneratePlanRequest,
+        bypass: bool,
+        started: float,
+    ) -> Tuple[str, bytes, float]:
+        timings = current_timings()
+        check_deadline()
+        with stage("request_encode"):
+            payload = request.__pydantic_serializer__.to_json(request, exclude_defaults=True)
+        future = self._pool.submit(
+            _generate_in_worker, payload, bypass, timings is not None, deadline_epoch()
+        )
+        status, body, stages, worker_seconds = future_result(future)
+        if timings is not None:
+            # Queueing and IPC are whatever the worker did not account for.
+            timings.record("dispatch", time.perf_counter() - started - worker_seconds)
+            for name, seconds in stages:
+                timings.record(name, seconds)
+        return status, body, worker_seconds
+
+    def submit(self, fn: Callable[..., object], *args: object) -> Future:
+        """Run other work on the backend's pool; the inline backend runs it now.
+
+        With the process backend ``fn`` and ``args`` must be picklable. This
+        work is not counted in :meth:`stats`.
+        """
+        if self._pool is not None:
+            return self._pool.submit(fn, *args)
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def stats(self) -> Dict[str, object]:
+        """Load snapshot: requests in flight, queue depth and worker utilization."""
+        with self._lock:
+            in_flight = self._in_flight
+            completed = self._completed
+            busy_seconds = self._busy_seconds
+        workers = self.workers
+        return {
+            "backend": self.backend,
+            "workers": workers,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - workers) if workers else 0,
+            "utilization": min(in_flight, workers) / workers if workers else 0.0,
+            "completed": completed,
+            "busy_seconds": busy_seconds,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+_default_executor: Optional[GenerationExecutor] = None
+_default_lock = threading.Lock()
+# Serializes lazy creation so concurrent first requests build one pool.
+_create_lock = threading.Lock()
+
+
+def configure_executor(
+    backend: Optional[str] = None,
+    workers: Optional[int] = None,
+    cache_path: Optional[Path] = None,
+) -> GenerationExecutor:
+    """Replace the process-wide executor used by the API.
+
+    Unset arguments fall back to ``BP_GEN_EXECUTOR`` and
+    ``BP_GEN_EXECUTOR_WORKERS``. Any previous executor is shut down.
+    """
+    global _default_executor
+    if backend is None:
+        backend = os.environ.get("BP_GEN_EXECUTOR", "") or BACKEND_INLINE
+    if workers is None and os.environ.get("BP_GEN_EXECUTOR_WORKERS"):
+        workers = int(os.environ["BP_GEN_EXECUTOR_WORKERS"])
+    executor = GenerationExecutor(backend, workers, cache_path)
+    with _default_lock:
+        previous, _default_executor = _default_executor, executor
+    if previous is not None:
+        previous.shutdown()
+    return executor
+
+
+def get_executor() -> GenerationExecutor:
+    executor = _default_executor
+    if executor is None:
+        with _create_lock:
+            executor = _default_executor or configure_executor()
+    return executor
+
+
+def shutdown_executor() -> None:
+    global _default_executor
+    with _default_lock:
+        executor, _default_executor = _default_executor, None
+    if executor is not None:
+        executor.shutdown()
@@ -0,0 +1,167 @@
+"""Incremental plan regeneration when only part of a request changes.
+
+Planners typically edit one ``business_context`` field and resubmit. Each
+generated node depends on a known subset of the request, so
+:func:`regenerate_plan` rebuilds only the nodes whose inputs changed and
+reuses the rest of the previous plan. The result is identical to running
+``generate_plan`` on the new request.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Tuple
+
+from bp_gen.schemas import (
+    BusinessContext,
+    BusinessPlan,
+    ClarifyingQuestions,
+    GeneratePlanRequest,
+    GenerationErrorResponse,
+    construct_trusted,
+)
+from bp_gen.services.plan_generator import (
+    OBJECTIVE_SOURCES,
+    GenerationControls,
+    InvalidGenerationControl,
+    _build_links,
+    _build_objective,
+    _build_objective_kpis,
+    _build_plan_meta,
+    _link_type,
+    _missing_context,
+    _validated,
+    generate_plan,
+    parse_generation_controls,
+)
+
+# Request fields that change the plan's structure rather than node text.
+# Any change to them falls back to a full regeneration.
+STRUCTURAL_INPUTS = frozenset({"flags", "generation_controls"})
+
+# business_context fields read by PlanMeta.
+_PLAN_META_SOURCES = ("plan_name", "scope", "time_horizon")
+
+PlanResult = BusinessPlan | ClarifyingQuestions | GenerationErrorResponse
+
+
+@dataclass
+class PlanDelta:
+    """Compact description of what an incremental regeneration touched."""
+
+    changed_inputs: List[str] = field(default_factory=list)
+    full_regeneration: bool = False
+    plan_fields: List[str] = field(default_factory=list)
+    objectives: List[str] = field(default_factory=list)
+    kpis: List[str] = field(default_factory=list)
+    links_retyped: bool = False
+    revalidated: bool = False
+
+    def as_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+def changed_inputs(previous: GeneratePlanRequest, request: GeneratePlanRequest) -> List[str]:
+    """List the request fields that differ, using ``business_context.<name>`` paths."""
+    changed = [
+        f"business_context.{name}"
+        for name in BusinessContext.model_fields
+        if getattr(previous.business_context, name) != getattr(request.business_context, name)
+    ]
+    for name in GeneratePlanRequest.model_fields:
+        if name != "business_context" and getattr(previous, name) != getattr(request, name):
+            changed.append(name)
+    return changed
+
+
+def _has_generated_shape(plan: BusinessPlan, controls: GenerationControls) -> bool:
+    return (
+        len(plan.objectives) == controls.objectives
+        and len(plan.kpis) == controls.objectives * controls.kpis_per_objective
+        and len(plan.links) == len(plan.kpis)
+    )
+
+
+def regenerate_plan(
+    previous_plan: PlanResult,
+    previous_request: GeneratePlanRequest,
+    request: GeneratePlanRequest,
+) -> Tuple[PlanResult, PlanDelta]:
+    """Update ``previous_plan`` (generated from ``previous_request``) for ``request``.
+
+    Unchanged nodes are shared with ``previous_plan`` rather than copied, so
+    neither plan should be mutated afterwards. Validation runs again only
+    when links or ``allowed_relationships`` change; text-only edits cannot
+    affect validity.
+    """
+    delta = PlanDelta(changed_inputs=changed_inputs(previous_request, request))
+    context = request.business_context
+    try:
+        controls = parse_generation_controls(request.generation_controls)
+    except InvalidGenerationControl:
+        controls = None
+
+    if (
+        controls is None
+        or not isinstance(previous_plan, BusinessPlan)
+        or _missing_context(context)
+        or STRUCTURAL_INPUTS.intersection(delta.changed_inputs)
+        or not _has_generated_shape(previous_plan, controls)
+    ):
+        delta.full_regeneration = True
+        return generate_plan(request), delta
+
+    changed = set(delta.changed_inputs)
+
+    objectives = list(previous_plan.objectives)
+    kpis = list(previous_plan.kpis)
+    targets_changed = "business_context.success_definition" in changed
+    per_objective = controls.kpis_per_objective
+    for obj_index in range(controls.objectives):
+        source = OBJECTIVE_SOURCES[obj_index % len(OBJECTIVE_SOURCES)]
+        objective_changed = f"business_context.{source}" in changed
+        if objective_changed:
+            objectives[obj_index] = _build_objective(obj_index, getattr(context, source) or "")
+            delta.objectives.append(objectives[obj_index].id)
+        if objective_changed or targets_changed:
+            start = obj_index * per_objective
+            rebuilt = _build_objective_kpis(
+                obj_index,
+                objectives[obj_index],
+                context.success_definition or "",
+                controls,
+            )
+            kpis[start : start + per_objective] = rebuilt
+            delta.kpis.extend(kpi.id for kpi in rebuilt)
+
+    meta = previous_plan.plan
+    if any(f"business_context.{source}" in changed for source in _PLAN_META_SOURCES):
+        meta = _build_plan_meta(context)
+        delta.plan_fields = [
+            name
+            for name in ("name", "horizon", "scope")
+            if getattr(meta, name) != getattr(previous_plan.plan, name)
+        ]
+
+    links = previous_plan.links
+    if _link_type(previous_request.allowed_relationships) != _link_type(
+        request.allowed_relationships
+    ):
+        links = _build_links(kpis, request.allowed_relationships)
+        delta.links_retyped = True
+
+    plan = construct_trusted(
+        BusinessPlan,
+        plan=meta,
+        objectives=objectives,
+        kpis=kpis,
+        initiatives=previous_plan.initiatives,
+        capabilities=previous_plan.capabilities,
+        outputs=previous_plan.outputs,
+        links=links,
+        assumptions_and_gaps=previous_plan.assumptions_and_gaps,
+    )
+
+    if delta.links_retyped or "allowed_relationships" in changed:
+        delta.revalidated = True
+        return _validated(plan, request), delta
+    return plan, delta
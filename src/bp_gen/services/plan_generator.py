@@ -1,7 +1,26 @@
 from __future__ import annotations
 
-from typing import List, Sequence
+import sys
+from dataclasses import dataclass
+from functools import partial
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
+from bp_gen.columnar import ColumnarPlan, ColumnarPlanBuilder
+from bp_gen.deadlines import check_deadline
+from bp_gen.graph import PlanGraphIndex
+from bp_gen.instrumentation import stage
+from bp_gen.relationships import compile_relationships
 from bp_gen.schemas import (
     BusinessPlan,
     BusinessContext,
@@ -12,10 +31,23 @@ from bp_gen.schemas import (
     KPI,
     Link,
     Objective,
+    ModelT,
     PlanMeta,
+    construct_trusted,
 )
-from bp_gen.validator import validate_business_plan
+from bp_gen.validator import DEADLINE_CHECK_INTERVAL, validate_business_plan
+
 
+# Bump whenever a change here alters generated output for the same request.
+# It is part of every cache key and /generate-plan ETag, so old results are
+# neither served from the cache nor revalidated by clients.
+# 2: objective -> KPI links are typed from the compiled allowed_relationships
+#    instead of falling back to the first allowed name.
+GENERATOR_VERSION = "2"
+
+STATUS_PLAN = "plan"
+STATUS_CLARIFYING_QUESTIONS = "clarifying_questions"
+STATUS_ERRORS = "errors"
 
 REQUIRED_CONTEXT_FIELDS = (
     "scope",
@@ -60,143 +92,439 @@ def _objective_priority(index: int) -> str:
     return "medium"
 
 
-def _build_objectives(
-    problem_statement: str,
-    success_definition: str,
-    scope: str,
-) -> List[Objective]:
-    titles = [
-        f"Resolve {problem_statement}",
-        f"Achieve {success_definition}",
-        f"Sustain improvements across {scope}",
-    ]
-    rationales = [
-        f"Directly addresses the stated problem: {problem_statement}.",
-        f"Aligns outcomes to the stated success definition: {success_definition}.",
-        f"Ensures gains are maintained within the defined scope: {scope}.",
-    ]
-    return [
-        Objective(
-            id=f"obj-{idx + 1}",
-            title=title,
-            rationale=rationales[idx],
-            owner_role=None,
-            priority=_objective_priority(idx),
+# Objective ``i`` is derived from business_context field
+# OBJECTIVE_SOURCES[i % 3]; later rounds through the sources are numbered.
+OBJECTIVE_SOURCES = ("problem_statement", "success_definition", "scope")
+
+# Text templates, bound once at import. Text shared by many nodes (an
+# objective's KPI names and definitions, a plan's KPI target) is rendered
+# once and the same string is referenced by every node.
+_OBJECTIVE_TITLES = (
+    "Resolve {}".format,
+    "Achieve {}".format,
+    "Sustain improvements across {}".format,
+)
+_OBJECTIVE_RATIONALES = (
+    "Directly addresses the stated problem: {}.".format,
+    "Aligns outcomes to the stated success definition: {}.".format,
+    "Ensures gains are maintained within the defined scope: {}.".format,
+)
+_KPI_NAME = "Progress on {}".format
+_KPI_LAGGING_DEFINITION = "Measures advancement toward objective '{}'.".format
+_KPI_LEADING_DEFINITION = "Tracks leading indicators for '{}'.".format
+_KPI_TARGET = "Aligned to success definition: {}".format
+
+_THEMES = ("Problem resolution", "Success definition alignment")
+
+KPIS_PER_OBJECTIVE = 2
+
+# generation_controls keys read by the generator; other keys are ignored.
+CONTROL_MAX_OBJECTIVES = "max_objectives"
+CONTROL_MAX_KPIS_PER_OBJECTIVE = "max_kpis_per_objective"
+CONTROL_LEADING_KPI_RATIO = "leading_kpi_ratio"
+
+# Upper bounds on the size of one generated plan.
+MAX_OBJECTIVES = 10_000
+MAX_KPIS_PER_OBJECTIVE = 100
+MAX_PLAN_KPIS = 200_000
+
+Fields = Dict[str, Optional[str]]
+
+
+class InvalidGenerationControl(ValueError):
+    """A ``generation_controls`` value that cannot be used."""
+
+    def __init__(self, control: str, message: str) -> None:
+        super().__init__(message)
+        self.control = control
+
+
+@dataclass(frozen=True)
+class GenerationControls:
+    """Plan shape requested through ``generation_controls``.
+
+    ``leading_kpi_ratio`` is the share of each objective's KPIs that are
+    leading indicators, rounded to the nearest count; lagging KPIs come
+    first. Without it the first KPI is lagging and the rest are leading.
+    """
+
+    objectives: int = len(OBJECTIVE_SOURCES)
+    kpis_per_objective: int = KPIS_PER_OBJECTIVE
+    leading_kpi_ratio: Optional[float] = None
+
+    @property
+    def lagging_kpis(self) -> int:
+        if self.leading_kpi_ratio is None:
+            return min(1, self.kpis_per_objective)
+        return self.kpis_per_objective - round(self.leading_kpi_ratio * self.kpis_per_objective)
+
+
+def _int_control(controls: Dict[str, str], name: str, default: int, limit: int) -> int:
+    raw = controls.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        value = 0
+    if not 1 <= value <= limit:
+        raise InvalidGenerationControl(
+            name, f"{name} must be a whole number from 1 to {limit}, got '{raw}'."
         )
-        for idx, title in enumerate(titles)
-    ]
+    return value
+
 
+def parse_generation_controls(controls: Optional[Dict[str, str]]) -> GenerationControls:
+    """Read the plan shape from a request's ``generation_controls``.
+
+    Raises :class:`InvalidGenerationControl` for out-of-range or malformed values.
+    """
+    if not controls:
+        return GenerationControls()
+    objectives = _int_control(
+        controls, CONTROL_MAX_OBJECTIVES, len(OBJECTIVE_SOURCES), MAX_OBJECTIVES
+    )
+    kpis_per_objective = _int_control(
+        controls, CONTROL_MAX_KPIS_PER_OBJECTIVE, KPIS_PER_OBJECTIVE, MAX_KPIS_PER_OBJECTIVE
+    )
+    if objectives * kpis_per_objective > MAX_PLAN_KPIS:
+        raise InvalidGenerationControl(
+            CONTROL_MAX_KPIS_PER_OBJECTIVE,
+            f"{CONTROL_MAX_OBJECTIVES} x {CONTROL_MAX_KPIS_PER_OBJECTIVE} "
+            f"must not exceed {MAX_PLAN_KPIS} KPIs.",
+        )
+    ratio = None
+    raw = controls.get(CONTROL_LEADING_KPI_RATIO)
+    if raw is not None:
+        try:
+            ratio = float(raw)
+        except ValueError:
+            ratio = -1.0
+        if not 0.0 <= ratio <= 1.0:
+            raise InvalidGenerationControl(
+                CONTROL_LEADING_KPI_RATIO,
+                f"{CONTROL_LEADING_KPI_RATIO} must be a number from 0 to 1, got '{raw}'.",
+            )
+    return GenerationControls(objectives, kpis_per_objective, ratio)
 
-def _build_kpis(
-    objectives: Sequence[Objective],
+
+def _objective_fields(index: int, source_text: str) -> Fields:
+    template = index % len(_OBJECTIVE_TITLES)
+    round_number = index // len(_OBJECTIVE_TITLES)
+    title = _OBJECTIVE_TITLES[template](source_text)
+    return {
+        "id": f"obj-{index + 1}",
+        "title": f"{title} ({round_number + 1})" if round_number else title,
+        "rationale": _OBJECTIVE_RATIONALES[template](source_text),
+        "owner_role": None,
+        "priority": _objective_priority(index),
+    }
+
+
+def _build_objective(index: int, source_text: str) -> Objective:
+    return construct_trusted(Objective, **_objective_fields(index, source_text))
+
+
+def _objective_sources(context: BusinessContext) -> Tuple[str, str, str]:
+    return (
+        context.problem_statement or "",
+        context.success_definition or "",
+        context.scope or "",
+    )
+
+
+def _iter_objective_fields(
+    context: BusinessContext,
+    controls: GenerationControls,
+) -> Iterator[Fields]:
+    sources = _objective_sources(context)
+    # Later rounds through the sources reuse the first round's rationales.
+    rationales: List[str] = []
+    for index in range(controls.objectives):
+        if not index % DEADLINE_CHECK_INTERVAL:
+            check_deadline()
+        fields = _objective_fields(index, sources[index % len(sources)])
+        if index < len(sources):
+            rationales.append(fields["rationale"])
+        else:
+            fields["rationale"] = rationales[index % len(sources)]
+        yield fields
+
+
+def _iter_objective_kpi_fields(
+    obj_index: int,
+    objective: Fields,
+    target: str,
+    controls: GenerationControls,
+) -> Iterator[Fields]:
+    objective_id = objective["id"]
+    title = objective["title"]
+    name = _KPI_NAME(title)
+    lagging_definition = _KPI_LAGGING_DEFINITION(title)
+    leading_definition = _KPI_LEADING_DEFINITION(title)
+    lagging = controls.lagging_kpis
+    for kpi_index in range(controls.kpis_per_objective):
+        is_lagging = kpi_index < lagging
+        yield {
+            "id": f"kpi-{obj_index + 1}-{kpi_index + 1}",
+            "objective_id": objective_id,
+            "name": f"{name} ({kpi_index + 1})" if kpi_index >= KPIS_PER_OBJECTIVE else name,
+            "definition": lagging_definition if is_lagging else leading_definition,
+            "formula": None,
+            "baseline": None,
+            "target": target,
+            "frequency": "monthly",
+            "data_source": None,
+            "leading_or_lagging": "lagging" if is_lagging else "leading",
+        }
+
+
+def _iter_kpi_fields(
+    objectives: Iterable[Fields],
     success_definition: str,
-) -> List[KPI]:
-    kpis: List[KPI] = []
+    controls: GenerationControls,
+) -> Iterator[Fields]:
+    target = _KPI_TARGET(success_definition)
     for obj_index, objective in enumerate(objectives):
-        for kpi_index in range(2):
-            kpi_id = f"kpi-{obj_index + 1}-{kpi_index + 1}"
-            leading_or_lagging = "lagging" if kpi_index == 0 else "leading"
-            name = f"Progress on {objective.title}"
-            definition = (
-                f"Measures advancement toward objective '{objective.title}'."
-                if kpi_index == 0
-                else f"Tracks leading indicators for '{objective.title}'."
-            )
-            kpis.append(
-                KPI(
-                    id=kpi_id,
-                    objective_id=objective.id,
-                    name=name,
-                    definition=definition,
-                    formula=None,
-                    baseline=None,
-                    target=f"Aligned to success definition: {success_definition}",
-                    frequency="monthly",
-                    data_source=None,
-                    leading_or_lagging=leading_or_lagging,
-                )
-            )
-    return kpis
+        yield from _iter_objective_kpi_fields(obj_index, objective, target, controls)
 
 
-def _build_links(kpis: Sequence[KPI], allowed_relationships: Sequence[str]) -> List[Link]:
-    if "objective_to_kpi" in allowed_relationships:
-        link_type = "objective_to_kpi"
-    elif allowed_relationships:
-        link_type = allowed_relationships[0]
-    else:
-        link_type = "objective_to_kpi"
+def _iter_link_fields(kpis: Iterable[Fields], link_type: str) -> Iterator[Fields]:
+    for kpi in kpis:
+        yield _link_fields(kpi["objective_id"], kpi["id"], link_type)
+
 
+def _through(rows: Iterable[Fields], consume: Callable[[Fields], object]) -> Iterator[Fields]:
+    """Pass ``rows`` on unchanged after handing each one to ``consume``."""
+    for row in rows:
+        consume(row)
+        yield row
+
+
+def _collect(
+    rows: Iterable[Fields],
+    model: Type[ModelT],
+    nodes: List[ModelT],
+    index_node: Callable[[ModelT], None],
+) -> Iterator[Fields]:
+    """Build, keep and index a ``model`` node per row, passing the rows on."""
+    append = nodes.append
+    for fields in rows:
+        node = construct_trusted(model, **fields)
+        append(node)
+        index_node(node)
+        yield fields
+
+
+def _build_objective_kpis(
+    obj_index: int,
+    objective: Objective,
+    success_definition: str,
+    controls: GenerationControls,
+) -> List[KPI]:
+    objective_fields = {"id": objective.id, "title": objective.title}
+    target = _KPI_TARGET(success_definition)
     return [
-        Link(
-            from_type="objective",
-            from_id=kpi.objective_id,
-            to_type="kpi",
-            to_id=kpi.id,
-            type=link_type,
-        )
-        for kpi in kpis
+        construct_trusted(KPI, **fields)
+        for fields in _iter_objective_kpi_fields(obj_index, objective_fields, target, controls)
     ]
 
 
-def _build_gaps() -> List[Gap]:
+def _link_type(allowed_relationships: Sequence[str]) -> str:
+    # Without an allowed objective -> KPI relationship the default name is
+    # used and validation reports it as not allowed.
+    relationships = compile_relationships(allowed_relationships)
+    # Interned so every plan's links share one string, whichever request
+    # the relationship names were parsed from.
+    return sys.intern(relationships.relationship_for("objective", "kpi") or "objective_to_kpi")
+
+
+def _link_fields(objective_id: str, kpi_id: str, link_type: str) -> Fields:
+    return {
+        "from_type": "objective",
+        "from_id": objective_id,
+        "to_type": "kpi",
+        "to_id": kpi_id,
+        "type": link_type,
+    }
+
+
+def _build_links(kpis: Sequence[KPI], allowed_relationships: Sequence[str]) -> List[Link]:
+    link_type = _link_type(allowed_relationships)
     return [
-        Gap(
-            item="KPI baselines",
-            needed="Baseline values for each KPI.",
-            impact="Cannot quantify improvement without starting measurements.",
-        ),
-        Gap(
-            item="KPI data sources",
-            needed="Authoritative data sources for KPI reporting.",
-            impact="Risk of inconsistent measurement across teams.",
-        ),
-        Gap(
-            item="Objective ownership",
-            needed="Owner roles for each objective.",
-            impact="Accountability is unclear without designated owners.",
-        ),
-        Gap(
-            item="Target dates",
-            needed="Target dates for KPI achievement.",
-            impact="Unable to sequence delivery without timelines.",
-        ),
+        construct_trusted(Link, **_link_fields(kpi.objective_id, kpi.id, link_type))
+        for kpi in kpis
     ]
 
 
+def _build_plan_meta(context: BusinessContext) -> PlanMeta:
+    return construct_trusted(
+        PlanMeta,
+        name=context.plan_name or f"{context.scope} Business Plan",
+        horizon=context.time_horizon or "",
+        scope=context.scope or "",
+        themes=list(_THEMES),
+    )
+
+
+def _static_gap(item: str, needed: str, impact: str) -> Gap:
+    return construct_trusted(Gap, item=item, needed=needed, impact=impact)
+
+
+# Gaps listed in every generated plan. The instances are shared by all plans
+# (each plan gets its own list), so they must never be mutated.
+STATIC_GAPS: Tuple[Gap, ...] = (
+    _static_gap(
+        "KPI baselines",
+        "Baseline values for each KPI.",
+        "Cannot quantify improvement without starting measurements.",
+    ),
+    _static_gap(
+        "KPI data sources",
+        "Authoritative data sources for KPI reporting.",
+        "Risk of inconsistent measurement across teams.",
+    ),
+    _static_gap(
+        "Objective ownership",
+        "Owner roles for each objective.",
+        "Accountability is unclear without designated owners.",
+    ),
+    _static_gap(
+        "Target dates",
+        "Target dates for KPI achievement.",
+        "Unable to sequence delivery without timelines.",
+    ),
+)
+
+
 def generate_plan(
     request: GeneratePlanRequest,
 ) -> BusinessPlan | ClarifyingQuestions | GenerationErrorResponse:
+    check_deadline()
     context = request.business_context
     if _missing_context(context):
-        return ClarifyingQuestions(clarifying_questions=_build_clarifying_questions(context))
+        with stage("clarify"):
+            return construct_trusted(
+                ClarifyingQuestions,
+                clarifying_questions=_build_clarifying_questions(context),
+            )
 
-    objectives = _build_objectives(
-        problem_statement=context.problem_statement or "",
-        success_definition=context.success_definition or "",
-        scope=context.scope or "",
-    )
-    kpis = _build_kpis(objectives, context.success_definition or "")
-    links = _build_links(kpis, request.allowed_relationships)
-    plan = BusinessPlan(
-        plan=PlanMeta(
-            name=context.plan_name or f"{context.scope} Business Plan",
-            horizon=context.time_horizon or "",
-            scope=context.scope or "",
-            themes=["Problem resolution", "Success definition alignment"],
-        ),
-        objectives=objectives,
-        kpis=kpis,
-        initiatives=[] if request.flags.include_initiatives else None,
-        capabilities=[] if request.flags.include_capabilities else None,
-        outputs=[] if request.flags.include_outputs else None,
-        links=links,
-        assumptions_and_gaps=_build_gaps(),
+    try:
+        controls = parse_generation_controls(request.generation_controls)
+    except InvalidGenerationControl as exc:
+        return _invalid_controls(exc)
+
+    # Objectives feed KPIs and KPIs feed links one node at a time; objectives
+    # and KPIs are indexed for validation as they are built, so no stage
+    # materializes an intermediate list or walks the finished plan again.
+    # Links are not indexed: validation only reads the ID registries, and
+    # adjacency for every link would cost about a quarter of generation.
+    index = PlanGraphIndex()
+    objectives: List[Objective] = []
+    kpis: List[KPI] = []
+    links: List[Link] = []
+    add_objective = partial(index.add_node, "objective")
+    with stage("build_nodes"):
+        rows = _iter_objective_fields(context, controls)
+        rows = _collect(rows, Objective, objectives, add_objective)
+        rows = _iter_kpi_fields(rows, context.success_definition or "", controls)
+        rows = _collect(rows, KPI, kpis, index.add_kpi)
+        rows = _iter_link_fields(rows, _link_type(request.allowed_relationships))
+        links.extend(construct_trusted(Link, **fields) for fields in rows)
+    with stage("assemble"):
+        plan = construct_trusted(
+            BusinessPlan,
+            plan=_build_plan_meta(context),
+            objectives=objectives,
+            kpis=kpis,
+            initiatives=[] if request.flags.include_initiatives else None,
+            capabilities=[] if request.flags.include_capabilities else None,
+            outputs=[] if request.flags.include_outputs else None,
+            links=links,
+            assumptions_and_gaps=list(STATIC_GAPS),
+        )
+
+    return _validated(plan, request, index)
+
+
+def generate_columnar_plan(
+    request: GeneratePlanRequest,
+) -> ColumnarPlan | ClarifyingQuestions | GenerationErrorResponse:
+    """Generate the same plan as :func:`generate_plan` straight into columns.
+
+    No per-node models are created, which keeps very large plans compact.
+    """
+    check_deadline()
+    context = request.business_context
+    if _missing_context(context):
+        with stage("clarify"):
+            return construct_trusted(
+                ClarifyingQuestions,
+                clarifying_questions=_build_clarifying_questions(context),
+            )
+
+    try:
+        controls = parse_generation_controls(request.generation_controls)
+    except InvalidGenerationControl as exc:
+        return _invalid_controls(exc)
+
+    builder = ColumnarPlanBuilder()
+    with stage("build_nodes"):
+        rows = _iter_objective_fields(context, controls)
+        rows = _through(rows, partial(builder.append, "objectives"))
+        rows = _iter_kpi_fields(rows, context.success_definition or "", controls)
+        rows = _through(rows, partial(builder.append, "kpis"))
+        rows = _iter_link_fields(rows, _link_type(request.allowed_relationships))
+        for _ in _through(rows, partial(builder.append, "links")):
+            pass
+    with stage("assemble"):
+        builder.set_meta(_build_plan_meta(context))
+        for section, flag in (
+            ("initiatives", request.flags.include_initiatives),
+            ("capabilities", request.flags.include_capabilities),
+            ("outputs", request.flags.include_outputs),
+        ):
+            if flag:
+                builder.include(section)
+        builder.extend("assumptions_and_gaps", STATIC_GAPS)
+        plan = builder.build()
+
+    return _validated(plan, request)
+
+
+PlanT = TypeVar("PlanT", BusinessPlan, ColumnarPlan)
+
+
+def _invalid_controls(exc: InvalidGenerationControl) -> GenerationErrorResponse:
+    return construct_trusted(
+        GenerationErrorResponse,
+        errors=[
+            {
+                "code": "generation_control_invalid",
+                "message": str(exc),
+                "path": f"generation_controls.{exc.control}",
+            }
+        ],
+        required_user_inputs=["Correct the generation_controls highlighted in errors."],
     )
 
-    validation = validate_business_plan(plan, request.flags)
+
+def _validated(
+    plan: PlanT,
+    request: GeneratePlanRequest,
+    index: Optional[PlanGraphIndex] = None,
+) -> PlanT | GenerationErrorResponse:
+    check_deadline()
+    with stage("validate"):
+        validation = validate_business_plan(
+            plan,
+            request.flags,
+            index=index,
+            relationships=compile_relationships(request.allowed_relationships),
+        )
     if not validation["ok"]:
-        return GenerationErrorResponse(
+        return construct_trusted(
+            GenerationErrorResponse,
             errors=validation["errors"],
             required_user_inputs=[
                 "Provide missing relationships or required fields highlighted in errors.",
@@ -204,3 +532,14 @@ def generate_plan(
         )
 
     return plan
+
+
+def result_status(
+    result: BusinessPlan | ClarifyingQuestions | GenerationErrorResponse,
+) -> str:
+    """Return the status label (plan / clarifying_questions / errors) for a result."""
+    if isinstance(result, ClarifyingQuestions):
+        return STATUS_CLARIFYING_QUESTIONS
+    if isinstance(result, GenerationErrorResponse):
+        return STATUS_ERRORS
+    return STATUS_PLAN
@@ -0,0 +1,462 @@
+"""SQLite-backed store for generated business plans.
+
+Plans are stored in a normalized layout: one ``plans`` row per plan carrying
+the metadata (and the small optional sections as JSON), with objectives, KPIs
+and links in their own tables keyed by ``(plan_id, position)`` so order is
+preserved. Indexes on scope, horizon, plan name, request hash and KPI
+``leading_or_lagging`` keep the common lookups off full scans. A request hash
+is stored at most once, so repeated requests do not duplicate their plan.
+
+Queries page through results with a keyset cursor (``plan_id > after``), so
+callers can stream arbitrarily large result sets and resume where they left
+off without the store ever loading them whole. Plan and KPI IDs are never
+reused, so a cursor stays valid after deletes.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from bp_gen.schemas import KPI, BusinessPlan
+
+# Bump when the table layout changes; older files are rejected, not migrated.
+# 2: plan IDs never reused. 3: KPIs get their own never-reused ``kpi_id``.
+PLAN_STORE_SCHEMA_VERSION = 3
+
+# Plans written per transaction by ``add_many``.
+DEFAULT_INSERT_BATCH = 500
+# Rows fetched per round trip while streaming query results.
+DEFAULT_PAGE_SIZE = 500
+
+# A plan as a model or as its JSON-ready dict (e.g. a parsed batch record).
+PlanData = Union[BusinessPlan, Dict[str, object]]
+
+_OBJECTIVE_COLUMNS = ("id", "title", "rationale", "owner_role", "priority")
+_KPI_COLUMNS = (
+    "id",
+    "objective_id",
+    "name",
+    "definition",
+    "formula",
+    "baseline",
+    "target",
+    "frequency",
+    "data_source",
+    "leading_or_lagging",
+)
+_LINK_COLUMNS = ("from_type", "from_id", "to_type", "to_id", "type")
+# Optional sections kept as JSON on the plan row; ``NULL`` means omitted.
+_JSON_SECTIONS = ("initiatives", "capabilities", "outputs")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS plans (
+    plan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_hash TEXT,
+    name TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    horizon TEXT NOT NULL,
+    themes TEXT NOT NULL,
+    initiatives TEXT,
+    capabilities TEXT,
+    outputs TEXT,
+    assumptions_and_gaps TEXT NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS objectives (
+    plan_id INTEGER NOT NULL REFERENCES plans(plan_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL, title TEXT NOT NULL, rationale TEXT NOT NULL,
+    owner_role TEXT, priority TEXT NOT NULL,
+    PRIMARY KEY (plan_id, position)
+);
+CREATE TABLE IF NOT EXISTS kpis (
+    kpi_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    plan_id INTEGER NOT NULL REFERENCES plans(plan_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL, objective_id TEXT NOT NULL, name TEXT NOT NULL,
+    definition TEXT NOT NULL, formula TEXT, baseline TEXT, target TEXT NOT NULL,
+    frequency TEXT NOT NULL, data_source TEXT, leading_or_lagging TEXT NOT NULL,
+    UNIQUE (plan_id, position)
+);
+CREATE TABLE IF NOT EXISTS links (
+    plan_id INTEGER NOT NULL REFERENCES plans(plan_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    from_type TEXT NOT NULL, from_id TEXT NOT NULL,
+    to_type TEXT NOT NULL, to_id TEXT NOT NULL, type TEXT NOT NULL,
+    PRIMARY KEY (plan_id, position)
+);
+CREATE INDEX IF NOT EXISTS plans_scope_horizon ON plans (scope, horizon);
+CREATE INDEX IF NOT EXISTS plans_horizon ON plans (horizon);
+CREATE INDEX IF NOT EXISTS plans_name ON plans (name);
+CREATE UNIQUE INDEX IF NOT EXISTS plans_request_hash ON plans (request_hash);
+CREATE INDEX IF NOT EXISTS kpis_leading_or_lagging ON kpis (leading_or_lagging, plan_id);
+INSERT OR IGNORE INTO store_meta VALUES ('schema_version', '{PLAN_STORE_SCHEMA_VERSION}');
+"""
+
+
+@dataclass(frozen=True)
+class StoredPlanSummary:
+    """Indexed metadata of a stored plan, as returned by :meth:`PlanStore.query`."""
+
+    plan_id: int
+    request_hash: Optional[str]
+    name: str
+    scope: str
+    horizon: str
+    stored_at: float
+
+    def as_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class PlanFilter:
+    """Equality filters over the indexed columns; ``None`` matches anything.
+
+    ``leading_or_lagging`` matches plans with at least one KPI of that kind.
+    """
+
+    scope: Optional[str] = None
+    horizon: Optional[str] = None
+    name: Optional[str] = None
+    request_hash: Optional[str] = None
+    leading_or_lagging: Optional[str] = None
+
+    def where(self) -> Tuple[List[str], List[object]]:
+        clauses: List[str] = []
+        params: List[object] = []
+        for column in ("scope", "horizon", "name", "request_hash"):
+            value = getattr(self, column)
+            if value is not None:
+                clauses.append(f"plans.{column} = ?")
+                params.append(value)
+        if self.leading_or_lagging is not None:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM kpis WHERE kpis.leading_or_lagging = ? "
+                "AND kpis.plan_id = plans.plan_id)"
+            )
+            params.append(self.leading_or_lagging)
+        return clauses, params
+
+
+def _plan_dict(plan: PlanData) -> Dict[str, object]:
+    if isinstance(plan, BusinessPlan):
+        return plan.model_dump(mode="json")
+    return plan
+
+
+def _json_or_null(value: object) -> Optional[str]:
+    return None if value is None else json.dumps(value, separators=(",", ":"))
+
+
+def _rows(
+    plan_id: int,
+    items: Sequence[Dict[str, object]],
+    columns: Sequence[str],
+) -> Iterator[tuple]:
+    for position, item in enumerate(items):
+        yield (plan_id, position, *(item.get(column) for column in columns))
+
+
+def _insert_sql(table: str, columns: Sequence[str]) -> str:
+    placeholders = ", ".join("?" * (len(columns) + 2))
+    return f"INSERT INTO {table} (plan_id, position, {', '.join(columns)}) VALUES ({placeholders})"
+
+
+_INSERT_OBJECTIVE = _insert_sql("objectives", _OBJECTIVE_COLUMNS)
+_INSERT_KPI = _insert_sql("kpis", _KPI_COLUMNS)
+_INSERT_LINK = _insert_sql("links", _LINK_COLUMNS)
+_SUMMARY_COLUMNS = "plan_id, request_hash, name, scope, horizon, stored_at"
+
+
+class PlanStore:
+    """Local SQLite plan store; safe to share between threads of one process.
+
+    Like the result cache's SQLite tier, the connection is reopened after a
+    fork, so batch worker processes never share one.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None or self._connection_pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.executescript(_SCHEMA)
+            (version,) = connection.execute(
+                "SELECT value FROM store_meta WHERE key = 'schema_version'"
+            ).fetchone()
+            if int(version) != PLAN_STORE_SCHEMA_VERSION:
+                connection.close()
+                raise ValueError(
+                    f"Plan store {self.path} has schema version {version}, "
+                    f"expected {PLAN_STORE_SCHEMA_VERSION}."
+                )
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._connection_pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    def add(self, plan: PlanData, request_hash: Optional[str] = None) -> int:
+        """Store one plan and return its ``plan_id``.
+
+        A plan whose ``request_hash`` is already stored is not inserted again;
+        the existing ``plan_id`` is returned.
+        """
+        return self.add_many([(plan, request_hash)])[0]
+
+    def add_many(
+        self,
+        plans: Iterable[Tuple[PlanData, Optional[str]]],
+        batch_size: int = DEFAULT_INSERT_BATCH,
+    ) -> List[int]:
+        """Store ``(plan, request_hash)`` pairs, ``batch_size`` plans per transaction.
+
+        Each transaction either stores all of its plans or none of them. As
+        with :meth:`add`, an already stored ``request_hash`` is not duplicated.
+        """
+        plan_ids: List[int] = []
+        batch: List[Tuple[PlanData, Optional[str]]] = []
+        for item in plans:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                plan_ids.extend(self._insert(batch))
+                batch = []
+        if batch:
+            plan_ids.extend(self._insert(batch))
+        return plan_ids
+
+    def _insert(self, batch: Sequence[Tuple[PlanData, Optional[str]]]) -> List[int]:
+        plan_ids: List[int] = []
+        objectives: List[tuple] = []
+        kpis: List[tuple] = []
+        links: List[tuple] = []
+        stored_at = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                for plan, request_hash in batch:
+                    data = _plan_dict(plan)
+                    meta = data["plan"]
+                    cursor = connection.execute(
+                        "INSERT INTO plans (request_hash, name, scope, horizon, themes, "
+                        "initiatives, capabilities, outputs, assumptions_and_gaps, stored_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (request_hash) DO NOTHING",
+                        (
+                            request_hash,
+                            meta["name"],
+                            meta["scope"],
+                            meta["horizon"],
+                            _json_or_null(meta.get("themes", [])),
+                            *(_json_or_null(data.get(section)) for section in _JSON_SECTIONS),
+                            _json_or_null(data.get("assumptions_and_gaps", [])),
+                            stored_at,
+                        ),
+                    )
+                    if not cursor.rowcount:
+                        plan_ids.append(self._find(connection, request_hash))
+                        continue
+                    plan_id = cursor.lastrowid
+                    plan_ids.append(plan_id)
+                    objectives.extend(_rows(plan_id, data["objectives"], _OBJECTIVE_COLUMNS))
+                    kpis.extend(_rows(plan_id, data["kpis"], _KPI_COLUMNS))
+                    links.extend(_rows(plan_id, data.get("links", []), _LINK_COLUMNS))
+                connection.executemany(_INSERT_OBJECTIVE, objectives)
+                connection.executemany(_INSERT_KPI, kpis)
+                connection.executemany(_INSERT_LINK, links)
+        return plan_ids
+
+    def find(self, request_hash: str) -> Optional[int]:
+        """Return the ``plan_id`` stored for ``request_hash``, if any."""
+        with self._lock:
+            return self._find(self._connect(), request_hash)
+
+    @staticmethod
+    def _find(connection: sqlite3.Connection, request_hash: str) -> Optional[int]:
+        row = connection.execute(
+            "SELECT plan_id FROM plans WHERE request_hash = ?", (request_hash,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def get(self, plan_id: int) -> Optional[BusinessPlan]:
+        """Rebuild the stored plan, or ``None`` if ``plan_id`` is unknown."""
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT name, scope, horizon, themes, initiatives, capabilities, outputs, "
+                "assumptions_and_gaps FROM plans WHERE plan_id = ?",
+                (plan_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            sections = {
+                table: [
+                    dict(zip(columns, values))
+                    for values in connection.execute(
+                        f"SELECT {', '.join(columns)} FROM {table} "
+                        "WHERE plan_id = ? ORDER BY position",
+                        (plan_id,),
+                    )
+                ]
+                for table, columns in (
+                    ("objectives", _OBJECTIVE_COLUMNS),
+                    ("kpis", _KPI_COLUMNS),
+                    ("links", _LINK_COLUMNS),
+                )
+            }
+        name, scope, horizon, themes, *optional, gaps = row
+        data: Dict[str, object] = {
+            "plan": {"name": name, "scope": scope, "horizon": horizon, "themes": json.loads(themes)},
+            **sections,
+            "assumptions_and_gaps": json.loads(gaps),
+        }
+        for section, value in zip(_JSON_SECTIONS, optional):
+            if value is not None:
+                data[section] = json.loads(value)
+        return BusinessPlan.model_validate(data)
+
+    def delete(self, plan_id: int) -> bool:
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                cursor = connection.execute("DELETE FROM plans WHERE plan_id = ?", (plan_id,))
+        return cursor.rowcount > 0
+
+    def count(self, plan_filter: PlanFilter = PlanFilter()) -> int:
+        clauses, params = plan_filter.where()
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            (count,) = self._connect().execute(
+                f"SELECT COUNT(*) FROM plans{where}", params
+            ).fetchone()
+        return count
+
+    def _pages(
+        self,
+        sql: str,
+        params: List[object],
+        after: int,
+        limit: Optional[int],
+        page_size: int,
+    ) -> Iterator[List[tuple]]:
+        # Keyset pagination: each page is one short query under the lock, so a
+        # slow consumer never holds the connection while results stream out.
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            with self._lock:
+                rows = self._connect().execute(sql, [*params, after, size]).fetchall()
+            if not rows:
+                return
+            yield rows
+            after = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < size:
+                return
+
+    def query(
+        self,
+        plan_filter: PlanFilter = PlanFilter(),
+        after: int = 0,
+        limit: Optional[int] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[StoredPlanSummary]:
+        """Yield matching plans in ``plan_id`` order, starting after ``after``.
+
+        Pass the last ``plan_id`` seen as ``after`` to resume a query.
+        """
+        clauses, params = plan_filter.where()
+        clauses.append("plans.plan_id > ?")
+        sql = (
+            f"SELECT {_SUMMARY_COLUMNS} FROM plans WHERE {' AND '.join(clauses)} "
+            "ORDER BY plans.plan_id LIMIT ?"
+        )
+        for rows in self._pages(sql, params, after, limit, page_size):
+            for row in rows:
+                yield StoredPlanSummary(*row)
+
+    def iter_plans(
+        self,
+        plan_filter: PlanFilter = PlanFilter(),
+        after: int = 0,
+        limit: Optional[int] = None,
+    ) -> Iterator[Tuple[int, BusinessPlan]]:
+        """Yield ``(plan_id, plan)`` for matching plans, rebuilding one at a time."""
+        for summary in self.query(plan_filter, after, limit):
+            plan = self.get(summary.plan_id)
+            if plan is not None:
+                yield summary.plan_id, plan
+
+    def query_kpis(
+        self,
+        plan_filter: PlanFilter = PlanFilter(),
+        after: int = 0,
+        limit: Optional[int] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[Tuple[int, int, KPI]]:
+        """Yield ``(cursor, plan_id, kpi)`` for KPIs of matching plans.
+
+        ``plan_filter.leading_or_lagging`` selects the KPIs themselves rather
+        than whole plans. The cursor is the KPI's ``kpi_id``, which is never
+        reused; pass the last one as ``after`` to resume.
+        """
+        kpi_filter = PlanFilter(
+            plan_filter.scope, plan_filter.horizon, plan_filter.name, plan_filter.request_hash
+        )
+        clauses, params = kpi_filter.where()
+        if plan_filter.leading_or_lagging is not None:
+            clauses.append("kpis.leading_or_lagging = ?")
+            params.append(plan_filter.leading_or_lagging)
+        clauses.append("kpis.kpi_id > ?")
+        sql = (
+            f"SELECT kpis.kpi_id, kpis.plan_id, {', '.join('kpis.' + c for c in _KPI_COLUMNS)} "
+            f"FROM kpis JOIN plans ON plans.plan_id = kpis.plan_id "
+            f"WHERE {' AND '.join(clauses)} ORDER BY kpis.kpi_id LIMIT ?"
+        )
+        for rows in self._pages(sql, params, after, limit, page_size):
+            for cursor, plan_id, *values in rows:
+                yield cursor, plan_id, KPI.model_validate(dict(zip(_KPI_COLUMNS, values)))
+
+
+_default_store: Optional[PlanStore] = None
+
+
+def configure_plan_store(path: Optional[Path] = None) -> Optional[PlanStore]:
+    """Replace the process-wide store used by the API.
+
+    An unset ``path`` falls back to ``BP_GEN_PLAN_STORE``; with neither, the
+    API keeps no store.
+    """
+    global _default_store
+    if path is None and os.environ.get("BP_GEN_PLAN_STORE"):
+        path = Path(os.environ["BP_GEN_PLAN_STORE"])
+    if _default_store is not None:
+        _default_store.close()
+    _default_store = PlanStore(path) if path is not None else None
+    return _default_store
+
+
+def get_plan_store() -> Optional[PlanStore]:
+    if _default_store is None and os.environ.get("BP_GEN_PLAN_STORE"):
+        return configure_plan_store()
+    return _default_store
@@ -0,0 +1,138 @@
+"""Validation of externally produced plans, one at a time or in batches.
+
+Plans arrive as raw JSON text and are checked with the streaming validator,
+so a full ``BusinessPlan`` is never built; nodes that do not match the schema
+become ``schema_invalid`` errors instead of rejecting the whole plan. Batches
+are spread over a pool's workers and results come back in input order; the
+request deadline travels with each plan, including to worker processes.
+"""
+from __future__ import annotations
+
+import io
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bp_gen.deadlines import deadline_epoch, deadline_scope_until, future_result
+from bp_gen.relationships import compile_relationships
+from bp_gen.schemas import GenerationFlags
+from bp_gen.stream_validator import validate_plan_stream
+
+# Plans submitted but not yet yielded, per worker. Keeps memory bounded while
+# results stream back in input order.
+IN_FLIGHT_PER_WORKER = 4
+
+
+def invalid_json_result(exc: ValueError, codes_only: bool = False) -> Dict[str, object]:
+    """Result for a batch item that is not a JSON document."""
+    if codes_only:
+        return {"ok": False, "error_codes": {"invalid_json": 1}}
+    return {
+        "ok": False,
+        "errors": [{"code": "invalid_json", "message": str(exc), "path": ""}],
+        "error_summary": {"invalid_json": {"count": 1, "sample_paths": [""]}},
+        "truncated": False,
+    }
+
+
+def validate_plan_text(
+    raw: str,
+    flags: GenerationFlags,
+    allowed_relationships: Optional[List[str]] = None,
+    codes_only: bool = False,
+    max_errors: Optional[int] = None,
+) -> Dict[str, object]:
+    """Validate one serialized plan.
+
+    ``allowed_relationships=None`` skips the relationship checks.
+    """
+    relationships = None
+    if allowed_relationships is not None:
+        relationships = compile_relationships(allowed_relationships)
+    try:
+        return validate_plan_stream(
+            io.StringIO(raw),
+            flags,
+            max_errors=max_errors,
+            relationships=relationships,
+            codes_only=codes_only,
+        )
+    except ValueError as exc:
+        return invalid_json_result(exc, codes_only)
+
+
+def _validate_plan_text_until(
+    deadline: Optional[float], raw: str, *args: object
+) -> Dict[str, object]:
+    # ``deadline`` is wall-clock, so time spent in the pool's queue counts.
+    with deadline_scope_until(deadline):
+        return validate_plan_text(raw, *args)
+
+
+def validate_plans(
+    payloads: Iterable[Tuple[str, str]],
+    flags: GenerationFlags,
+    allowed_relationships: Optional[List[str]] = None,
+    codes_only: bool = False,
+    max_errors: Optional[int] = None,
+    submit: Optional[Callable[..., Future]] = None,
+    workers: int = 1,
+) -> Iterator[Tuple[str, Dict[str, object]]]:
+    """Validate ``(source, raw_json)`` pairs and yield ``(source, result)`` in input order.
+
+    ``submit`` hands work to a pool (e.g. ``ProcessPoolExecutor.submit``);
+    up to ``workers * IN_FLIGHT_PER_WORKER`` plans are then in flight at
+    once. Without it plans are validated inline. Either way the current
+    request deadline applies, and waits for pool results end with
+    :class:`~bp_gen.deadlines.DeadlineExceeded` once it passes.
+    """
+    args = (flags, allowed_relationships, codes_only, max_errors)
+    if submit is None:
+        for source, raw in payloads:
+            yield source, validate_plan_text(raw, *args)
+        return
+
+    pending: Deque[Tuple[str, Future]] = deque()
+    max_in_flight = max(1, workers) * IN_FLIGHT_PER_WORKER
+    deadline = deadline_epoch()
+    try:
+        for source, raw in payloads:
+            pending.append((source, submit(_validate_plan_text_until, deadline, raw, *args)))
+            if len(pending) >= max_in_flight:
+                source, future = pending.popleft()
+                yield source, future_result(future)
+        while pending:
+            source, future = pending.popleft()
+            yield source, future_result(future)
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def validate_plans_in_pool(
+    payloads: Iterable[Tuple[str, str]],
+    flags: GenerationFlags,
+    allowed_relationships: Optional[List[str]] = None,
+    codes_only: bool = False,
+    max_errors: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Iterator[Tuple[str, Dict[str, object]]]:
+    """Like :func:`validate_plans`, on a process pool owned by the call.
+
+    ``workers=1`` validates inline.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from validate_plans(payloads, flags, allowed_relationships, codes_only, max_errors)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from validate_plans(
+            payloads,
+            flags,
+            allowed_relationships,
+            codes_only,
+            max_errors,
+            submit=pool.submit,
+            workers=workers,
+        )
@@ -0,0 +1,456 @@
+"""Streaming, bounded-memory validation of plan JSON documents.
+
+:func:`validate_plan_stream` reads a serialized ``BusinessPlan`` incrementally
+and validates each node as it is parsed, keeping only ID sets and compact
+pending references instead of pydantic models for the whole document.
+Memory grows with the number of IDs, not with the size of the document.
+It reports the same codes, messages, paths and order as
+:func:`bp_gen.validator.validate_business_plan`, plus ``schema_invalid``
+errors for nodes that do not match their schema (which would make
+``BusinessPlan.model_validate`` reject the document outright).
+
+With ``codes_only`` no pydantic validation runs at all: node fields are
+checked directly against their declared types, no error details are kept and
+only ``ok`` and per-code counts are returned.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Set, Tuple, Union, get_args, get_origin
+
+from pydantic import BaseModel, ValidationError
+
+from bp_gen.deadlines import check_deadline
+from bp_gen.graph import NODE_TYPES
+from bp_gen.relationships import CompiledRelationships
+from bp_gen.schemas import (
+    KPI,
+    Capability,
+    Gap,
+    GenerationFlags,
+    Initiative,
+    Link,
+    Objective,
+    Output,
+    PlanMeta,
+)
+from bp_gen.validator import (
+    DEADLINE_CHECK_INTERVAL,
+    FLAG_RULES,
+    RANK_FLAGS,
+    RANK_KPI_UNKNOWN_OBJECTIVE,
+    RANK_KPIS_REQUIRED,
+    RANK_LINKS,
+    RANK_OBJECTIVE_MISSING_KPI,
+    RANK_OBJECTIVES_REQUIRED,
+    RANK_SCHEMA,
+    OrderedValidationReport,
+)
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+# Array sections that are parsed one element at a time.
+_NODE_SECTIONS: Dict[str, Tuple[str, type[BaseModel]]] = {
+    "objectives": ("objective", Objective),
+    "kpis": ("kpi", KPI),
+    "initiatives": ("initiative", Initiative),
+    "capabilities": ("capability", Capability),
+    "outputs": ("output", Output),
+}
+_STREAMED_SECTIONS: Dict[str, type[BaseModel]] = {
+    **{name: model for name, (_, model) in _NODE_SECTIONS.items()},
+    "links": Link,
+    "assumptions_and_gaps": Gap,
+}
+# (field, required, nullable, is_list) for the fast checks of ``codes_only`` runs.
+_FieldSpec = Tuple[str, bool, bool, bool]
+
+
+def _field_specs(model: type[BaseModel]) -> Tuple[_FieldSpec, ...]:
+    specs = []
+    for name, info in model.model_fields.items():
+        args = get_args(info.annotation)
+        is_list = get_origin(info.annotation) is list or any(get_origin(arg) is list for arg in args)
+        specs.append((name, info.is_required(), type(None) in args, is_list))
+    return tuple(specs)
+
+
+_FIELD_SPECS: Dict[str, Tuple[_FieldSpec, ...]] = {
+    "plan": _field_specs(PlanMeta),
+    **{name: _field_specs(model) for name, model in _STREAMED_SECTIONS.items()},
+}
+
+# BusinessPlan fields that may be omitted or null.
+_REQUIRED_KEYS = ("plan", "objectives", "kpis")
+_NULLABLE_SECTIONS = {"initiatives", "capabilities", "outputs"}
+
+# Link fields in RelationshipChecker.check() argument order.
+_LINK_RULE_FIELDS = ("type", "from_type", "from_id", "to_type", "to_id")
+_SECTION_ORDER = {
+    name: position
+    for position, name in enumerate(
+        ["plan", *_NODE_SECTIONS, "links", "assumptions_and_gaps"]
+    )
+}
+
+
+class _JsonStream:
+    """Minimal pull parser over a text stream.
+
+    Containers the caller wants to stream are walked with :meth:`expect` and
+    :meth:`peek`; every other value, including each array element, is decoded
+    whole with :meth:`value`.
+    """
+
+    def __init__(self, handle: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self._handle = handle
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # Grow reads with the pending buffer so an oversized value costs
+        # O(size) retries in total rather than O(size / chunk_size) re-parses.
+        chunk = self._handle.read(max(self._chunk_size, len(self._buffer) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            buffer = self._buffer
+            length = len(buffer)
+            pos = self._pos
+            while pos < length and buffer[pos] in " \t\r\n":
+                pos += 1
+            self._pos = pos
+            if pos < length:
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found or 'end of input'!r}.")
+        self._pos += 1
+
+    def expect_end(self) -> None:
+        found = self.peek()
+        if found:
+            raise ValueError(f"Expected end of input but found {found!r}.")
+
+    def key(self) -> str:
+        key = self.value()
+        if not isinstance(key, str):
+            raise ValueError(f"Expected a string object key but found {json.dumps(key)}.")
+        return key
+
+    def value(self) -> object:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number or literal that ends the buffer may continue in the
+            # next chunk; re-decode once more data is available.
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+class _StreamingChecks:
+    """Incremental cross-reference and flag checks over streamed nodes."""
+
+    def __init__(
+        self,
+        flags: GenerationFlags,
+        report: OrderedValidationReport,
+        relationships: Optional[CompiledRelationships] = None,
+        fast_schema: bool = False,
+    ) -> None:
+        self.flags = flags
+        self.report = report
+        self.fast_schema = fast_schema
+        self.check_relationship = None if relationships is None else relationships.checker().check
+        self.ids: Dict[str, Set[str]] = {node_type: set() for node_type in NODE_TYPES}
+        self.closed: Set[str] = set()
+        self.counts: Dict[str, int] = {}
+        self.objective_order: List[Optional[str]] = []
+        self.covered_objectives: Set[str] = set()
+        self.pending_kpis: List[Tuple[int, str, str]] = []
+        self.pending_link_ends: List[Tuple[int, int, str, str]] = []
+        self.seen_keys: Set[str] = set()
+
+    def schema_issue(
+        self,
+        section: str,
+        index: Optional[int],
+        position: int,
+        field: Optional[str],
+        message: str,
+    ) -> None:
+        self.report.add_at(
+            (RANK_SCHEMA, _SECTION_ORDER[section], -1 if index is None else index, position),
+            "schema_invalid",
+            "{}",
+            (message,),
+            (section, index, field),
+        )
+
+    def schema_error(self, section: str, index: Optional[int], exc: ValidationError) -> None:
+        for position, error in enumerate(exc.errors()):
+            field = ".".join(str(part) for part in error["loc"]) or None
+            self.schema_issue(section, index, position, field, error["msg"])
+
+    def check_schema(self, section: str, index: Optional[int], item: object) -> None:
+        if self.fast_schema:
+            self.check_fields(section, index, item)
+            return
+        model = PlanMeta if section == "plan" else _STREAMED_SECTIONS[section]
+        try:
+            model.__pydantic_validator__.validate_python(item)
+        except ValidationError as exc:
+            self.schema_error(section, index, exc)
+
+    def check_fields(self, section: str, index: Optional[int], item: object) -> None:
+        """Type-check the (string-valued) fields of ``item`` without pydantic."""
+        if not isinstance(item, dict):
+            self.schema_issue(section, index, 0, None, "Input should be a valid dictionary")
+            return
+        for position, (name, required, nullable, is_list) in enumerate(_FIELD_SPECS[section]):
+            if name not in item:
+                if required:
+                    self.schema_issue(section, index, position, name, "Field required")
+                continue
+            value = item[name]
+            if value is None and nullable:
+                continue
+            if is_list:
+                if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                    self.schema_issue(section, index, position, name, "Input should be a valid list")
+            elif not isinstance(value, str):
+                self.schema_issue(section, index, position, name, "Input should be a valid string")
+
+    def node(self, section: str, index: int, item: object) -> None:
+        self.check_schema(section, index, item)
+        if not isinstance(item, dict):
+            return
+
+        if section == "links":
+            self.link(index, item)
+            return
+        if section not in _NODE_SECTIONS:
+            return
+
+        node_type = _NODE_SECTIONS[section][0]
+        node_id = item.get("id")
+        if isinstance(node_id, str):
+            self.ids[node_type].add(node_id)
+        if node_type == "objective":
+            self.objective_order.append(node_id if isinstance(node_id, str) else None)
+        elif node_type == "kpi":
+            objective_id = item.get("objective_id")
+            if isinstance(objective_id, str):
+                self.covered_objectives.add(objective_id)
+                if "objective" in self.closed:
+                    self.check_kpi(index, node_id, objective_id)
+                else:
+                    self.pending_kpis.append((index, node_id, objective_id))
+
+    def check_kpi(self, index: int, kpi_id: object, objective_id: str) -> None:
+        if objective_id not in self.ids["objective"]:
+            self.report.add_at(
+                (RANK_KPI_UNKNOWN_OBJECTIVE, index, 0, 0),
+                "kpi_unknown_objective",
+                "KPI '{}' references unknown objective '{}'.",
+                (kpi_id, objective_id),
+                ("kpis", index, "objective_id"),
+            )
+
+    def link(self, index: int, item: Dict[str, object]) -> None:
+        for side, end in enumerate(("from", "to")):
+            node_type = item.get(f"{end}_type")
+            node_id = item.get(f"{end}_id")
+            if not isinstance(node_type, str) or not isinstance(node_id, str):
+                continue
+            if node_type not in self.ids:
+                self.report.add_at(
+                    (RANK_LINKS, index, side, 0),
+                    "link_unknown_type",
+                    "Link " + end + "_type '{}' is not recognized.",
+                    (node_type,),
+                    ("links", index, f"{end}_type"),
+                )
+            elif node_type in self.closed:
+                self.check_link_end(index, side, node_type, node_id)
+            else:
+                self.pending_link_ends.append((index, side, node_type, node_id))
+
+        if self.check_relationship is not None:
+            fields = [item.get(field) for field in _LINK_RULE_FIELDS]
+            if all(isinstance(value, str) for value in fields):
+                violation = self.check_relationship(*fields)
+                if violation is not None:
+                    code, template, args, field = violation
+                    self.report.add_at(
+                        (RANK_LINKS, index, 2, 0), code, template, args, ("links", index, field)
+                    )
+
+    def check_link_end(self, index: int, side: int, node_type: str, node_id: str) -> None:
+        if node_id not in self.ids[node_type]:
+            end = "from" if side == 0 else "to"
+            self.report.add_at(
+                (RANK_LINKS, index, side, 0),
+                "link_unknown_id",
+                "Link " + end + "_id '{}' not found for type '{}'.",
+                (node_id, node_type),
+                ("links", index, f"{end}_id"),
+            )
+
+    def close_section(self, section: str, count: int) -> None:
+        self.counts[section] = count
+        if section in _NODE_SECTIONS:
+            self.closed.add(_NODE_SECTIONS[section][0])
+        if section == "objectives":
+            for index, kpi_id, objective_id in self.pending_kpis:
+                self.check_kpi(index, kpi_id, objective_id)
+            self.pending_kpis = []
+
+    def finish(self) -> None:
+        for section in _NODE_SECTIONS:
+            if section not in self.counts:
+                self.close_section(section, 0)
+        for index, side, node_type, node_id in self.pending_link_ends:
+            self.check_link_end(index, side, node_type, node_id)
+        self.pending_link_ends = []
+
+        for key in _REQUIRED_KEYS:
+            if key not in self.seen_keys:
+                self.schema_issue(key, None, 0, None, "Field required")
+        if self.counts["objectives"] < 1:
+            self.report.add_at(
+                (RANK_OBJECTIVES_REQUIRED, 0, 0, 0),
+                "objectives_required",
+                "At least one objective is required.",
+                (),
+                ("objectives", None, None),
+            )
+        if self.counts["kpis"] < 1:
+            self.report.add_at(
+                (RANK_KPIS_REQUIRED, 0, 0, 0),
+                "kpis_required",
+                "At least one KPI is required.",
+                (),
+                ("kpis", None, None),
+            )
+        for index, objective_id in enumerate(self.objective_order):
+            if objective_id not in self.covered_objectives:
+                self.report.add_at(
+                    (RANK_OBJECTIVE_MISSING_KPI, index, 0, 0),
+                    "objective_missing_kpi",
+                    "Objective '{}' must have at least one KPI.",
+                    (objective_id,),
+                    ("objectives", index, "id"),
+                )
+        for position, (section, flag, code, label) in enumerate(FLAG_RULES):
+            if self.counts[section] and not getattr(self.flags, flag):
+                self.report.add_at(
+                    (RANK_FLAGS, position, 0, 0),
+                    code,
+                    f"{label} are present but disabled by flags.",
+                    (),
+                    (section, None, None),
+                )
+
+
+def _validate_stream(stream: _JsonStream, checks: _StreamingChecks) -> None:
+    stream.expect("{")
+    if stream.peek() == "}":
+        stream.expect("}")
+        return
+    while True:
+        key = stream.key()
+        stream.expect(":")
+        checks.seen_keys.add(key)
+        if key in _STREAMED_SECTIONS and stream.peek() == "[":
+            stream.expect("[")
+            count = 0
+            if stream.peek() == "]":
+                stream.expect("]")
+            else:
+                while True:
+                    if not count % DEADLINE_CHECK_INTERVAL:
+                        check_deadline()
+                    checks.node(key, count, stream.value())
+                    count += 1
+                    if stream.peek() == ",":
+                        stream.expect(",")
+                        continue
+                    stream.expect("]")
+                    break
+            checks.close_section(key, count)
+        else:
+            value = stream.value()
+            if key == "plan":
+                checks.check_schema("plan", None, value)
+            elif key in _STREAMED_SECTIONS:
+                if value is not None or key not in _NULLABLE_SECTIONS:
+                    checks.schema_issue(key, None, 0, None, "Input should be a valid list")
+                if key in _NODE_SECTIONS:
+                    checks.close_section(key, 0)
+        if stream.peek() == ",":
+            stream.expect(",")
+            continue
+        stream.expect("}")
+        return
+
+
+def validate_plan_stream(
+    source: Union[str, Path, IO[str]],
+    flags: GenerationFlags,
+    max_errors: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    relationships: Optional[CompiledRelationships] = None,
+    codes_only: bool = False,
+) -> Dict[str, object]:
+    """Validate a plan JSON document without materializing it.
+
+    ``source`` is a path or a text stream. The result has the same shape as
+    :func:`bp_gen.validator.validate_business_plan`, including the optional
+    ``relationships`` checks. With ``codes_only`` it is just ``ok`` and
+    ``error_codes`` (a count per code), and no pydantic validation runs.
+    Malformed JSON raises ``ValueError``; a passed request deadline raises
+    :class:`~bp_gen.deadlines.DeadlineExceeded`.
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, encoding="utf-8") as handle:
+            return validate_plan_stream(
+                handle, flags, max_errors, chunk_size, relationships, codes_only
+            )
+
+    check_deadline()
+    report = OrderedValidationReport(max_errors=0 if codes_only else max_errors)
+    checks = _StreamingChecks(flags, report, relationships, fast_schema=codes_only)
+    stream = _JsonStream(source, chunk_size)
+    _validate_stream(stream, checks)
+    stream.expect_end()
+    check_deadline()
+    checks.finish()
+    result = report.as_result()
+    if codes_only:
+        # ``as_result`` has put the counts in serial-validation order.
+        return {"ok": result["ok"], "error_codes": dict(report.counts)}
+    return result
@@ -1,8 +1,21 @@
 from __future__ import annotations
 
-from typing import Dict, List, Set
+import heapq
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+from bp_gen.columnar import UNKNOWN_ROW, UNKNOWN_TYPE_ROW, ColumnarPlan
+from bp_gen.deadlines import check_deadline
+from bp_gen.graph import (
+    NODE_TYPES,
+    SECTION_BY_NODE_TYPE,
+    Node,
+    PlanGraphIndex,
+    find_cycle,
+    reachable_from,
+    strongly_connected_components,
+)
 from bp_gen.models import Flags, PlanGraph
+from bp_gen.relationships import CompiledRelationships
 from bp_gen.schemas import BusinessPlan, GenerationFlags
 
 
@@ -39,98 +52,565 @@ def validate_plan(plan: PlanGraph, flags: Flags) -> List[str]:
     return errors
 
 
-def validate_business_plan(plan: BusinessPlan, flags: GenerationFlags) -> Dict[str, object]:
-    errors: List[Dict[str, str]] = []
+# Number of example paths kept per error code in the aggregated summary.
+SAMPLE_PATHS_PER_CODE = 5
 
-    def add_error(code: str, message: str, path: str) -> None:
-        errors.append({"code": code, "message": message, "path": path})
+# Items visited between request-deadline checks in the per-node loops.
+DEADLINE_CHECK_INTERVAL = 4096
 
+# (section, flag, error code, label) for sections that flags can disable.
+FLAG_RULES = (
+    ("initiatives", "include_initiatives", "initiatives_disabled", "Initiatives"),
+    ("capabilities", "include_capabilities", "capabilities_disabled", "Capabilities"),
+    ("outputs", "include_outputs", "outputs_disabled", "Outputs"),
+)
+
+
+# (collection, index, field); index and field are optional.
+ErrorPath = Tuple[str, Optional[int], Optional[str]]
+
+
+def _format_path(path: ErrorPath) -> str:
+    collection, index, field = path
+    text = collection if index is None else f"{collection}[{index}]"
+    return text if field is None else f"{text}.{field}"
+
+
+class _StopValidation(Exception):
+    """Raised internally once a fail-fast report is full."""
+
+
+class ValidationReport:
+    """Bounded collector for validation errors.
+
+    Errors are stored as ``(code, template, args, path)`` tuples and only
+    formatted when :meth:`errors` is called, so rejected plans do not pay for
+    message building. At most ``max_errors`` errors are retained; every error
+    is still counted per code with a few sample paths. With ``fail_fast`` the
+    traversal stops as soon as the cap is reached.
+    """
+
+    def __init__(self, max_errors: Optional[int] = None, fail_fast: bool = False) -> None:
+        if fail_fast and max_errors is None:
+            max_errors = 1
+        self.max_errors = max_errors
+        self.fail_fast = fail_fast
+        self.total = 0
+        self.counts: Dict[str, int] = {}
+        self._samples: Dict[str, List[ErrorPath]] = {}
+        self._retained: List[Tuple[str, str, Tuple[object, ...], ErrorPath]] = []
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self._retained)
+
+    def add(self, code: str, template: str, args: Tuple[object, ...], path: ErrorPath) -> None:
+        self.total += 1
+        self.counts[code] = self.counts.get(code, 0) + 1
+        samples = self._samples.setdefault(code, [])
+        if len(samples) < SAMPLE_PATHS_PER_CODE:
+            samples.append(path)
+
+        if self.max_errors is None or len(self._retained) < self.max_errors:
+            self._retained.append((code, template, args, path))
+        if self.fail_fast and len(self._retained) >= self.max_errors:
+            raise _StopValidation
+
+    def errors(self) -> List[Dict[str, str]]:
+        return [
+            {"code": code, "message": template.format(*args), "path": _format_path(path)}
+            for code, template, args, path in self._retained
+        ]
+
+    def summary(self) -> Dict[str, Dict[str, object]]:
+        return {
+            code: {
+                "count": count,
+                "sample_paths": [_format_path(path) for path in self._samples[code]],
+            }
+            for code, count in self.counts.items()
+        }
+
+    def as_result(self) -> Dict[str, object]:
+        return {
+            "ok": self.total == 0,
+            "errors": self.errors(),
+            "error_summary": self.summary(),
+            "truncated": self.truncated,
+        }
+
+
+SortKey = Tuple[int, ...]
+
+# Position of each check in a serial validate_business_plan run. Sort keys are
+# (rank, index, detail, detail) so every key has the same length.
+RANK_SCHEMA = 0
+RANK_OBJECTIVES_REQUIRED = 1
+RANK_KPIS_REQUIRED = 2
+RANK_KPI_UNKNOWN_OBJECTIVE = 3
+RANK_OBJECTIVE_MISSING_KPI = 4
+RANK_FLAGS = 5
+RANK_LINKS = 6
+RANK_STRUCTURE = 7
+
+
+def _negated(key: SortKey) -> SortKey:
+    return tuple(-part for part in key)
+
+
+class OrderedValidationReport(ValidationReport):
+    """Validation report for checks that run out of canonical order.
+
+    Each error carries an integer sort key giving its position in a serial
+    :func:`validate_business_plan` run; all keys must have the same length.
+    Only the ``max_errors`` smallest keys (and the smallest sample paths per
+    code) are kept, so memory stays bounded and :meth:`as_result` matches
+    the serial output exactly.
+    """
+
+    def __init__(self, max_errors: Optional[int] = None) -> None:
+        super().__init__(max_errors=max_errors)
+        self._heap: List[Tuple[SortKey, int, str, str, Tuple[object, ...], ErrorPath]] = []
+        self._sample_heaps: Dict[str, List[Tuple[SortKey, int, ErrorPath]]] = {}
+        self._first_keys: Dict[str, SortKey] = {}
+        self._sequence = 0
+
+    def add_at(
+        self,
+        key: SortKey,
+        code: str,
+        template: str,
+        args: Tuple[object, ...],
+        path: ErrorPath,
+    ) -> None:
+        self.total += 1
+        self.counts[code] = self.counts.get(code, 0) + 1
+        first = self._first_keys.get(code)
+        if first is None or key < first:
+            self._first_keys[code] = key
+        negated = _negated(key)
+        self._keep(negated, code, template, args, path)
+        self._keep_sample(negated, code, path)
+
+    def merge(self, other: "OrderedValidationReport") -> None:
+        """Fold in the errors collected by ``other``, e.g. on one shard of a plan."""
+        self.total += other.total
+        for code, count in other.counts.items():
+            self.counts[code] = self.counts.get(code, 0) + count
+        for code, key in other._first_keys.items():
+            first = self._first_keys.get(code)
+            if first is None or key < first:
+                self._first_keys[code] = key
+        for negated, _, code, template, args, path in other._heap:
+            self._keep(negated, code, template, args, path)
+        for code, samples in other._sample_heaps.items():
+            for negated, _, path in samples:
+                self._keep_sample(negated, code, path)
+
+    # Max-heaps on (key, sequence) keep the smallest entries seen so far.
+    def _keep(
+        self,
+        negated: SortKey,
+        code: str,
+        template: str,
+        args: Tuple[object, ...],
+        path: ErrorPath,
+    ) -> None:
+        self._sequence += 1
+        entry = (negated, -self._sequence, code, template, args, path)
+        if self.max_errors is None or len(self._heap) < self.max_errors:
+            heapq.heappush(self._heap, entry)
+        elif self._heap and entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def _keep_sample(self, negated: SortKey, code: str, path: ErrorPath) -> None:
+        self._sequence += 1
+        samples = self._sample_heaps.setdefault(code, [])
+        sample = (negated, -self._sequence, path)
+        if len(samples) < SAMPLE_PATHS_PER_CODE:
+            heapq.heappush(samples, sample)
+        elif sample > samples[0]:
+            heapq.heapreplace(samples, sample)
+
+    def add(self, code: str, template: str, args: Tuple[object, ...], path: ErrorPath) -> None:
+        raise TypeError("OrderedValidationReport requires add_at() with a sort key")
+
+    def as_result(self) -> Dict[str, object]:
+        self._retained = [entry[2:] for entry in sorted(self._heap, reverse=True)]
+        codes = sorted(self.counts, key=self._first_keys.__getitem__)
+        self.counts = {code: self.counts[code] for code in codes}
+        self._samples = {
+            code: [sample[2] for sample in sorted(self._sample_heaps[code], reverse=True)]
+            for code in codes
+        }
+        return super().as_result()
+
+
+def validate_business_plan(
+    plan: Union[BusinessPlan, ColumnarPlan],
+    flags: GenerationFlags,
+    max_errors: Optional[int] = None,
+    fail_fast: bool = False,
+    index: Optional[PlanGraphIndex] = None,
+    relationships: Optional[CompiledRelationships] = None,
+    structure: bool = False,
+) -> Dict[str, object]:
+    """Validate cross-references and flag rules for a business plan.
+
+    Lookups go through a :class:`PlanGraphIndex`, built here unless the
+    caller already has one. Objectives, KPIs and links are each visited
+    once; the returned ``errors`` keep the same order and shape regardless of
+    ``max_errors``. Besides ``ok`` and ``errors`` the result carries an
+    ``error_summary`` with a count and sample paths per code, and
+    ``truncated`` when errors were dropped.
+
+    With ``relationships`` (see :func:`bp_gen.relationships.compile_relationships`)
+    each link's type, endpoint types and cardinality are also checked.
+    ``structure`` adds a graph analysis pass after the per-link checks:
+    cycles (``graph_cycle``), nodes without links (``node_orphan``), nodes
+    only reachable through a cycle (``node_unreachable``) and KPIs,
+    initiatives or outputs that trace back to no objective
+    (``node_untraceable``). It runs in O(V+E).
+
+    A :class:`~bp_gen.columnar.ColumnarPlan` is checked on its integer
+    columns directly (``index`` is ignored) with identical results.
+
+    Raises :class:`~bp_gen.deadlines.DeadlineExceeded` when the current
+    request deadline passes mid-validation.
+    """
+    check_deadline()
+    report = ValidationReport(max_errors=max_errors, fail_fast=fail_fast)
+    try:
+        if isinstance(plan, ColumnarPlan):
+            _run_columnar_checks(plan, flags, report, relationships)
+            if structure:
+                check_deadline()
+                _run_structure_checks(*_columnar_graph(plan), report)
+        else:
+            if index is None:
+                index = PlanGraphIndex.from_business_plan(plan, links=False)
+            _run_business_plan_checks(plan, flags, index, report, relationships)
+            if structure:
+                check_deadline()
+                _run_structure_checks(*_business_plan_graph(plan), report)
+    except _StopValidation:
+        pass
+    return report.as_result()
+
+
+def _run_business_plan_checks(
+    plan: BusinessPlan,
+    flags: GenerationFlags,
+    graph: PlanGraphIndex,
+    report: ValidationReport,
+    relationships: Optional[CompiledRelationships] = None,
+) -> None:
+    add = report.add
     objectives = plan.objectives or []
     kpis = plan.kpis or []
 
     if len(objectives) < 1:
-        add_error("objectives_required", "At least one objective is required.", "objectives")
+        add(
+            "objectives_required",
+            "At least one objective is required.",
+            (),
+            ("objectives", None, None),
+        )
 
     if len(kpis) < 1:
-        add_error("kpis_required", "At least one KPI is required.", "kpis")
+        add("kpis_required", "At least one KPI is required.", (), ("kpis", None, None))
 
-    objective_ids = {objective.id for objective in objectives}
-    kpis_by_objective: Dict[str, List[str]] = {objective.id: [] for objective in objectives}
+    objective_ids = graph.nodes["objective"]
     for index, kpi in enumerate(kpis):
-        if kpi.objective_id not in objective_ids:
-            add_error(
+        if not index % DEADLINE_CHECK_INTERVAL:
+            check_deadline()
+        objective_id = kpi.objective_id
+        if objective_id not in objective_ids:
+            add(
                 "kpi_unknown_objective",
-                f"KPI '{kpi.id}' references unknown objective '{kpi.objective_id}'.",
-                f"kpis[{index}].objective_id",
+                "KPI '{}' references unknown objective '{}'.",
+                (kpi.id, objective_id),
+                ("kpis", index, "objective_id"),
             )
-        else:
-            kpis_by_objective[kpi.objective_id].append(kpi.id)
 
     for index, objective in enumerate(objectives):
-        if len(kpis_by_objective.get(objective.id, [])) < 1:
-            add_error(
+        if objective.id not in graph.kpis_by_objective:
+            add(
                 "objective_missing_kpi",
-                f"Objective '{objective.id}' must have at least one KPI.",
-                f"objectives[{index}].id",
+                "Objective '{}' must have at least one KPI.",
+                (objective.id,),
+                ("objectives", index, "id"),
             )
 
-    if not flags.include_initiatives and plan.initiatives:
-        add_error(
-            "initiatives_disabled",
-            "Initiatives are present but disabled by flags.",
-            "initiatives",
-        )
+    for section, flag, code, label in FLAG_RULES:
+        if not getattr(flags, flag) and getattr(plan, section):
+            add(code, f"{label} are present but disabled by flags.", (), (section, None, None))
 
-    if not flags.include_capabilities and plan.capabilities:
-        add_error(
-            "capabilities_disabled",
-            "Capabilities are present but disabled by flags.",
-            "capabilities",
-        )
+    check_relationship = None if relationships is None else relationships.checker().check
+    id_registry = graph.nodes
+    for index, link in enumerate(plan.links):
+        if not index % DEADLINE_CHECK_INTERVAL:
+            check_deadline()
+        from_ids = id_registry.get(link.from_type)
+        if from_ids is None:
+            add(
+                "link_unknown_type",
+                "Link from_type '{}' is not recognized.",
+                (link.from_type,),
+                ("links", index, "from_type"),
+            )
+        elif link.from_id not in from_ids:
+            add(
+                "link_unknown_id",
+                "Link from_id '{}' not found for type '{}'.",
+                (link.from_id, link.from_type),
+                ("links", index, "from_id"),
+            )
+
+        to_ids = id_registry.get(link.to_type)
+        if to_ids is None:
+            add(
+                "link_unknown_type",
+                "Link to_type '{}' is not recognized.",
+                (link.to_type,),
+                ("links", index, "to_type"),
+            )
+        elif link.to_id not in to_ids:
+            add(
+                "link_unknown_id",
+                "Link to_id '{}' not found for type '{}'.",
+                (link.to_id, link.to_type),
+                ("links", index, "to_id"),
+            )
+
+        if check_relationship is not None:
+            violation = check_relationship(
+                link.type, link.from_type, link.from_id, link.to_type, link.to_id
+            )
+            if violation is not None:
+                code, template, args, field = violation
+                add(code, template, args, ("links", index, field))
+
+
+# Link columns in RelationshipChecker.check() argument order.
+_LINK_RULE_FIELDS = ("type", "from_type", "from_id", "to_type", "to_id")
 
-    if not flags.include_outputs and plan.outputs:
-        add_error(
-            "outputs_disabled",
-            "Outputs are present but disabled by flags.",
-            "outputs",
+
+def _run_columnar_checks(
+    plan: ColumnarPlan,
+    flags: GenerationFlags,
+    report: ValidationReport,
+    relationships: Optional[CompiledRelationships] = None,
+) -> None:
+    # Mirrors _run_business_plan_checks; strings are only decoded for errors.
+    add = report.add
+    value = plan.pool.value
+    objectives = plan.tables["objectives"]
+    kpis = plan.tables["kpis"]
+    links = plan.tables["links"]
+
+    if len(objectives) < 1:
+        add(
+            "objectives_required",
+            "At least one objective is required.",
+            (),
+            ("objectives", None, None),
         )
 
-    def collect_ids(items: List[object]) -> Set[str]:
-        return {item.id for item in items}
+    if len(kpis) < 1:
+        add("kpis_required", "At least one KPI is required.", (), ("kpis", None, None))
 
-    id_registry: Dict[str, Set[str]] = {
-        "objective": collect_ids(objectives),
-        "kpi": collect_ids(kpis),
-        "initiative": collect_ids(plan.initiatives or []),
-        "capability": collect_ids(plan.capabilities or []),
-        "output": collect_ids(plan.outputs or []),
-    }
+    kpi_ids = kpis.columns["id"]
+    kpi_objective_ids = kpis.columns["objective_id"]
+    for index, row in enumerate(kpis.columns["objective_row"]):
+        if not index % DEADLINE_CHECK_INTERVAL:
+            check_deadline()
+        if row == UNKNOWN_ROW:
+            add(
+                "kpi_unknown_objective",
+                "KPI '{}' references unknown objective '{}'.",
+                (value(kpi_ids[index]), value(kpi_objective_ids[index])),
+                ("kpis", index, "objective_id"),
+            )
 
-    for index, link in enumerate(plan.links):
-        if link.from_type not in id_registry:
-            add_error(
+    covered = set(kpi_objective_ids)
+    for index, code in enumerate(objectives.columns["id"]):
+        if code not in covered:
+            add(
+                "objective_missing_kpi",
+                "Objective '{}' must have at least one KPI.",
+                (value(code),),
+                ("objectives", index, "id"),
+            )
+
+    for section, flag, code, label in FLAG_RULES:
+        if not getattr(flags, flag) and plan.section_length(section):
+            add(code, f"{label} are present but disabled by flags.", (), (section, None, None))
+
+    check_relationship = None if relationships is None else relationships.checker().check
+    columns = links.columns
+    for index, (from_row, to_row) in enumerate(zip(columns["from_row"], columns["to_row"])):
+        if not index % DEADLINE_CHECK_INTERVAL:
+            check_deadline()
+        if from_row == UNKNOWN_TYPE_ROW:
+            add(
                 "link_unknown_type",
-                f"Link from_type '{link.from_type}' is not recognized.",
-                f"links[{index}].from_type",
+                "Link from_type '{}' is not recognized.",
+                (value(columns["from_type"][index]),),
+                ("links", index, "from_type"),
             )
-        elif link.from_id not in id_registry[link.from_type]:
-            add_error(
+        elif from_row == UNKNOWN_ROW:
+            add(
                 "link_unknown_id",
-                f"Link from_id '{link.from_id}' not found for type '{link.from_type}'.",
-                f"links[{index}].from_id",
+                "Link from_id '{}' not found for type '{}'.",
+                (value(columns["from_id"][index]), value(columns["from_type"][index])),
+                ("links", index, "from_id"),
             )
 
-        if link.to_type not in id_registry:
-            add_error(
+        if to_row == UNKNOWN_TYPE_ROW:
+            add(
                 "link_unknown_type",
-                f"Link to_type '{link.to_type}' is not recognized.",
-                f"links[{index}].to_type",
+                "Link to_type '{}' is not recognized.",
+                (value(columns["to_type"][index]),),
+                ("links", index, "to_type"),
             )
-        elif link.to_id not in id_registry[link.to_type]:
-            add_error(
+        elif to_row == UNKNOWN_ROW:
+            add(
                 "link_unknown_id",
-                f"Link to_id '{link.to_id}' not found for type '{link.to_type}'.",
-                f"links[{index}].to_id",
+                "Link to_id '{}' not found for type '{}'.",
+                (value(columns["to_id"][index]), value(columns["to_type"][index])),
+                ("links", index, "to_id"),
             )
 
-    return {"ok": len(errors) == 0, "errors": errors}
+        if check_relationship is not None:
+            violation = check_relationship(
+                *(value(columns[field][index]) for field in _LINK_RULE_FIELDS)
+            )
+            if violation is not None:
+                code, template, args, field = violation
+                add(code, template, args, ("links", index, field))
+
+
+# Node types that must trace back to an objective.
+TRACEABLE_NODE_TYPES = ("kpi", "initiative", "output")
+
+# Longest cycle spelled out in a graph_cycle message.
+_CYCLE_DISPLAY_LIMIT = 10
+
+# (node_type, node_id, row) and (from_type, from_id, to_type, to_id).
+_GraphNodes = Iterable[Tuple[str, str, int]]
+_GraphEdges = Iterable[Tuple[str, str, str, str]]
+
+
+def _business_plan_graph(plan: BusinessPlan) -> Tuple[_GraphNodes, _GraphEdges]:
+    def nodes() -> Iterator[Tuple[str, str, int]]:
+        for node_type in NODE_TYPES:
+            for row, item in enumerate(getattr(plan, SECTION_BY_NODE_TYPE[node_type]) or []):
+                yield node_type, item.id, row
+
+    def edges() -> Iterator[Tuple[str, str, str, str]]:
+        # KPI.objective_id is an edge even without an explicit link.
+        for kpi in plan.kpis or []:
+            yield "objective", kpi.objective_id, "kpi", kpi.id
+        for link in plan.links:
+            yield link.from_type, link.from_id, link.to_type, link.to_id
+
+    return nodes(), edges()
+
+
+def _columnar_graph(plan: ColumnarPlan) -> Tuple[_GraphNodes, _GraphEdges]:
+    value = plan.pool.value
+
+    def nodes() -> Iterator[Tuple[str, str, int]]:
+        for node_type in NODE_TYPES:
+            table = plan.tables[SECTION_BY_NODE_TYPE[node_type]]
+            if table is not None:
+                for row, code in enumerate(table.columns["id"]):
+                    yield node_type, value(code), row
+
+    def edges() -> Iterator[Tuple[str, str, str, str]]:
+        kpis = plan.tables["kpis"].columns
+        for objective_id, kpi_id in zip(kpis["objective_id"], kpis["id"]):
+            yield "objective", value(objective_id), "kpi", value(kpi_id)
+        links = plan.tables["links"].columns
+        for row in zip(links["from_type"], links["from_id"], links["to_type"], links["to_id"]):
+            yield tuple(value(code) for code in row)
+
+    return nodes(), edges()
+
+
+def _run_structure_checks(
+    nodes: _GraphNodes,
+    edges: _GraphEdges,
+    report: ValidationReport,
+) -> None:
+    # Number nodes in plan order (first occurrence wins for repeated IDs);
+    # edges with unknown endpoints were already reported by the link checks.
+    number: Dict[Node, int] = {}
+    paths: List[ErrorPath] = []
+    for node_type, node_id, row in nodes:
+        node = (node_type, node_id)
+        if node not in number:
+            number[node] = len(paths)
+            paths.append((SECTION_BY_NODE_TYPE[node_type], row, "id"))
+    labels = list(number)
+    adjacency: List[List[int]] = [[] for _ in labels]
+    in_degree = [0] * len(labels)
+    for from_type, from_id, to_type, to_id in edges:
+        source = number.get((from_type, from_id))
+        target = number.get((to_type, to_id))
+        if source is not None and target is not None:
+            adjacency[source].append(target)
+            in_degree[target] += 1
+
+    add = report.add
+    cyclic = [
+        component
+        for component in strongly_connected_components(adjacency)
+        if len(component) > 1 or component[0] in adjacency[component[0]]
+    ]
+    for component in sorted(cyclic, key=min):
+        cycle = find_cycle(adjacency, component)
+        shown = [f"{labels[node][0]} '{labels[node][1]}'" for node in cycle]
+        if len(shown) > _CYCLE_DISPLAY_LIMIT:
+            shown = shown[: _CYCLE_DISPLAY_LIMIT - 1] + ["...", shown[-1]]
+        add(
+            "graph_cycle",
+            "Cycle among {} node(s): {}.",
+            (len(component), " -> ".join(shown)),
+            paths[cycle[0]],
+        )
+
+    orphan = [not adjacency[node] and not in_degree[node] for node in range(len(labels))]
+    for node, (node_type, node_id) in enumerate(labels):
+        if orphan[node]:
+            add("node_orphan", "{} '{}' has no links.", (node_type, node_id), paths[node])
+
+    from_roots = reachable_from(
+        adjacency, (node for node in range(len(labels)) if not in_degree[node])
+    )
+    for node, (node_type, node_id) in enumerate(labels):
+        if not from_roots[node]:
+            add(
+                "node_unreachable",
+                "{} '{}' is only reachable through a cycle.",
+                (node_type, node_id),
+                paths[node],
+            )
+
+    from_objectives = reachable_from(
+        adjacency, (node for node, (node_type, _) in enumerate(labels) if node_type == "objective")
+    )
+    for node, (node_type, node_id) in enumerate(labels):
+        if (
+            node_type in TRACEABLE_NODE_TYPES
+            and from_roots[node]
+            and not orphan[node]
+            and not from_objectives[node]
+        ):
+            add(
+                "node_untraceable",
+                "{} '{}' does not trace back to any objective.",
+                (node_type, node_id),
+                paths[node],
+            )
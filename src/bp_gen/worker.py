@@ -0,0 +1,183 @@
+"""Warm CLI worker reachable over a Unix socket.
+
+``bp-gen worker --socket PATH`` imports the heavy modules once and then
+serves CLI invocations: each connection carries one command, which runs in
+a process forked from the warm worker. Clients that set
+``BP_GEN_WORKER_SOCKET`` forward their arguments there and skip interpreter
+start-up costs beyond this module's standard-library imports.
+
+The protocol is one JSON line each way: the client sends
+``{"argv": [...], "cwd": "...", "env": {...}}`` and receives
+``{"exit_code": int, "stdout": str, "stderr": str}``. ``env`` carries the
+client's ``BP_GEN_*`` variables, which replace the worker's own for that
+command, so a command behaves the same whether or not it is forwarded.
+
+Commands run with the worker's privileges, so the socket is created
+owner-only (``0600``) and, where the platform reports peer credentials,
+connections from other users are refused.
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Dict, List, Optional, Tuple
+
+from bp_gen.cli import WORKER_SOCKET_ENV
+
+# How long a client waits for a command to finish before giving up.
+CLIENT_TIMEOUT_SECONDS = 600.0
+
+# Environment variables with this prefix are forwarded with each command.
+FORWARDED_ENV_PREFIX = "BP_GEN_"
+
+
+def _forwarded_env() -> Dict[str, str]:
+    return {
+        name: value
+        for name, value in os.environ.items()
+        if name.startswith(FORWARDED_ENV_PREFIX) and name != WORKER_SOCKET_ENV
+    }
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "") not in ("", "0", "false")
+
+
+def _apply_env(env: Dict[str, str]) -> None:
+    """Replace this process's ``BP_GEN_*`` variables with a client's."""
+    for name in list(os.environ):
+        if name.startswith(FORWARDED_ENV_PREFIX) and name != WORKER_SOCKET_ENV:
+            del os.environ[name]
+    os.environ.update(env)
+    # These are read once at import, which the warm worker has already done.
+    from bp_gen.instrumentation import enable_timings
+    from bp_gen.schemas import set_strict_construction
+
+    set_strict_construction(_env_flag("BP_GEN_STRICT_MODELS"))
+    enable_timings(_env_flag("BP_GEN_TIMINGS"))
+
+
+def _exit_code(exc: SystemExit) -> Tuple[int, Optional[str]]:
+    """Translate ``SystemExit`` the same way the interpreter does."""
+    if exc.code is None:
+        return 0, None
+    if isinstance(exc.code, int):
+        return exc.code, None
+    return 1, str(exc.code)
+
+
+def run_command(argv: List[str]) -> Tuple[int, str, str]:
+    """Run a CLI command in this process and capture ``(exit_code, stdout, stderr)``."""
+    from bp_gen.cli import run
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            run(argv)
+            exit_code = 0
+        except SystemExit as exc:
+            exit_code, message = _exit_code(exc)
+            if message is not None:
+                print(message, file=sys.stderr)
+        except Exception:  # noqa: BLE001 - report like an uncaught CLI error
+            traceback.print_exc()
+            exit_code = 1
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        message = json.loads(self.rfile.readline())
+        os.chdir(message["cwd"])
+        _apply_env(message.get("env", {}))
+        exit_code, stdout, stderr = run_command(message["argv"])
+        reply = {"exit_code": exit_code, "stdout": stdout, "stderr": stderr}
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+def _peer_uid(connection: socket.socket) -> Optional[int]:
+    """The connecting process's user ID, or ``None`` where it is unavailable."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = connection.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _pid, uid, _gid = struct.unpack("3i", credentials)
+    return uid
+
+
+class _ForkingUnixServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    # Each command runs in its own fork, so changes to the working directory,
+    # stdout or module state never leak into the warm parent.
+
+    def server_bind(self) -> None:
+        # Bind under a restrictive umask so the socket is never reachable by
+        # other users, not even between bind and chmod.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        os.chmod(self.server_address, 0o600)
+
+    def verify_request(self, request: socket.socket, client_address: object) -> bool:
+        uid = _peer_uid(request)
+        return uid is None or uid == os.getuid()
+
+
+def _warm_up() -> None:
+    # Importing builds every pydantic model class once; forked commands
+    # inherit them ready to use.
+    import bp_gen.services.batch  # noqa: F401
+    import bp_gen.services.cache  # noqa: F401
+    import bp_gen.services.plan_generator  # noqa: F401
+
+
+def serve(socket_path: str) -> None:
+    """Serve CLI commands on ``socket_path`` until interrupted."""
+    _warm_up()
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with _ForkingUnixServer(socket_path, _CommandHandler) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+
+def call_worker(socket_path: str, argv: List[str]) -> Optional[int]:
+    """Run ``argv`` on the warm worker and replay its output.
+
+    Returns the command's exit code, or ``None`` when no worker is listening
+    so the caller can run the command locally.
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(CLIENT_TIMEOUT_SECONDS)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        client.close()
+        return None
+
+    with client, client.makefile("rwb") as stream:
+        request = {"argv": argv, "cwd": os.getcwd(), "env": _forwarded_env()}
+        stream.write(json.dumps(request).encode("utf-8") + b"\n")
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        raise SystemExit(f"The bp-gen worker at {socket_path} closed the connection.")
+    reply = json.loads(line)
+
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    return reply["exit_code"]
@@ -0,0 +1,291 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from bp_gen import api
+from bp_gen.deadlines import DeadlineExceeded, check_deadline, deadline_scope, remaining_seconds
+from bp_gen.schemas import BusinessPlan, GeneratePlanRequest
+from bp_gen.services.admission import (
+    SHED_CLIENT_LIMIT,
+    SHED_QUEUE_FULL,
+    SHED_QUEUE_TIMEOUT,
+    AdmissionController,
+    AdmissionRejected,
+)
+from bp_gen.services.plan_generator import generate_plan
+from bp_gen.validator import validate_business_plan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+
+
+def load_payload() -> dict:
+    return json.loads((SAMPLES / "example_input.json").read_text())
+
+
+def load_plan() -> dict:
+    return json.loads((SAMPLES / "golden_plan.json").read_text())
+
+
+def test_client_over_its_limit_gets_429():
+    controller = AdmissionController(max_concurrency=4, max_per_client=1)
+    with controller.admit("a"):
+        with pytest.raises(AdmissionRejected) as excinfo:
+            controller.acquire("a")
+        with controller.admit("b"):
+            pass
+
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after >= 1
+    assert controller.stats()["shed"][SHED_CLIENT_LIMIT] == 1
+
+
+def test_full_queue_and_queue_timeout_get_503():
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    with controller.admit("a"):
+        with pytest.raises(AdmissionRejected) as full:
+            controller.acquire("b")
+
+    controller = AdmissionController(max_concurrency=1, max_queue_wait=0.01)
+    with controller.admit("a"):
+        with pytest.raises(AdmissionRejected) as timed_out:
+            controller.acquire("b")
+
+    assert (full.value.reason, full.value.status_code) == (SHED_QUEUE_FULL, 503)
+    assert (timed_out.value.reason, timed_out.value.status_code) == (SHED_QUEUE_TIMEOUT, 503)
+    assert controller.stats()["queued"] == 0
+    assert controller.stats()["clients"] == 0
+
+
+def test_waiters_are_admitted_in_arrival_order():
+    controller = AdmissionController(max_concurrency=1)
+    order = []
+    controller.acquire("first")
+
+    def wait(name):
+        with controller.admit(name):
+            order.append(name)
+
+    threads = []
+    for name in ("b", "c", "d"):
+        thread = threading.Thread(target=wait, args=(name,))
+        thread.start()
+        threads.append(thread)
+        while controller.stats()["queued"] < len(threads):
+            time.sleep(0.001)
+    controller.release("first", 0.0)
+    for thread in threads:
+        thread.join()
+
+    assert order == ["b", "c", "d"]
+    assert controller.stats()["admitted"] == 4
+
+
+def test_async_waiters_queue_without_threads_and_share_the_fifo():
+    controller = AdmissionController(max_concurrency=1, max_queue_wait=5)
+    order = []
+    controller.acquire("first")
+
+    async def wait(name):
+        async with controller.admit_async(name):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async def main():
+        tasks = [asyncio.create_task(wait(name)) for name in ("b", "c", "d")]
+        while controller.stats()["queued"] < 3:
+            await asyncio.sleep(0.001)
+        assert threading.active_count() == threads_before
+        # Released from another thread, as a sync request would be.
+        await asyncio.to_thread(controller.release, "first", 0.0)
+        await asyncio.gather(*tasks)
+
+    threads_before = threading.active_count()
+    asyncio.run(main())
+
+    assert order == ["b", "c", "d"]
+    assert controller.stats()["active"] == 0
+    assert controller.stats()["clients"] == 0
+
+
+def test_async_queue_timeout_and_cancellation_free_the_queue():
+    controller = AdmissionController(max_concurrency=1, max_queue_wait=0.01)
+
+    async def main():
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await controller.acquire_async("b")
+        waiting = asyncio.create_task(controller.acquire_async("c"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        return timed_out.value
+
+    with controller.admit("a"):
+        rejected = asyncio.run(main())
+
+    assert (rejected.reason, rejected.status_code) == (SHED_QUEUE_TIMEOUT, 503)
+    assert controller.stats()["queued"] == 0
+    assert controller.stats()["clients"] == 0
+
+
+def test_nested_deadline_never_extends_outer():
+    assert remaining_seconds() is None
+    with deadline_scope(0.5):
+        with deadline_scope(60):
+            assert remaining_seconds() <= 0.5
+    assert remaining_seconds() is None
+
+
+def test_expired_deadline_abandons_generation_and_validation():
+    request = GeneratePlanRequest.model_validate(load_payload())
+    plan = generate_plan(request)
+    assert isinstance(plan, BusinessPlan)
+
+    with deadline_scope(0):
+        with pytest.raises(DeadlineExceeded):
+            generate_plan(request)
+        with pytest.raises(DeadlineExceeded):
+            validate_business_plan(plan, request.flags)
+        with pytest.raises(DeadlineExceeded):
+            check_deadline()
+
+
+def test_api_sheds_with_retry_after(monkeypatch):
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(api, "_admission", controller)
+    client = TestClient(api.app)
+
+    with controller.admit("busy"):
+        response = client.post("/generate-plan", json=load_payload())
+    metrics = client.get("/metrics").text
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert 'bp_gen_admission_shed_total{reason="queue_full"} 1' in metrics
+    assert "bp_gen_admission_queue_length 0" in metrics
+
+
+def test_api_per_client_limit_uses_client_id_header(monkeypatch):
+    controller = AdmissionController(max_concurrency=4, max_per_client=1)
+    monkeypatch.setattr(api, "_admission", controller)
+    client = TestClient(api.app)
+
+    with controller.admit("portal"):
+        limited = client.post("/generate-plan", json=load_payload(), headers={"X-Client-Id": "portal"})
+        other = client.post("/generate-plan", json=load_payload(), headers={"X-Client-Id": "other"})
+
+    assert limited.status_code == 429
+    assert "Retry-After" in limited.headers
+    assert other.status_code == 200
+
+
+def test_api_expired_deadline_returns_503(monkeypatch):
+    monkeypatch.setattr(api, "_admission", AdmissionController(max_concurrency=1))
+    monkeypatch.setenv("BP_GEN_REQUEST_TIMEOUT", "0")
+    client = TestClient(api.app)
+
+    response = client.post(
+        "/generate-plan",
+        json=load_payload(),
+        headers={"X-Request-Timeout": "0.001", "Cache-Control": "no-cache"},
+    )
+
+    assert response.status_code == 503
+    assert api._admission.stats()["shed"]["deadline_exceeded"] == 1
+    assert api._admission.stats()["active"] == 0
+
+
+def test_api_coalesced_requests_take_one_admission_slot(monkeypatch):
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(api, "_admission", controller)
+    release = threading.Event()
+
+    class BlockingExecutor:
+        def run(self, request, bypass=False):
+            release.wait(5)
+            return "clarifying_questions", b'{"clarifying_questions": []}'
+
+    monkeypatch.setattr(api, "get_executor", lambda: BlockingExecutor())
+    client = TestClient(api.app)
+    responses = []
+
+    def post():
+        responses.append(client.post("/generate-plan", json=load_payload()))
+
+    threads = [threading.Thread(target=post) for _ in range(2)]
+    threads[0].start()
+    deadline = time.monotonic() + 5
+    while controller.stats()["active"] < 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    threads[1].start()
+    while api._in_flight.stats()["waiting"] < 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert controller.stats()["admitted"] == 1
+    assert controller.stats()["shed"]["queue_full"] == 0
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/generate-plans", lambda: [load_payload()]),
+        ("/validate-plan", lambda: load_plan()),
+        ("/validate-plan", lambda: [load_plan()]),
+    ],
+)
+def test_api_bulk_and_validation_endpoints_are_admitted(monkeypatch, path, body):
+    controller = AdmissionController(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(api, "_admission", controller)
+    client = TestClient(api.app)
+
+    with controller.admit("busy"):
+        shed = client.post(path, json=body())
+    admitted = client.post(path, json=body())
+
+    assert shed.status_code == 503
+    assert "Retry-After" in shed.headers
+    assert admitted.status_code == 200
+    assert controller.stats()["admitted"] == 2
+    assert controller.stats()["active"] == 0
+
+
+def test_api_validation_honours_the_request_deadline(monkeypatch):
+    monkeypatch.setattr(api, "_admission", AdmissionController(max_concurrency=1))
+    monkeypatch.setenv("BP_GEN_REQUEST_TIMEOUT", "0")
+    client = TestClient(api.app)
+
+    single = client.post("/validate-plan", json=load_plan())
+    batch = client.post("/validate-plan", json=[load_plan(), load_plan()])
+
+    assert single.status_code == 503
+    assert batch.status_code == 503
+    assert batch.headers["Retry-After"] == "1"
+    assert api._admission.stats()["shed"]["deadline_exceeded"] == 2
+    assert api._admission.stats()["active"] == 0
+
+
+def test_bulk_stream_reports_a_deadline_missed_mid_stream(monkeypatch):
+    monkeypatch.setattr(api, "_admission", AdmissionController(max_concurrency=1))
+
+    def lines():
+        yield '{"index": 0}\n'
+        raise DeadlineExceeded("Request deadline exceeded.")
+
+    streamed = list(api._until_deadline(lines(), None))
+
+    assert [json.loads(line) for line in streamed] == [
+        {"index": 0},
+        {"detail": "Request deadline exceeded before the work finished."},
+    ]
+    assert api._admission.stats()["shed"]["deadline_exceeded"] == 1
@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from bp_gen import api
+from bp_gen.api import app
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+
+client = TestClient(app)
+
+
+def load_example_request() -> dict:
+    return json.loads((SAMPLES / "example_input.json").read_text())
+
+
+def test_generate_plans_accepts_json_array():
+    payload = [load_example_request(), {"business_context": {}, "allowed_relationships": []}]
+
+    response = client.post("/generate-plans", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [(record["index"], record["status"]) for record in records] == [
+        (0, "plan"),
+        (1, "clarifying_questions"),
+    ]
+
+
+def test_generate_plans_accepts_ndjson_and_reports_invalid_items():
+    body = "\n".join([json.dumps(load_example_request()), json.dumps({"flags": {}})])
+
+    response = client.post(
+        "/generate-plans",
+        content=body,
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[0]["status"] == "plan"
+    assert records[1]["status"] == "errors"
+    assert records[1]["result"]["errors"][0]["code"] == "invalid_request"
+
+
+def test_generate_plans_enforces_batch_cap(monkeypatch):
+    monkeypatch.setattr(api, "MAX_BATCH_SIZE", 1)
+
+    response = client.post("/generate-plans", json=[load_example_request()] * 2)
+
+    assert response.status_code == 413
+
+
+def test_split_batch_body():
+    plans = [{"a": 1}, {"b": [2]}]
+
+    assert api._split_batch_body(json.dumps(plans), "application/json") == [
+        json.dumps(plan) for plan in plans
+    ]
+    assert api._split_batch_body('  [{"a": 1}]', None) == ['{"a": 1}']
+    # NDJSON keeps malformed lines for per-item errors and drops blank ones.
+    ndjson = '{"a": 1}\n\n  \n{oops\n'
+    assert api._split_batch_body(ndjson, "application/x-ndjson") == ['{"a": 1}', "{oops"]
+    assert api._split_batch_body(ndjson, None) == ['{"a": 1}', "{oops"]
+    with pytest.raises(ValueError):
+        api._split_batch_body("[{", "application/json")
+
+
+def test_generate_plans_reports_malformed_ndjson_lines():
+    body = "\n".join([json.dumps(load_example_request()), "{oops", ""])
+
+    response = client.post(
+        "/generate-plans",
+        content=body,
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["status"] for record in records] == ["plan", "errors"]
+    assert records[1]["result"]["errors"][0]["code"] == "invalid_request"
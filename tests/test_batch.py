@@ -0,0 +1,58 @@
+import io
+import json
+from pathlib import Path
+
+from bp_gen.services.batch import iter_payloads, run_batch
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+
+
+def write_jsonl(path: Path) -> None:
+    valid = json.loads((SAMPLES / "example_input.json").read_text())
+    missing_context = {
+        "business_context": {"scope": "North America"},
+        "allowed_relationships": ["objective_to_kpi"],
+    }
+    lines = [json.dumps(valid), json.dumps(missing_context), "{\"not\": \"a request\"}"]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_run_batch_inline_reports_status_per_record(tmp_path):
+    input_path = tmp_path / "requests.jsonl"
+    write_jsonl(input_path)
+
+    output = io.StringIO()
+    summary = run_batch(iter_payloads(input_path), output, workers=1)
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [record["status"] for record in records] == [
+        "plan",
+        "clarifying_questions",
+        "errors",
+    ]
+    assert records[0]["source"] == "requests.jsonl:1"
+    assert records[2]["result"]["errors"][0]["code"] == "invalid_request"
+    assert summary.total == 3
+    assert summary.counts == {"plan": 1, "clarifying_questions": 1, "errors": 1}
+
+
+def test_run_batch_process_pool_matches_inline(tmp_path):
+    input_path = tmp_path / "requests.jsonl"
+    write_jsonl(input_path)
+
+    inline = io.StringIO()
+    run_batch(iter_payloads(input_path), inline, workers=1)
+    pooled = io.StringIO()
+    run_batch(iter_payloads(input_path), pooled, workers=2)
+
+    def by_source(text: str) -> dict:
+        records = (json.loads(line) for line in text.splitlines())
+        return {record["source"]: record for record in records}
+
+    assert by_source(pooled.getvalue()) == by_source(inline.getvalue())
+
+
+def test_iter_payloads_reads_directory(tmp_path):
+    (tmp_path / "b.json").write_text("{}")
+    (tmp_path / "a.json").write_text("{}")
+    assert [source for source, _ in iter_payloads(tmp_path)] == ["a.json", "b.json"]
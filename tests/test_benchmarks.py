@@ -0,0 +1,50 @@
+import pytest
+
+from benchmarks.runner import compare, format_results, run_suite
+from benchmarks.synthetic import ALL_FLAGS, synthetic_plan
+from bp_gen.validator import validate_business_plan
+
+
+def test_synthetic_plan_is_valid():
+    plan = synthetic_plan(5)
+
+    assert len(plan.kpis) == 5
+    assert validate_business_plan(plan, ALL_FLAGS)["ok"] is True
+
+
+def test_run_suite_and_compare_against_baseline():
+    document = run_suite(sizes=[2], repeat=1)
+
+    names = {result["name"] for result in document["results"]}
+    assert {"generate_plan", "api_generate_plan", "validate", "model_dump", "stream_json"} <= names
+    stream = next(result for result in document["results"] if result["name"] == "stream_json")
+    assert stream["ttfb_seconds"] > 0
+    retained = next(result for result in document["results"] if result["name"] == "retain_plans")
+    assert retained["retained_bytes"] > 0
+    assert compare(document, document, threshold=0.0) == []
+
+    slower = {
+        "results": [
+            {**result, "seconds_min": result["seconds_min"] * 2} for result in document["results"]
+        ]
+    }
+    regressions = compare(slower, document, threshold=0.5)
+    assert {regression["metric"] for regression in regressions} == {"seconds_min"}
+
+
+def test_parallel_validation_stages_report_speedup(monkeypatch):
+    monkeypatch.setattr("benchmarks.runner.PARALLEL_MIN_ITEMS", 0)
+    monkeypatch.setattr("benchmarks.runner.PARALLEL_WORKERS", (2,))
+    monkeypatch.setattr("bp_gen.parallel_validator.PARALLEL_MIN_ITEMS", 0)
+    monkeypatch.setattr(
+        "bp_gen.parallel_validator.validate_business_plan",
+        lambda *args, **kwargs: pytest.fail("validated serially"),
+    )
+
+    document = run_suite(
+        sizes=[4], repeat=1, include_api=False, stages=["validate", "validate_parallel_2"]
+    )
+
+    parallel = next(r for r in document["results"] if r["name"] == "validate_parallel_2")
+    assert parallel["speedup"] > 0
+    assert "validate_parallel_2[4]" in format_results(document)
@@ -60,3 +60,38 @@ def test_outputs_disabled_with_outputs_present():
     result = validate_business_plan(plan, flags)
     assert result["ok"] is False
     assert any(error["code"] == "outputs_disabled" for error in result["errors"])
+
+
+def test_max_errors_caps_retained_errors_but_counts_all():
+    plan = load_golden_plan()
+    for kpi in plan.kpis:
+        kpi.objective_id = "missing-objective"
+    plan.kpis = plan.kpis * 10
+    flags = GenerationFlags(
+        include_initiatives=True,
+        include_capabilities=True,
+        include_outputs=True,
+    )
+
+    full = validate_business_plan(plan, flags)
+    capped = validate_business_plan(plan, flags, max_errors=3)
+
+    assert capped["ok"] is False
+    assert capped["truncated"] is True
+    assert capped["errors"] == full["errors"][:3]
+    assert capped["error_summary"] == full["error_summary"]
+    summary = capped["error_summary"]["kpi_unknown_objective"]
+    assert summary["count"] == 10
+    assert summary["sample_paths"][:2] == ["kpis[0].objective_id", "kpis[1].objective_id"]
+
+
+def test_fail_fast_stops_at_first_error():
+    plan = load_golden_plan()
+    plan.kpis[0].objective_id = "missing-objective"
+    flags = GenerationFlags()
+
+    result = validate_business_plan(plan, flags, fail_fast=True)
+
+    assert result["ok"] is False
+    assert [error["code"] for error in result["errors"]] == ["kpi_unknown_objective"]
+    assert "outputs_disabled" not in result["error_summary"]
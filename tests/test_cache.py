@@ -0,0 +1,141 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from bp_gen.schemas import BusinessPlan, GeneratePlanRequest
+from bp_gen.services import cache as cache_module
+from bp_gen.services.cache import PlanCache, generate_plan_cached, request_key
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+
+
+def load_request(**overrides) -> GeneratePlanRequest:
+    payload = json.loads((SAMPLES / "example_input.json").read_text())
+    payload.update(overrides)
+    return GeneratePlanRequest.model_validate(payload)
+
+
+def test_request_key_is_canonical():
+    request = load_request()
+    reordered = GeneratePlanRequest.model_validate(
+        json.loads(json.dumps(request.model_dump(), sort_keys=True))
+    )
+    assert request_key(request) == request_key(reordered)
+    assert request_key(request) != request_key(
+        load_request(allowed_relationships=["objective_to_kpi"])
+    )
+    assert request_key(request) != request_key(load_request(generation_controls=None))
+
+
+def test_hits_return_equal_but_independent_results():
+    cache = PlanCache(max_entries=4)
+    request = load_request()
+
+    first = generate_plan_cached(request, cache=cache)
+    second = generate_plan_cached(request, cache=cache)
+
+    assert isinstance(second, BusinessPlan)
+    assert second == first
+    assert second is not first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_and_bypass():
+    cache = PlanCache(max_entries=1)
+    generate_plan_cached(load_request(), cache=cache)
+    generate_plan_cached(load_request(constraints=["Other"]), cache=cache)
+    generate_plan_cached(load_request(), cache=cache, bypass=True)
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["hits"] == 0
+
+
+def test_ttl_expiry():
+    cache = PlanCache(ttl_seconds=0)
+    generate_plan_cached(load_request(), cache=cache)
+    generate_plan_cached(load_request(), cache=cache)
+
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["misses"] == 2
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    request = load_request()
+    expected = generate_plan_cached(request, cache=PlanCache(path=path))
+
+    restarted = PlanCache(path=path)
+    assert restarted.get(request_key(request)) == expected
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_generator_version_bump_misses_both_tiers(tmp_path, monkeypatch):
+    path = tmp_path / "cache.sqlite"
+    request = load_request()
+    cache = PlanCache(path=path)
+    generate_plan_cached(request, cache=cache)
+    old_key = request_key(request)
+
+    monkeypatch.setattr("bp_gen.services.cache.GENERATOR_VERSION", "next")
+    key = request_key(request)
+
+    assert key != old_key
+    assert cache.get(key) is None
+    assert PlanCache(path=path).get(key) is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_memory_hits_do_not_wait_for_the_disk_tier(tmp_path):
+    cache = PlanCache(path=tmp_path / "cache.sqlite")
+    request = load_request()
+    generate_plan_cached(request, cache=cache)
+    results = []
+
+    with cache._disk_lock:
+        thread = threading.Thread(target=lambda: results.append(cache.get(request_key(request))))
+        thread.start()
+        thread.join(5)
+
+    assert results and results[0] is not None
+
+
+def test_disk_hits_keep_their_original_expiry(tmp_path, monkeypatch):
+    path = tmp_path / "cache.sqlite"
+    request = load_request()
+    key = request_key(request)
+    generate_plan_cached(request, cache=PlanCache(path=path))
+    now = time.time()
+    monkeypatch.setattr(cache_module.time, "time", lambda: now + 40)
+    cache = PlanCache(ttl_seconds=60, path=path)
+    assert cache.get(key) is not None
+
+    monkeypatch.setattr(cache_module.time, "time", lambda: now + 70)
+
+    assert cache.get(key) is None
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_purges_expired_and_least_recently_used_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "DISK_PURGE_INTERVAL", 0.0)
+    path = tmp_path / "cache.sqlite"
+    cache = PlanCache(max_entries=0, path=path, max_disk_entries=2)
+    keys = [request_key(load_request(constraints=[str(i)])) for i in range(3)]
+    result = generate_plan_cached(load_request(), cache=PlanCache(max_entries=0))
+    cache.set(keys[0], result)
+    cache.set(keys[1], result)
+    assert cache.get(keys[0]) is not None
+    cache.set(keys[2], result)
+
+    with sqlite3.connect(path) as connection:
+        stored = {row[0] for row in connection.execute("SELECT key FROM plan_cache")}
+    assert stored == {keys[0], keys[2]}
+
+    expiring = PlanCache(max_entries=0, ttl_seconds=0, path=path)
+    expiring.set(keys[1], result)
+    with sqlite3.connect(path) as connection:
+        (count,) = connection.execute("SELECT COUNT(*) FROM plan_cache").fetchone()
+    assert count <= 1
@@ -0,0 +1,137 @@
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from bp_gen import instrumentation, schemas
+from bp_gen import worker
+from bp_gen.worker import _apply_env, call_worker
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+SRC = Path(__file__).parent.parent / "src"
+
+# Importing the CLI and building its parser must stay cheap: pydantic and the
+# generator are only imported by the subcommands that need them. This is
+# checked on the modules imported rather than on wall-clock time, which
+# varies with machine load.
+IMPORTED_MODULES_BUDGET = 25
+FORBIDDEN_MODULES = {"pydantic", "fastapi", "bp_gen.schemas", "bp_gen.services.plan_generator"}
+
+PROBE = """
+import json, sys
+before = set(sys.modules)
+import bp_gen.cli
+bp_gen.cli._build_parser()
+print(json.dumps({"modules": sorted(set(sys.modules) - before)}))
+"""
+
+
+def cli_env(**extra: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    env.pop("BP_GEN_WORKER_SOCKET", None)
+    env.update(extra)
+    return env
+
+
+def test_cli_import_stays_within_budget():
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=cli_env(),
+    )
+    probe = json.loads(completed.stdout)
+
+    assert FORBIDDEN_MODULES.isdisjoint(probe["modules"])
+    assert len(probe["modules"]) <= IMPORTED_MODULES_BUDGET, probe["modules"]
+
+
+def test_call_worker_returns_none_without_listener(tmp_path):
+    assert call_worker(str(tmp_path / "missing.sock"), ["--help"]) is None
+
+
+def test_commands_run_on_warm_worker(tmp_path, monkeypatch):
+    socket_path = tmp_path / "worker.sock"
+    # The worker's own cache setting must lose to the caller's.
+    worker_cache = tmp_path / "worker-cache.sqlite"
+    client_cache = tmp_path / "client-cache.sqlite"
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "bp_gen.cli", "worker", "--socket", str(socket_path)],
+        env=cli_env(BP_GEN_CACHE_PATH=str(worker_cache), BP_GEN_STRICT_MODELS="1"),
+    )
+    try:
+        deadline = time.monotonic() + 20
+        while not socket_path.exists():
+            assert worker.poll() is None, "worker exited early"
+            assert time.monotonic() < deadline, "worker did not start"
+            time.sleep(0.05)
+        assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "bp_gen.cli",
+                "generate-plan",
+                "--input",
+                str(SAMPLES / "example_input.json"),
+                "--output",
+                "out/plan.json",
+                "--verbose",
+            ],
+            capture_output=True,
+            text=True,
+            cwd=tmp_path,
+            env=cli_env(
+                BP_GEN_WORKER_SOCKET=str(socket_path), BP_GEN_CACHE_PATH=str(client_cache)
+            ),
+        )
+
+        assert completed.returncode == 0, completed.stderr
+        assert client_cache.exists()
+        assert not worker_cache.exists()
+        assert "build_nodes" in completed.stderr
+        plan = json.loads((tmp_path / "out" / "plan.json").read_text())
+        assert plan["plan"]["name"] == "Support Efficiency and Experience Plan"
+
+        # A non-None exit code shows the worker, not a local fallback, ran it.
+        monkeypatch.chdir(tmp_path)
+        assert call_worker(str(socket_path), ["--help"]) == 0
+    finally:
+        worker.terminate()
+        worker.wait(timeout=10)
+
+
+def test_worker_replaces_its_environment_with_the_callers(monkeypatch):
+    # Register every variable so monkeypatch restores what _apply_env drops.
+    for name, value in os.environ.items():
+        if name.startswith("BP_GEN_"):
+            monkeypatch.setenv(name, value)
+    monkeypatch.delenv("BP_GEN_TIMINGS", raising=False)
+    monkeypatch.setenv("BP_GEN_CACHE_PATH", "worker-cache.sqlite")
+    monkeypatch.setenv("BP_GEN_WORKER_SOCKET", "worker.sock")
+    monkeypatch.setattr(schemas, "_strict_construction", True)
+    monkeypatch.setattr(instrumentation, "_enabled", False)
+
+    _apply_env({"BP_GEN_TIMINGS": "1"})
+
+    assert "BP_GEN_CACHE_PATH" not in os.environ
+    assert os.environ["BP_GEN_WORKER_SOCKET"] == "worker.sock"
+    assert schemas._strict_construction is False
+    assert instrumentation.timings_enabled() is True
+
+
+def test_worker_refuses_connections_from_other_users(monkeypatch):
+    server = worker._ForkingUnixServer.__new__(worker._ForkingUnixServer)
+    left, right = socket.socketpair(socket.AF_UNIX)
+    with left, right:
+        assert server.verify_request(left, None)
+        if worker._peer_uid(left) is not None:
+            monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+            assert not server.verify_request(left, None)
@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from bp_gen.deadlines import DeadlineExceeded, deadline_scope
+from bp_gen.services.coalescing import AsyncSingleFlight, SingleFlight
+
+
+def run_concurrently(flight, key, compute, callers):
+    results = []
+    errors = []
+
+    def call():
+        try:
+            results.append(flight.do(key, compute))
+        except Exception as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def wait_for_waiters(flight, expected):
+    deadline = time.monotonic() + 5
+    while flight.stats()["waiting"] < expected:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return b"plan"
+
+    threads, results, errors = run_concurrently(flight, "key", compute, callers=5)
+    wait_for_waiters(flight, 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [b"plan"] * 5
+    assert errors == []
+    stats = flight.stats()
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["coalescing_ratio"] == pytest.approx(0.8)
+    assert stats["in_flight"] == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("boom")
+
+    threads, results, errors = run_concurrently(flight, "key", fail, callers=3)
+    wait_for_waiters(flight, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == []
+    assert [str(error) for error in errors] == ["boom"] * 3
+    assert flight.do("key", lambda: b"retry") == b"retry"
+
+
+def test_waiter_gives_up_at_its_own_deadline():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        return b"plan"
+
+    threads, results, errors = run_concurrently(flight, "key", compute, callers=1)
+    with deadline_scope(0.05):
+        with pytest.raises(DeadlineExceeded):
+            flight.do("key", compute)
+    assert flight.stats()["waiting"] == 0
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == [b"plan"]
+
+
+def test_waiters_lead_again_when_the_leader_runs_out_of_time():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            raise DeadlineExceeded("Request deadline exceeded.")
+        return b"plan"
+
+    threads, results, errors = run_concurrently(flight, "key", compute, callers=3)
+    wait_for_waiters(flight, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert [type(error) for error in errors] == [DeadlineExceeded]
+    assert results == [b"plan"] * 2
+    assert 2 <= len(calls) <= 3
+
+
+def test_async_callers_share_one_computation_and_wait_on_their_own_deadline():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return b"plan"
+
+    async def impatient():
+        with deadline_scope(0.01):
+            return await flight.do("key", compute)
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0)
+        results = await asyncio.gather(
+            flight.do("key", compute), impatient(), return_exceptions=True
+        )
+        return [await leader, *results]
+
+    leader, waiter, timed_out = asyncio.run(main())
+
+    assert (leader, waiter) == (b"plan", b"plan")
+    assert isinstance(timed_out, DeadlineExceeded)
+    assert len(calls) == 1
+    assert flight.stats()["waiting"] == 0
+
+
+def test_async_waiters_lead_again_when_the_leader_is_cancelled():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+        return b"plan"
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(main()) == b"plan"
+    assert len(calls) == 2
@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+
+from bp_gen.columnar import UNKNOWN_ROW, UNKNOWN_TYPE_ROW, ColumnarPlan
+from bp_gen.schemas import BusinessPlan, GeneratePlanRequest, GenerationFlags
+from bp_gen.services.plan_generator import generate_columnar_plan, generate_plan
+from bp_gen.validator import validate_business_plan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+ALL_FLAGS = GenerationFlags(
+    include_initiatives=True,
+    include_capabilities=True,
+    include_outputs=True,
+)
+
+
+def load_golden_plan() -> BusinessPlan:
+    return BusinessPlan.model_validate_json((SAMPLES / "golden_plan.json").read_text())
+
+
+def broken_plan() -> BusinessPlan:
+    plan = load_golden_plan()
+    plan.kpis[0].objective_id = "missing-objective"
+    plan.links[0].from_id = "missing-node"
+    plan.links[-1].to_type = "unknown"
+    plan.outputs = None
+    return plan
+
+
+def test_round_trip_is_lossless():
+    plan = broken_plan()
+    columnar = ColumnarPlan.from_business_plan(plan)
+
+    assert columnar.outputs is None
+    assert columnar.to_business_plan().model_dump() == plan.model_dump()
+
+
+def test_repeated_strings_are_stored_once():
+    plan = load_golden_plan()
+    plan.kpis = plan.kpis * 100
+    columnar = ColumnarPlan.from_business_plan(plan)
+
+    assert len(columnar.kpis) == len(plan.kpis)
+    assert len(columnar.pool) < 200
+    assert len(set(columnar.kpis.columns["frequency"])) == 1
+
+
+def test_references_are_resolved_to_rows():
+    columnar = ColumnarPlan.from_business_plan(broken_plan())
+
+    assert columnar.kpis.columns["objective_row"][0] == UNKNOWN_ROW
+    assert columnar.links.columns["from_row"][0] == UNKNOWN_ROW
+    assert columnar.links.columns["to_row"][len(columnar.links) - 1] == UNKNOWN_TYPE_ROW
+
+
+def test_validator_matches_model_validation():
+    plan = broken_plan()
+    columnar = ColumnarPlan.from_business_plan(plan)
+
+    for flags in (ALL_FLAGS, GenerationFlags()):
+        expected = validate_business_plan(plan, flags)
+        assert validate_business_plan(columnar, flags) == expected
+        assert validate_business_plan(columnar, flags, max_errors=2) == validate_business_plan(
+            plan, flags, max_errors=2
+        )
+
+
+def test_save_and_memory_map(tmp_path):
+    plan = broken_plan()
+    ColumnarPlan.from_business_plan(plan).save(tmp_path / "plan")
+
+    loaded = ColumnarPlan.load(tmp_path / "plan")
+
+    assert isinstance(loaded.kpis.columns["id"], memoryview)
+    assert loaded.to_business_plan().model_dump() == plan.model_dump()
+    assert validate_business_plan(loaded, ALL_FLAGS) == validate_business_plan(plan, ALL_FLAGS)
+
+
+def test_generator_builds_columns_directly():
+    payload = json.loads((SAMPLES / "example_input.json").read_text())
+    request = GeneratePlanRequest.model_validate(payload)
+
+    columnar = generate_columnar_plan(request)
+
+    assert isinstance(columnar, ColumnarPlan)
+    assert columnar.to_business_plan().model_dump() == generate_plan(request).model_dump()
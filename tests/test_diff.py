@@ -0,0 +1,113 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from bp_gen.cli import run
+from bp_gen.diff import (
+    CHANGE_ADDED,
+    CHANGE_CHANGED,
+    CHANGE_REMOVED,
+    UNCHANGED,
+    diff_directories,
+    diff_plans,
+)
+from bp_gen.schemas import BusinessPlan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+
+
+def load_data() -> dict:
+    return json.loads((SAMPLES / "golden_plan.json").read_text())
+
+
+def test_identical_and_reordered_plans_have_no_changes():
+    data = load_data()
+    reordered = load_data()
+    reordered["links"].reverse()
+    reordered["assumptions_and_gaps"].reverse()
+
+    assert diff_plans(BusinessPlan.model_validate(data), data).identical
+    assert diff_plans(data, reordered).identical
+
+
+def test_reports_added_removed_and_changed_nodes():
+    before = load_data()
+    after = load_data()
+    kpi_id = after["kpis"][0]["id"]
+    after["kpis"][0]["target"] = "Double it"
+    removed_link = after["links"].pop()
+    after["objectives"].append(dict(after["objectives"][0], id="obj-new"))
+    after["plan"]["horizon"] = "24 months"
+
+    changes = [change.as_dict() for change in diff_plans(before, after).changes]
+
+    assert changes == [
+        {
+            "section": "plan",
+            "key": "plan",
+            "change": CHANGE_CHANGED,
+            "fields": [
+                {"field": "horizon", "before": before["plan"]["horizon"], "after": "24 months"}
+            ],
+        },
+        {"section": "objectives", "key": "obj-new", "change": CHANGE_ADDED},
+        {
+            "section": "kpis",
+            "key": kpi_id,
+            "change": CHANGE_CHANGED,
+            "fields": [
+                {"field": "target", "before": before["kpis"][0]["target"], "after": "Double it"}
+            ],
+        },
+        {
+            "section": "links",
+            "key": [removed_link[name] for name in ("from_type", "from_id", "to_type", "to_id", "type")],
+            "change": CHANGE_REMOVED,
+        },
+    ]
+
+
+def test_missing_and_null_fields_compare_equal():
+    full = BusinessPlan.model_validate(load_data()).model_dump(mode="json")
+    compact = BusinessPlan.model_validate(load_data()).model_dump(mode="json", exclude_none=True)
+
+    assert diff_plans(full, compact).identical
+
+
+def write_plans(directory: Path, plans: dict) -> None:
+    directory.mkdir()
+    for name, data in plans.items():
+        (directory / name).write_text(json.dumps(data))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_diff_directories_pairs_files_by_name(tmp_path, workers):
+    changed = load_data()
+    changed["kpis"][0]["frequency"] = "weekly"
+    write_plans(tmp_path / "before", {"same.json": load_data(), "changed.json": load_data(), "gone.json": {}})
+    write_plans(tmp_path / "after", {"same.json": load_data(), "changed.json": changed, "new.json": {}})
+
+    results = list(diff_directories(tmp_path / "before", tmp_path / "after", workers=workers))
+
+    assert [(name, status) for name, status, _ in results] == [
+        ("changed.json", CHANGE_CHANGED),
+        ("gone.json", CHANGE_REMOVED),
+        ("new.json", CHANGE_ADDED),
+        ("same.json", UNCHANGED),
+    ]
+    assert results[0][2].summary() == {CHANGE_ADDED: 0, CHANGE_REMOVED: 0, CHANGE_CHANGED: 1}
+
+
+def test_cli_diff_exits_nonzero_on_changes(tmp_path, capsys):
+    after = load_data()
+    after["kpis"][0]["frequency"] = "weekly"
+    (tmp_path / "after.json").write_text(json.dumps(after))
+
+    run(["diff", str(SAMPLES / "golden_plan.json"), str(SAMPLES / "golden_plan.json")])
+    assert json.loads(capsys.readouterr().out)["identical"] is True
+
+    with pytest.raises(SystemExit) as excinfo:
+        run(["diff", str(SAMPLES / "golden_plan.json"), str(tmp_path / "after.json")])
+    assert excinfo.value.code == 1
+    assert json.loads(capsys.readouterr().out)["summary"][CHANGE_CHANGED] == 1
@@ -0,0 +1,105 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from bp_gen.api import app
+from bp_gen.deadlines import DeadlineExceeded, deadline_scope
+from bp_gen.instrumentation import StageTimings, activate
+from bp_gen.schemas import GeneratePlanRequest
+from bp_gen.services.executor import (
+    BACKEND_INLINE,
+    BACKEND_PROCESS,
+    BACKEND_THREAD,
+    GenerationExecutor,
+    _generate_in_worker,
+    configure_executor,
+    generate_serialized,
+    shutdown_executor,
+)
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+
+
+def load_request() -> GeneratePlanRequest:
+    return GeneratePlanRequest.model_validate_json((SAMPLES / "example_input.json").read_text())
+
+
+@pytest.fixture(scope="module")
+def process_executor():
+    executor = GenerationExecutor(BACKEND_PROCESS, workers=2)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.parametrize("backend", [BACKEND_INLINE, BACKEND_THREAD])
+def test_in_process_backends_match_direct_generation(backend):
+    executor = GenerationExecutor(backend, workers=2)
+    try:
+        assert executor.run(load_request(), bypass=True) == generate_serialized(load_request())
+    finally:
+        executor.shutdown()
+
+
+def test_process_backend_returns_identical_bytes_and_stage_timings(process_executor):
+    timings = StageTimings()
+    with activate(timings):
+        status, body = process_executor.run(load_request(), bypass=True)
+
+    assert (status, body) == generate_serialized(load_request())
+    names = [name for name, _ in timings.stages]
+    assert names[:3] == ["request_encode", "dispatch", "request_decode"]
+    assert {"build_nodes", "validate", "serialize"} <= set(names)
+
+
+def test_stats_report_load(process_executor):
+    stats = process_executor.stats()
+
+    assert stats["backend"] == BACKEND_PROCESS
+    assert stats["workers"] == 2
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["completed"] >= 1
+    assert stats["busy_seconds"] > 0
+
+
+def test_worker_deadline_counts_time_spent_queued():
+    payload = (SAMPLES / "example_input.json").read_bytes()
+
+    with pytest.raises(DeadlineExceeded):
+        _generate_in_worker(payload, True, False, time.time() - 1)
+
+
+def test_run_gives_up_on_a_busy_pool_at_the_deadline():
+    executor = GenerationExecutor(BACKEND_THREAD, workers=1)
+    try:
+        executor.submit(time.sleep, 0.5)
+        started = time.monotonic()
+        with deadline_scope(0.05), pytest.raises(DeadlineExceeded):
+            executor.run(load_request(), bypass=True)
+        assert time.monotonic() - started < 0.4
+        assert executor.stats()["in_flight"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        GenerationExecutor("gpu")
+
+
+def test_api_uses_configured_backend_and_exports_metrics():
+    configure_executor(BACKEND_THREAD, workers=2)
+    try:
+        client = TestClient(app)
+        response = client.post("/generate-plan", json=json.loads(load_request().model_dump_json()))
+        metrics = client.get("/metrics").text
+    finally:
+        shutdown_executor()
+
+    assert response.status_code == 200
+    assert response.content == generate_serialized(load_request())[1]
+    assert 'bp_gen_executor_workers{backend="thread"} 2' in metrics
+    assert 'bp_gen_executor_queue_depth{backend="thread"} 0' in metrics
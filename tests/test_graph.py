@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+
+from bp_gen.graph import (
+    PlanGraphIndex,
+    find_cycle,
+    reachable_from,
+    strongly_connected_components,
+)
+from bp_gen.models import PlanGraph
+from bp_gen.schemas import BusinessPlan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_golden_plan() -> BusinessPlan:
+    data = json.loads((SAMPLES / "golden_plan.json").read_text())
+    return BusinessPlan.model_validate(data)
+
+
+def test_index_answers_typed_neighbour_lookups():
+    index = PlanGraphIndex.from_business_plan(load_golden_plan())
+
+    assert index.has("objective", "obj-1")
+    assert not index.has("objective", "kpi-1")
+    assert index.get("kpi", "kpi-1").name == "Cost per ticket"
+    assert list(index.successors("objective", "obj-1", "objective_to_kpi")) == [("kpi", "kpi-1")]
+    assert list(index.successors("objective", "obj-1")) == [
+        ("kpi", "kpi-1"),
+        ("initiative", "init-1"),
+    ]
+    assert list(index.predecessors("output", "out-1")) == [("initiative", "init-1")]
+    assert index.degree("initiative", "init-1") == (1, 2)
+    assert index.kpis_by_objective == {"obj-1": ["kpi-1"]}
+    assert list(index.successors("kpi", "kpi-1")) == []
+
+
+def test_index_from_legacy_plan_graph_resolves_endpoint_types():
+    data = json.loads((FIXTURES / "golden_plan.json").read_text())
+    index = PlanGraphIndex.from_plan_graph(PlanGraph.model_validate(data))
+
+    assert list(index.successors("objective", "obj-1", "objective_to_kpi")) == [("kpi", "kpi-1")]
+    assert index.degree("kpi", "kpi-1") == (1, 0)
+
+
+def test_strongly_connected_components_are_iterative():
+    # A single 100k-node ring would overflow a recursive implementation.
+    size = 100_000
+    ring = [[node + 1] for node in range(size - 1)] + [[0]]
+    assert [len(component) for component in strongly_connected_components(ring)] == [size]
+
+    adjacency = [[1], [2], [0, 3], [3], []]
+    components = sorted(sorted(component) for component in strongly_connected_components(adjacency))
+    assert components == [[0, 1, 2], [3], [4]]
+    assert find_cycle(adjacency, [2, 1, 0]) == [0, 1, 2, 0]
+    assert find_cycle(adjacency, [3]) == [3, 3]
+    assert list(reachable_from(adjacency, [3])) == [0, 0, 0, 1, 0]
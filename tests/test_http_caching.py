@@ -0,0 +1,117 @@
+import gzip
+import json
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from bp_gen.api import app
+from bp_gen.http_caching import (
+    accepts_gzip,
+    gzip_body,
+    gzip_chunks,
+    matching_etag,
+    result_etag,
+)
+from bp_gen.schemas import GeneratePlanRequest
+from bp_gen.serialization import result_json
+from bp_gen.services.cache import request_key
+from bp_gen.services.plan_generator import generate_plan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+def payload():
+    return json.loads((SAMPLES / "example_input.json").read_text())
+
+
+def test_etag_is_stable_and_tracks_generator_version(monkeypatch):
+    request = GeneratePlanRequest.model_validate(payload())
+    etag = result_etag(request_key(request))
+
+    assert etag == result_etag(request_key(request))
+    assert etag != result_etag("abd")
+    assert result_etag(request_key(request), "gzip") == etag[:-1] + '-gzip"'
+
+    monkeypatch.setattr("bp_gen.services.cache.GENERATOR_VERSION", "next")
+    assert result_etag(request_key(request)) != etag
+
+
+def test_header_parsing():
+    assert matching_etag('W/"a", "b"', ['"b"', '"a"']) == '"b"'
+    assert matching_etag("*", ['"a"', '"b"']) == '"a"'
+    assert matching_etag('"c"', ['"a"']) is None
+    assert accepts_gzip("gzip, deflate")
+    assert accepts_gzip("br;q=1.0, *;q=0.5")
+    assert not accepts_gzip("gzip;q=0, *")
+    assert not accepts_gzip(None)
+
+
+def test_gzip_output_does_not_depend_on_chunking():
+    body = b'{"plan": "x"}' * 200
+
+    chunked = b"".join(gzip_chunks(body[i : i + 7] for i in range(0, len(body), 7)))
+
+    assert chunked == gzip_body(body)
+    assert gzip.decompress(chunked) == body
+
+
+def test_matching_etag_is_answered_without_generating(monkeypatch):
+    client = TestClient(app)
+    first = client.post("/generate-plan", json=payload(), headers=IDENTITY)
+    etag = first.headers["etag"]
+
+    def unavailable():
+        raise AssertionError("generation should not run")
+
+    monkeypatch.setattr("bp_gen.api.get_executor", unavailable)
+    response = client.post(
+        "/generate-plan", json=payload(), headers={**IDENTITY, "If-None-Match": etag}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    monkeypatch.undo()
+    metrics = client.get("/metrics").text
+    assert 'bp_gen_generate_responses_total{status="not_modified"}' in metrics
+    assert "bp_gen_not_modified_ratio" in metrics
+
+
+def test_changed_request_is_generated_again():
+    client = TestClient(app)
+    first = client.post("/generate-plan", json=payload(), headers=IDENTITY)
+    changed = payload()
+    changed["business_context"]["scope"] = "Europe"
+
+    response = client.post(
+        "/generate-plan", json=changed, headers={**IDENTITY, "If-None-Match": first.headers["etag"]}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+
+
+def test_gzip_responses_match_identity_body():
+    client = TestClient(app)
+    expected = result_json(generate_plan(GeneratePlanRequest.model_validate(payload())))
+    headers = {"Accept-Encoding": "gzip"}
+
+    with client.stream("POST", "/generate-plan", json=payload(), headers=headers) as buffered:
+        buffered_body = b"".join(buffered.iter_raw())
+    with client.stream(
+        "POST", "/generate-plan", params={"stream": True}, json=payload(), headers=headers
+    ) as streamed:
+        streamed_body = b"".join(streamed.iter_raw())
+
+    assert buffered.headers["content-encoding"] == "gzip"
+    assert buffered.headers["vary"] == "Accept-Encoding"
+    assert buffered.headers["etag"].endswith('-gzip"')
+    assert streamed.headers["etag"] == buffered.headers["etag"]
+    assert gzip.decompress(buffered_body) == expected
+    assert streamed_body == buffered_body
+
+    identity = client.post("/generate-plan", json=payload(), headers=IDENTITY)
+    assert "content-encoding" not in identity.headers
+    assert identity.content == expected
+    assert 'bp_gen_response_bytes_count{encoding="gzip"}' in client.get("/metrics").text
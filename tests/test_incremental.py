@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from bp_gen.schemas import GeneratePlanRequest
+from bp_gen.services.incremental import regenerate_plan
+from bp_gen.services.plan_generator import generate_plan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+
+
+def load_payload() -> dict:
+    return json.loads((SAMPLES / "example_input.json").read_text())
+
+
+def edited(**context_changes) -> GeneratePlanRequest:
+    payload = load_payload()
+    payload["business_context"].update(context_changes)
+    return GeneratePlanRequest.model_validate(payload)
+
+
+@pytest.mark.parametrize(
+    "request_after",
+    [
+        edited(success_definition="Cut cost per ticket by 20%."),
+        edited(scope="EMEA customer support operations"),
+        edited(problem_statement="Backlog growth in tier-2 queues."),
+        edited(time_horizon="18 months", plan_name=None),
+        edited(),
+        GeneratePlanRequest.model_validate(
+            {**load_payload(), "allowed_relationships": ["objective_to_initiative"]}
+        ),
+        GeneratePlanRequest.model_validate(
+            {**load_payload(), "flags": {"include_initiatives": False}}
+        ),
+        edited(success_definition=None),
+    ],
+)
+def test_incremental_result_matches_full_regeneration(request_after):
+    request_before = GeneratePlanRequest.model_validate(load_payload())
+    previous = generate_plan(request_before)
+
+    result, _ = regenerate_plan(previous, request_before, request_after)
+
+    assert result.model_dump_json() == generate_plan(request_after).model_dump_json()
+
+
+def test_success_definition_change_touches_objective_two_and_all_targets():
+    request_before = GeneratePlanRequest.model_validate(load_payload())
+    previous = generate_plan(request_before)
+
+    plan, delta = regenerate_plan(
+        previous, request_before, edited(success_definition="Cut cost per ticket by 20%.")
+    )
+
+    assert delta.changed_inputs == ["business_context.success_definition"]
+    assert delta.full_regeneration is False
+    assert delta.objectives == ["obj-2"]
+    assert delta.kpis == [kpi.id for kpi in previous.kpis]
+    assert delta.plan_fields == []
+    assert delta.revalidated is False
+    assert plan.objectives[0] is previous.objectives[0]
+    # Strict construction copies the list itself, so compare the elements.
+    assert all(new is old for new, old in zip(plan.links, previous.links))
+
+
+def test_scope_change_touches_objective_three_and_plan_meta():
+    request_before = GeneratePlanRequest.model_validate(load_payload())
+    previous = generate_plan(request_before)
+
+    _, delta = regenerate_plan(previous, request_before, edited(scope="EMEA"))
+
+    assert delta.objectives == ["obj-3"]
+    assert delta.kpis == ["kpi-3-1", "kpi-3-2"]
+    assert delta.plan_fields == ["scope"]
+
+
+def test_flag_change_falls_back_to_full_regeneration():
+    request_before = GeneratePlanRequest.model_validate(load_payload())
+    request_after = GeneratePlanRequest.model_validate({**load_payload(), "flags": {}})
+
+    _, delta = regenerate_plan(generate_plan(request_before), request_before, request_after)
+
+    assert delta.full_regeneration is True
+    assert delta.changed_inputs == ["flags"]
+
+
+def test_larger_plans_from_generation_controls_regenerate_incrementally():
+    controls = {"max_objectives": "8", "max_kpis_per_objective": "3"}
+    request_before = GeneratePlanRequest.model_validate(
+        {**load_payload(), "generation_controls": controls}
+    )
+    request_after = edited(scope="EMEA")
+    request_after.generation_controls = controls
+
+    plan, delta = regenerate_plan(generate_plan(request_before), request_before, request_after)
+
+    assert delta.full_regeneration is False
+    assert delta.objectives == ["obj-3", "obj-6"]
+    assert plan.model_dump_json() == generate_plan(request_after).model_dump_json()
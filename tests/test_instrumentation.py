@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from bp_gen.api import app
+from bp_gen.instrumentation import collect_timings, enable_timings, stage
+from bp_gen.schemas import GeneratePlanRequest
+from bp_gen.services.plan_generator import generate_plan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+
+
+@pytest.fixture
+def timings_on():
+    enable_timings()
+    yield
+    enable_timings(False)
+
+
+def load_request() -> GeneratePlanRequest:
+    payload = json.loads((SAMPLES / "example_input.json").read_text())
+    return GeneratePlanRequest.model_validate(payload)
+
+
+def test_stages_are_not_recorded_when_disabled():
+    with collect_timings() as timings:
+        with stage("anything"):
+            pass
+    assert timings is None
+
+
+def test_generate_plan_records_each_stage(timings_on):
+    with collect_timings() as timings:
+        generate_plan(load_request())
+
+    assert [name for name, _ in timings.stages] == [
+        "build_nodes",
+        "assemble",
+        "validate",
+    ]
+
+
+def test_server_timing_header_and_metrics(timings_on):
+    client = TestClient(app)
+
+    response = client.post(
+        "/generate-plan",
+        json=load_request().model_dump(),
+        headers={"cache-control": "no-cache"},
+    )
+
+    server_timing = response.headers["server-timing"]
+    for name in ("request_validation", "build_nodes", "validate", "serialize", "respond", "total"):
+        assert f"{name};dur=" in server_timing
+
+    metrics = client.get("/metrics").text
+    assert 'bp_gen_stage_duration_seconds_count{stage="build_nodes",kind="plan"}' in metrics
+    assert 'bp_gen_request_duration_seconds_bucket{kind="plan",le="+Inf"}' in metrics
+    assert "bp_gen_cache_events_total" in metrics
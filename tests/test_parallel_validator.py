@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from benchmarks.synthetic import ALL_FLAGS, synthetic_plan_dict
+from bp_gen.cli import run
+from bp_gen.parallel_validator import fork_available, validate_business_plan_parallel
+from bp_gen.relationships import (
+    RELATIONSHIP_SCHEMA,
+    CompiledRelationships,
+    RelationshipRule,
+    compile_relationships,
+)
+from bp_gen.schemas import BusinessPlan, GenerationFlags
+from bp_gen.validator import validate_business_plan
+
+pytestmark = pytest.mark.skipif(not fork_available(), reason="needs the fork start method")
+
+
+def broken_plan() -> BusinessPlan:
+    data = synthetic_plan_dict(60)
+    for kpi in data["kpis"][::7]:
+        kpi["objective_id"] = "missing-objective"
+    links = data["links"]
+    links[3]["from_id"] = "missing-node"
+    links[10]["to_type"] = "unknown"
+    links[20]["type"] = "not_a_relationship"
+    links[30]["type"] = "initiative_to_output"
+    # Second and third links into the same KPI break objective_to_kpi's max_sources.
+    links.extend([dict(links[0]), dict(links[0], from_id="obj-2")])
+    links.insert(50, dict(links[-1]))
+    data["objectives"].append({"id": "obj-lonely", "title": "Alone", "rationale": "None", "priority": "low"})
+    return BusinessPlan.model_validate(data)
+
+
+def parallel(plan, flags=ALL_FLAGS, **kwargs):
+    return validate_business_plan_parallel(plan, flags, workers=3, min_items=0, **kwargs)
+
+
+@pytest.mark.parametrize("max_errors", [None, 1, 4])
+def test_matches_serial_validator(max_errors):
+    plan = broken_plan()
+    relationships = compile_relationships(list(RELATIONSHIP_SCHEMA))
+    flags = GenerationFlags()
+
+    for kwargs in ({}, {"relationships": relationships, "structure": True}):
+        expected = validate_business_plan(plan, flags, max_errors=max_errors, **kwargs)
+        assert expected["ok"] is False
+        assert parallel(plan, flags, max_errors=max_errors, **kwargs) == expected
+
+
+def test_cardinality_counts_follow_link_order(monkeypatch):
+    # A rule bounding both ends: links over the source limit do not count
+    # against their source node's target limit.
+    rule = RelationshipRule("objective_to_kpi", "objective", "kpi", max_sources=1, max_targets=1)
+    monkeypatch.setitem(RELATIONSHIP_SCHEMA, rule.name, rule)
+    relationships = CompiledRelationships(list(RELATIONSHIP_SCHEMA))
+    plan = broken_plan()
+
+    expected = validate_business_plan(plan, ALL_FLAGS, relationships=relationships)
+    fields = {
+        error["path"].rsplit(".", 1)[1]
+        for error in expected["errors"]
+        if error["code"] == "relationship_cardinality"
+    }
+    assert fields == {"from_id", "to_id"}
+    assert parallel(plan, relationships=relationships) == expected
+
+
+def test_valid_plan_and_serial_fallback():
+    plan = BusinessPlan.model_validate(synthetic_plan_dict(40))
+
+    assert parallel(plan)["ok"] is True
+    assert validate_business_plan_parallel(plan, ALL_FLAGS, workers=4) == validate_business_plan(
+        plan, ALL_FLAGS
+    )
+
+
+def test_cli_validate_with_workers(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr("bp_gen.parallel_validator.PARALLEL_MIN_ITEMS", 0)
+    path = tmp_path / "plan.json"
+    path.write_text(broken_plan().model_dump_json())
+    expected = validate_business_plan(broken_plan(), GenerationFlags())
+
+    def serial_fallback(*args, **kwargs):
+        raise AssertionError("validated serially")
+
+    monkeypatch.setattr("bp_gen.parallel_validator.validate_business_plan", serial_fallback)
+
+    with pytest.raises(SystemExit):
+        run(["validate", "--input", str(path), "--workers", "2"])
+
+    assert json.loads(capsys.readouterr().out) == expected
@@ -1,5 +1,18 @@
-from bp_gen.schemas import BusinessContext, GeneratePlanRequest
-from bp_gen.services.plan_generator import generate_plan
+import json
+from pathlib import Path
+
+import pytest
+
+from bp_gen.schemas import BusinessContext, BusinessPlan, GeneratePlanRequest
+from bp_gen.services.plan_generator import generate_columnar_plan, generate_plan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+
+
+def controlled_request(**controls) -> GeneratePlanRequest:
+    payload = json.loads((SAMPLES / "example_input.json").read_text())
+    payload["generation_controls"] = {name: str(value) for name, value in controls.items()}
+    return GeneratePlanRequest.model_validate(payload)
 
 
 def test_missing_context_returns_clarifying_questions():
@@ -12,3 +25,74 @@ def test_missing_context_returns_clarifying_questions():
 
     assert hasattr(result, "clarifying_questions")
     assert 3 <= len(result.clarifying_questions) <= 7
+
+
+def test_generation_controls_set_objective_and_kpi_counts():
+    plan = generate_plan(controlled_request(max_objectives=7, max_kpis_per_objective=4))
+
+    assert isinstance(plan, BusinessPlan)
+    assert [objective.id for objective in plan.objectives] == [f"obj-{i}" for i in range(1, 8)]
+    assert len(plan.kpis) == len(plan.links) == 28
+    assert plan.kpis[-1].id == "kpi-7-4"
+    assert plan.objectives[3].title == plan.objectives[0].title + " (2)"
+    assert plan.kpis[3].name == plan.kpis[0].name + " (4)"
+
+
+@pytest.mark.parametrize(
+    "ratio, expected",
+    [
+        (None, ["lagging", "leading", "leading", "leading"]),
+        (0.5, ["lagging", "lagging", "leading", "leading"]),
+        (0, ["lagging"] * 4),
+        (1, ["leading"] * 4),
+    ],
+)
+def test_leading_kpi_ratio_sets_the_mix(ratio, expected):
+    controls = {"max_kpis_per_objective": 4}
+    if ratio is not None:
+        controls["leading_kpi_ratio"] = ratio
+
+    plan = generate_plan(controlled_request(**controls))
+
+    mix = [kpi.leading_or_lagging for kpi in plan.kpis if kpi.objective_id == "obj-2"]
+    assert mix == expected
+
+
+@pytest.mark.parametrize(
+    "controls, control",
+    [
+        ({"max_objectives": 0}, "max_objectives"),
+        ({"max_objectives": "many"}, "max_objectives"),
+        ({"max_kpis_per_objective": 101}, "max_kpis_per_objective"),
+        ({"max_objectives": 10_000, "max_kpis_per_objective": 100}, "max_kpis_per_objective"),
+        ({"leading_kpi_ratio": 1.5}, "leading_kpi_ratio"),
+    ],
+)
+def test_invalid_generation_controls_are_reported(controls, control):
+    result = generate_plan(controlled_request(**controls))
+
+    assert result.errors[0]["code"] == "generation_control_invalid"
+    assert result.errors[0]["path"] == f"generation_controls.{control}"
+
+
+def test_columnar_generation_follows_generation_controls():
+    request = controlled_request(max_objectives=5, max_kpis_per_objective=3, leading_kpi_ratio=0.3)
+
+    columnar = generate_columnar_plan(request)
+
+    assert columnar.to_business_plan().model_dump() == generate_plan(request).model_dump()
+
+
+def test_static_content_and_repeated_text_are_shared(monkeypatch):
+    monkeypatch.setattr("bp_gen.schemas._strict_construction", False)
+    first = generate_plan(controlled_request(max_kpis_per_objective=4))
+    second = generate_plan(controlled_request(max_kpis_per_objective=4))
+
+    assert first.assumptions_and_gaps is not second.assumptions_and_gaps
+    assert all(a is b for a, b in zip(first.assumptions_and_gaps, second.assumptions_and_gaps))
+    assert first.plan.themes == second.plan.themes
+    assert all(a is b for a, b in zip(first.plan.themes, second.plan.themes))
+    assert first.links[0].type is second.links[0].type
+    kpis = [kpi for kpi in first.kpis if kpi.objective_id == "obj-1"]
+    assert all(kpi.target is first.kpis[-1].target for kpi in kpis)
+    assert kpis[1].definition is kpis[3].definition
@@ -0,0 +1,150 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from bp_gen.api import app
+from bp_gen.schemas import BusinessPlan, GeneratePlanRequest
+from bp_gen.services.batch import iter_payloads, run_batch
+from bp_gen.services.cache import request_key
+from bp_gen.services.plan_generator import generate_plan
+from bp_gen.services.plan_store import PlanFilter, PlanStore, configure_plan_store
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+
+
+def load_plan() -> BusinessPlan:
+    return BusinessPlan.model_validate_json((SAMPLES / "golden_plan.json").read_text())
+
+
+def variant(plan: BusinessPlan, scope: str, horizon: str, kind: str) -> BusinessPlan:
+    data = plan.model_dump()
+    data["plan"].update(scope=scope, horizon=horizon)
+    for kpi in data["kpis"]:
+        kpi["leading_or_lagging"] = kind
+    return BusinessPlan.model_validate(data)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PlanStore(tmp_path / "plans.sqlite")
+    yield store
+    store.close()
+
+
+def test_round_trip_preserves_plan(store):
+    plan = load_plan()
+    plan_id = store.add(plan, request_hash="abc")
+
+    assert store.get(plan_id) == plan
+    assert store.get(plan_id + 1) is None
+    assert [summary.request_hash for summary in store.query()] == ["abc"]
+
+
+def test_query_filters_on_indexed_columns_and_resumes(store):
+    plan = load_plan()
+    ids = store.add_many(
+        [
+            (variant(plan, "EMEA", "12 months", "lagging"), None),
+            (variant(plan, "EMEA", "24 months", "leading"), None),
+            (variant(plan, "APAC", "12 months", "leading"), None),
+            (variant(plan, "EMEA", "12 months", "leading"), None),
+        ],
+        batch_size=3,
+    )
+
+    emea_12 = PlanFilter(scope="EMEA", horizon="12 months")
+    assert [s.plan_id for s in store.query(emea_12)] == [ids[0], ids[3]]
+    assert [s.plan_id for s in store.query(emea_12, after=ids[0])] == [ids[3]]
+    leading = PlanFilter(leading_or_lagging="leading")
+    assert [s.plan_id for s in store.query(leading, page_size=1)] == ids[1:]
+    assert [s.plan_id for s in store.query(leading, limit=2, page_size=1)] == ids[1:3]
+    assert store.count(PlanFilter(scope="EMEA")) == 3
+    assert [plan_id for _, plan_id, _ in store.query_kpis(leading)] == [
+        plan_id for plan_id in ids[1:] for _ in plan.kpis
+    ]
+
+
+def test_delete_cascades_to_nodes(store):
+    plan_id = store.add(load_plan())
+
+    assert store.delete(plan_id)
+    assert store.get(plan_id) is None
+    assert list(store.query_kpis()) == []
+    # Deleted IDs are not reused, so old cursors never skip new plans.
+    assert store.add(load_plan()) > plan_id
+
+
+def test_kpi_cursor_resumes_after_the_newest_plan_is_deleted(store):
+    plan = load_plan()
+    store.add(plan)
+    newest = store.add(plan)
+    cursor = max(cursor for cursor, _, _ in store.query_kpis())
+    store.delete(newest)
+
+    replacement = store.add(plan)
+
+    assert [plan_id for _, plan_id, _ in store.query_kpis(after=cursor)] == [
+        replacement for _ in plan.kpis
+    ]
+
+
+def test_request_hash_is_stored_once(store):
+    plan = load_plan()
+    first = store.add(plan, request_hash="abc")
+
+    assert store.add(variant(plan, "EMEA", "12 months", "leading"), request_hash="abc") == first
+    again, second, repeat, unhashed = store.add_many(
+        [(plan, "abc"), (plan, "def"), (plan, "def"), (plan, None)]
+    )
+    assert again == first
+    assert repeat == second != first
+    assert unhashed not in (first, second)
+    assert store.count() == 3
+    assert store.find("def") == second
+    assert store.find("missing") is None
+
+
+def test_batch_cli_inserts_generated_plans(store, tmp_path):
+    payload = (SAMPLES / "example_input.json").read_text()
+    input_path = tmp_path / "requests.jsonl"
+    input_path.write_text(payload.replace("\n", "") + "\n{\"not\": \"a request\"}\n")
+
+    run_batch(iter_payloads(input_path), io.StringIO(), workers=1, store=store)
+
+    request = GeneratePlanRequest.model_validate_json(payload)
+    (summary,) = store.query()
+    assert summary.request_hash == request_key(request)
+    assert store.get(summary.plan_id) == generate_plan(request)
+
+
+def test_api_stores_generated_plans_and_streams_queries(tmp_path):
+    configure_plan_store(tmp_path / "plans.sqlite")
+    try:
+        client = TestClient(app)
+        payload = json.loads((SAMPLES / "example_input.json").read_text())
+        generated = client.post("/generate-plan", json=payload, headers={"Cache-Control": "no-cache"})
+        # Repeats, whether generated again or served from the cache, are not stored twice.
+        client.post("/generate-plan", json=payload, headers={"Cache-Control": "no-cache"})
+        client.post("/generate-plan", json=payload)
+        client.post("/generate-plan", params={"stream": True}, json=payload)
+        scope = payload["business_context"]["scope"]
+
+        listing = client.get("/plans", params={"scope": scope})
+        summaries = [json.loads(line) for line in listing.text.splitlines()]
+        stored = client.get(f"/plans/{summaries[0]['plan_id']}")
+        kpis = client.get("/plans/kpis", params={"scope": scope}).text.splitlines()
+        empty = client.get("/plans", params={"scope": "nowhere"})
+        missing = client.get("/plans/999")
+    finally:
+        configure_plan_store(None)
+
+    assert listing.headers["content-type"] == "application/x-ndjson"
+    assert len(summaries) == 1
+    assert stored.json() == generated.json()
+    assert [json.loads(line)["kpi"] for line in kpis] == generated.json()["kpis"]
+    assert empty.text == ""
+    assert missing.status_code == 404
+    assert client.get("/plans").status_code == 404
@@ -0,0 +1,167 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from bp_gen.api import app
+from bp_gen.cli import run
+from bp_gen.deadlines import DeadlineExceeded, deadline_scope
+from bp_gen.schemas import BusinessPlan, GenerationFlags
+from bp_gen.services.executor import BACKEND_THREAD, configure_executor, shutdown_executor
+from bp_gen.services.plan_validation import (
+    _validate_plan_text_until,
+    validate_plan_text,
+    validate_plans,
+    validate_plans_in_pool,
+)
+from bp_gen.validator import validate_business_plan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+ALL_FLAGS = GenerationFlags(
+    include_initiatives=True,
+    include_capabilities=True,
+    include_outputs=True,
+)
+
+
+def golden_data() -> dict:
+    return json.loads((SAMPLES / "golden_plan.json").read_text())
+
+
+def golden_link_types() -> list:
+    return sorted({link["type"] for link in golden_data()["links"]})
+
+
+def broken_data() -> dict:
+    data = golden_data()
+    data["kpis"][0]["objective_id"] = "missing-objective"
+    data["links"][0]["type"] = "unknown_relationship"
+    return data
+
+
+def test_full_and_codes_only_results_agree():
+    raw = json.dumps(broken_data())
+    allowed = ["objective_to_kpi"]
+
+    full = validate_plan_text(raw, ALL_FLAGS, allowed)
+    codes = validate_plan_text(raw, ALL_FLAGS, allowed, codes_only=True)
+
+    assert full["ok"] is False
+    assert codes == {
+        "ok": False,
+        "error_codes": {code: summary["count"] for code, summary in full["error_summary"].items()},
+    }
+
+
+def test_codes_only_checks_field_types_without_pydantic():
+    data = golden_data()
+    del data["kpis"][0]["target"]
+    data["objectives"][0]["priority"] = 3
+    data["objectives"][0]["owner_role"] = None
+
+    codes = validate_plan_text(json.dumps(data), ALL_FLAGS, codes_only=True)
+    full = validate_plan_text(json.dumps(data), ALL_FLAGS)
+
+    assert codes == {"ok": False, "error_codes": {"schema_invalid": 2}}
+    assert full["error_summary"]["schema_invalid"]["count"] == 2
+
+
+def test_invalid_json_is_reported_per_plan():
+    assert validate_plan_text("{not json", ALL_FLAGS)["errors"][0]["code"] == "invalid_json"
+
+
+def test_api_reports_non_string_keys_and_trailing_data_as_invalid_json():
+    client = TestClient(app)
+    for text in ("{[1]: 2}", json.dumps(golden_data()) + " garbage"):
+        response = client.post("/validate-plan", content=text)
+
+        assert response.status_code == 200
+        assert response.json()["errors"][0]["code"] == "invalid_json"
+
+
+def test_pool_workers_get_the_deadline_and_waits_end_at_it():
+    raw = json.dumps(golden_data())
+    with pytest.raises(DeadlineExceeded):
+        _validate_plan_text_until(time.time() - 1, raw, ALL_FLAGS)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(time.sleep, 0.5)
+        started = time.monotonic()
+        with deadline_scope(0.05), pytest.raises(DeadlineExceeded):
+            list(validate_plans([("0", raw)], ALL_FLAGS, submit=pool.submit))
+        assert time.monotonic() - started < 0.4
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_results_keep_input_order(workers):
+    payloads = [(str(i), json.dumps(golden_data() if i % 2 else broken_data())) for i in range(6)]
+
+    results = list(validate_plans_in_pool(payloads, ALL_FLAGS, workers=workers))
+
+    assert [source for source, _ in results] == [str(i) for i in range(6)]
+    assert [result["ok"] for _, result in results] == [bool(i % 2) for i in range(6)]
+    expected = validate_business_plan(BusinessPlan.model_validate(broken_data()), ALL_FLAGS)
+    assert results[0][1] == expected
+
+
+def test_api_validates_single_plans_and_batches():
+    configure_executor(BACKEND_THREAD, workers=2)
+    try:
+        client = TestClient(app)
+        params = {
+            "include_initiatives": True,
+            "include_capabilities": True,
+            "include_outputs": True,
+        }
+        single = client.post("/validate-plan", params=params, content=json.dumps(golden_data()))
+        batch = client.post(
+            "/validate-plan",
+            params={**params, "codes_only": True, "allowed_relationship": golden_link_types()},
+            json=[broken_data(), golden_data()],
+        )
+        ndjson = client.post(
+            "/validate-plan",
+            params=params,
+            content="\n".join(json.dumps(data) for data in (golden_data(), broken_data())),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+    finally:
+        shutdown_executor()
+
+    assert single.json()["ok"] is True
+    lines = [json.loads(line) for line in batch.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1]
+    assert lines[0]["ok"] is False
+    assert "relationship_not_allowed" in lines[0]["error_codes"]
+    assert lines[1] == {"index": 1, "ok": True, "error_codes": {}}
+    assert [json.loads(line)["ok"] for line in ndjson.text.splitlines()] == [True, False]
+
+
+def test_cli_validates_a_directory_of_plans(tmp_path, capsys):
+    (tmp_path / "a.json").write_text(json.dumps(golden_data()))
+    (tmp_path / "b.json").write_text(json.dumps(broken_data()))
+
+    with pytest.raises(SystemExit) as excinfo:
+        run(
+            [
+                "validate",
+                "--input",
+                str(tmp_path),
+                "--codes-only",
+                "--workers",
+                "1",
+                "--include-initiatives",
+                "--include-capabilities",
+                "--include-outputs",
+            ]
+        )
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert excinfo.value.code == 1
+    assert [(record["source"], record["ok"]) for record in records] == [
+        ("a.json", True),
+        ("b.json", False),
+    ]
@@ -0,0 +1,116 @@
+import io
+import json
+from pathlib import Path
+
+from bp_gen.columnar import ColumnarPlan
+from bp_gen.relationships import compile_relationships
+from bp_gen.schemas import (
+    BusinessPlan,
+    GeneratePlanRequest,
+    GenerationErrorResponse,
+    GenerationFlags,
+    Link,
+)
+from bp_gen.services.plan_generator import generate_plan
+from bp_gen.stream_validator import validate_plan_stream
+from bp_gen.validator import validate_business_plan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+ALL_FLAGS = GenerationFlags(
+    include_initiatives=True,
+    include_capabilities=True,
+    include_outputs=True,
+)
+ALLOWED = [
+    "objective_to_kpi",
+    "objective_to_initiative",
+    "initiative_to_capability",
+    "initiative_to_output",
+]
+
+
+def load_golden_plan() -> BusinessPlan:
+    return BusinessPlan.model_validate_json((SAMPLES / "golden_plan.json").read_text())
+
+
+def codes(result: dict) -> list:
+    return [error["code"] for error in result["errors"]]
+
+
+def test_golden_plan_satisfies_relationship_rules():
+    result = validate_business_plan(
+        load_golden_plan(), ALL_FLAGS, relationships=compile_relationships(ALLOWED)
+    )
+    assert result["ok"] is True
+
+
+def test_disallowed_mistyped_and_over_cardinality_links():
+    plan = load_golden_plan()
+    plan.links[1].type = "objective_to_kpi"  # objective -> initiative
+    # A second objective -> KPI link into kpi-1, then a relationship not allowed.
+    plan.links.append(plan.links[0].model_copy())
+    plan.links.append(
+        Link(
+            from_type="kpi",
+            from_id="kpi-1",
+            to_type="initiative",
+            to_id="init-1",
+            type="kpi_to_initiative",
+        )
+    )
+
+    result = validate_business_plan(plan, ALL_FLAGS, relationships=compile_relationships(ALLOWED))
+
+    assert codes(result) == [
+        "relationship_endpoint_mismatch",
+        "relationship_cardinality",
+        "relationship_not_allowed",
+    ]
+    assert [error["path"] for error in result["errors"]] == [
+        "links[1].type",
+        "links[4].to_id",
+        "links[5].type",
+    ]
+    assert result["errors"][0]["message"] == (
+        "Link type 'objective_to_kpi' must connect objective to kpi, "
+        "found objective to initiative."
+    )
+
+
+def test_custom_relationship_names_are_not_endpoint_checked():
+    plan = load_golden_plan()
+    plan.links[1].type = "objective_sponsors"
+    result = validate_business_plan(
+        plan, ALL_FLAGS, relationships=compile_relationships(ALLOWED + ["objective_sponsors"])
+    )
+    assert result["ok"] is True
+
+
+def test_compiled_tables_are_reused():
+    assert compile_relationships(ALLOWED) is compile_relationships(list(ALLOWED))
+
+
+def test_columnar_and_stream_validation_match():
+    plan = load_golden_plan()
+    plan.links[1].type = "objective_to_kpi"
+    plan.links[2].type = "unknown_relationship"
+    relationships = compile_relationships(ALLOWED)
+    expected = validate_business_plan(plan, ALL_FLAGS, relationships=relationships)
+
+    columnar = ColumnarPlan.from_business_plan(plan)
+    streamed = validate_plan_stream(
+        io.StringIO(plan.model_dump_json()), ALL_FLAGS, relationships=relationships
+    )
+
+    assert validate_business_plan(columnar, ALL_FLAGS, relationships=relationships) == expected
+    assert streamed == expected
+
+
+def test_generator_rejects_requests_without_objective_to_kpi():
+    payload = json.loads((SAMPLES / "example_input.json").read_text())
+    payload["allowed_relationships"] = ["objective_to_initiative"]
+
+    result = generate_plan(GeneratePlanRequest.model_validate(payload))
+
+    assert isinstance(result, GenerationErrorResponse)
+    assert {error["code"] for error in result.errors} == {"relationship_not_allowed"}
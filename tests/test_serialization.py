@@ -0,0 +1,153 @@
+import json
+import os
+import stat
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from benchmarks.synthetic import synthetic_plan
+from bp_gen.api import app
+from bp_gen.cli import run
+from bp_gen.schemas import (
+    BusinessContext,
+    BusinessPlan,
+    ClarifyingQuestions,
+    GeneratePlanRequest,
+    GenerationErrorResponse,
+)
+from bp_gen.serialization import (
+    iter_result_json,
+    result_json,
+    result_record_line,
+    write_result_json,
+)
+from bp_gen.services.plan_generator import generate_plan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+
+RESPONSE_ADAPTER = TypeAdapter(BusinessPlan | ClarifyingQuestions | GenerationErrorResponse)
+
+
+@pytest.fixture
+def strict_models(monkeypatch):
+    # monkeypatch restores the session's setting (e.g. BP_GEN_STRICT_MODELS=1).
+    monkeypatch.setattr("bp_gen.schemas._strict_construction", True)
+
+
+def requests():
+    payload = json.loads((SAMPLES / "example_input.json").read_text())
+    return [
+        GeneratePlanRequest.model_validate(payload),
+        GeneratePlanRequest(
+            business_context=BusinessContext(scope="North America"),
+            allowed_relationships=["objective_to_kpi"],
+        ),
+    ]
+
+
+@pytest.mark.parametrize("request_index", [0, 1])
+def test_trusted_construction_matches_full_validation(strict_models, monkeypatch, request_index):
+    request = requests()[request_index]
+
+    validated = generate_plan(request)
+    monkeypatch.setattr("bp_gen.schemas._strict_construction", False)
+    trusted = generate_plan(request)
+
+    assert result_json(trusted) == result_json(validated)
+    revalidated = RESPONSE_ADAPTER.validate_python(trusted.model_dump())
+    assert RESPONSE_ADAPTER.dump_json(revalidated, exclude_none=True) == result_json(trusted)
+
+
+def test_api_fast_path_matches_response_model_serialization():
+    request = requests()[0]
+    client = TestClient(app)
+
+    response = client.post("/generate-plan", json=request.model_dump())
+
+    expected = RESPONSE_ADAPTER.validate_python(generate_plan(request).model_dump())
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == json.loads(RESPONSE_ADAPTER.dump_json(expected, exclude_none=True))
+
+
+def test_result_record_line_embeds_serialized_result():
+    result = ClarifyingQuestions(clarifying_questions=["Why?"])
+
+    line = result_record_line({"index": 3}, result)
+
+    assert json.loads(line) == {"index": 3, "result": {"clarifying_questions": ["Why?"]}}
+
+
+@pytest.mark.parametrize("size", [1, 600])
+def test_streamed_json_matches_whole_document_serialization(size):
+    plan = synthetic_plan(size)
+
+    compact = b"".join(iter_result_json(plan, chunk_size=1024))
+    indented = b"".join(iter_result_json(plan, indent=2, chunk_size=1024))
+
+    assert compact == result_json(plan)
+    assert indented.decode() == json.dumps(plan.model_dump(exclude_none=True), indent=2)
+
+
+def test_write_result_json_replaces_the_file_atomically(tmp_path):
+    path = tmp_path / "plan.json"
+    path.write_text("old")
+    path.chmod(0o640)
+    new_path = tmp_path / "new.json"
+    umask = os.umask(0o022)
+    try:
+        write_result_json(synthetic_plan(3), path, indent=2)
+        write_result_json(synthetic_plan(3), new_path)
+    finally:
+        os.umask(umask)
+
+    assert json.loads(path.read_text())["kpis"][0]["id"] == synthetic_plan(3).kpis[0].id
+    assert sorted(os.listdir(tmp_path)) == ["new.json", "plan.json"]
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+    assert stat.S_IMODE(new_path.stat().st_mode) == 0o644
+
+
+def test_failed_write_leaves_previous_file_in_place(tmp_path, monkeypatch):
+    path = tmp_path / "plan.json"
+    path.write_text("old")
+
+    def broken(*args, **kwargs):
+        yield b"{"
+        raise RuntimeError("serializer failed")
+
+    monkeypatch.setattr("bp_gen.serialization.iter_result_json", broken)
+    with pytest.raises(RuntimeError):
+        write_result_json(synthetic_plan(3), path)
+
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["plan.json"]
+
+
+def test_cli_writes_compact_plan(tmp_path):
+    output = tmp_path / "plan.json"
+
+    run(
+        [
+            "generate-plan",
+            "--input",
+            str(SAMPLES / "example_input.json"),
+            "--output",
+            str(output),
+            "--compact",
+        ]
+    )
+
+    assert output.read_bytes() == result_json(generate_plan(requests()[0]))
+
+
+def test_api_streamed_plan_matches_buffered_response():
+    request = requests()[0]
+    client = TestClient(app)
+
+    buffered = client.post("/generate-plan", json=request.model_dump())
+    streamed = client.post("/generate-plan", params={"stream": True}, json=request.model_dump())
+
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"] == "application/json"
+    assert streamed.content == buffered.content
@@ -0,0 +1,108 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from bp_gen.cli import run
+from bp_gen.schemas import BusinessPlan, GenerationFlags
+from bp_gen.stream_validator import validate_plan_stream
+from bp_gen.validator import validate_business_plan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+ALL_FLAGS = GenerationFlags(
+    include_initiatives=True,
+    include_capabilities=True,
+    include_outputs=True,
+)
+
+
+def golden_data() -> dict:
+    return json.loads((SAMPLES / "golden_plan.json").read_text())
+
+
+def stream(data: dict, flags: GenerationFlags = ALL_FLAGS, **kwargs) -> dict:
+    # A tiny chunk size exercises values that straddle buffer boundaries.
+    return validate_plan_stream(io.StringIO(json.dumps(data)), flags, chunk_size=7, **kwargs)
+
+
+def serial(data: dict, flags: GenerationFlags = ALL_FLAGS, **kwargs) -> dict:
+    return validate_business_plan(BusinessPlan.model_validate(data), flags, **kwargs)
+
+
+def broken_plan() -> dict:
+    data = golden_data()
+    data["kpis"] = [
+        dict(kpi, id=f"{kpi['id']}-{copy}") for copy in range(4) for kpi in data["kpis"]
+    ]
+    for kpi in data["kpis"][::3]:
+        kpi["objective_id"] = "missing-objective"
+    data["links"][0]["from_id"] = "missing-node"
+    data["links"][-1]["to_type"] = "unknown"
+    return data
+
+
+def test_golden_plan_is_valid():
+    assert stream(golden_data()) == serial(golden_data())
+    assert stream(golden_data())["ok"] is True
+
+
+def test_matches_serial_validator_on_broken_plan():
+    data = broken_plan()
+    expected = serial(data, GenerationFlags())
+    assert expected["ok"] is False
+    assert stream(data, GenerationFlags()) == expected
+
+
+def test_order_is_independent_of_key_order():
+    data = broken_plan()
+    # Links and KPIs arrive before the sections they reference.
+    reordered = {key: data[key] for key in reversed(list(data))}
+    assert stream(reordered, GenerationFlags()) == serial(data, GenerationFlags())
+
+
+def test_max_errors_matches_serial_truncation():
+    data = broken_plan()
+    reordered = {key: data[key] for key in reversed(list(data))}
+    for max_errors in (1, 3, 5):
+        expected = serial(data, GenerationFlags(), max_errors=max_errors)
+        assert stream(reordered, GenerationFlags(), max_errors=max_errors) == expected
+
+
+def test_schema_errors_are_reported_per_node():
+    data = golden_data()
+    del data["kpis"][0]["name"]
+    data.pop("plan")
+
+    result = stream(data)
+
+    assert result["ok"] is False
+    paths = [error["path"] for error in result["errors"] if error["code"] == "schema_invalid"]
+    assert paths == ["plan", "kpis[0].name"]
+
+
+def test_malformed_json_raises():
+    with pytest.raises(ValueError):
+        validate_plan_stream(io.StringIO('{"objectives": [{"id": '), ALL_FLAGS)
+
+
+@pytest.mark.parametrize("text", ['{[1]: 2}', '{"plan": {}} garbage', '{} {}'])
+def test_non_string_keys_and_trailing_data_raise(text):
+    with pytest.raises(ValueError):
+        validate_plan_stream(io.StringIO(text), ALL_FLAGS)
+
+
+def test_cli_validate_stream(tmp_path, capsys):
+    plan_path = tmp_path / "plan.json"
+    plan_path.write_text(json.dumps(broken_plan()))
+
+    with pytest.raises(SystemExit) as excinfo:
+        run(["validate", "--input", str(plan_path), "--stream", "--max-errors", "2"])
+    streamed = json.loads(capsys.readouterr().out)
+    with pytest.raises(SystemExit):
+        run(["validate", "--input", str(plan_path), "--max-errors", "2"])
+    materialized = json.loads(capsys.readouterr().out)
+
+    assert excinfo.value.code == 1
+    assert streamed == materialized
+    assert len(streamed["errors"]) == 2
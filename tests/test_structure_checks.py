@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+
+from bp_gen.columnar import ColumnarPlan
+from bp_gen.schemas import KPI, BusinessPlan, Capability, GenerationFlags, Initiative, Link, Output
+from bp_gen.validator import validate_business_plan
+
+SAMPLES = Path(__file__).parent.parent / "samples"
+ALL_FLAGS = GenerationFlags(
+    include_initiatives=True,
+    include_capabilities=True,
+    include_outputs=True,
+)
+
+
+def load_golden_plan() -> BusinessPlan:
+    data = json.loads((SAMPLES / "golden_plan.json").read_text())
+    return BusinessPlan.model_validate(data)
+
+
+def link(from_type: str, from_id: str, to_type: str, to_id: str) -> Link:
+    return Link(
+        from_type=from_type,
+        from_id=from_id,
+        to_type=to_type,
+        to_id=to_id,
+        type=f"{from_type}_to_{to_type}",
+    )
+
+
+def tangled_plan() -> BusinessPlan:
+    plan = load_golden_plan()
+    # init-2 <-> cap-2 form a cycle nothing else points into.
+    plan.initiatives.append(Initiative(id="init-2", name="Rework"))
+    plan.capabilities.append(Capability(id="cap-2", name="Tooling"))
+    plan.links.append(link("initiative", "init-2", "capability", "cap-2"))
+    plan.links.append(link("capability", "cap-2", "initiative", "init-2"))
+    # out-2 hangs off a capability that no objective reaches.
+    plan.capabilities.append(Capability(id="cap-3", name="Data platform"))
+    plan.outputs.append(Output(id="out-2", name="Dashboard"))
+    plan.links.append(link("capability", "cap-3", "output", "out-2"))
+    # out-3 has no links at all.
+    plan.outputs.append(Output(id="out-3", name="Runbook"))
+    return plan
+
+
+def test_golden_plan_has_no_structural_findings():
+    result = validate_business_plan(load_golden_plan(), ALL_FLAGS, structure=True)
+    assert result["ok"] is True
+
+
+def test_cycles_orphans_unreachable_and_untraceable_nodes():
+    result = validate_business_plan(tangled_plan(), ALL_FLAGS, structure=True)
+
+    assert [(error["code"], error["path"]) for error in result["errors"]] == [
+        ("graph_cycle", "initiatives[1].id"),
+        ("node_orphan", "outputs[2].id"),
+        ("node_unreachable", "initiatives[1].id"),
+        ("node_unreachable", "capabilities[1].id"),
+        ("node_untraceable", "outputs[1].id"),
+    ]
+    assert result["errors"][0]["message"] == (
+        "Cycle among 2 node(s): initiative 'init-2' -> capability 'cap-2' -> initiative 'init-2'."
+    )
+
+
+def test_kpi_objective_id_counts_as_a_trace():
+    plan = load_golden_plan()
+    plan.links = [item for item in plan.links if item.to_type != "kpi"]
+    plan.kpis.append(KPI.model_validate({**plan.kpis[0].model_dump(), "id": "kpi-2"}))
+
+    result = validate_business_plan(plan, ALL_FLAGS, structure=True)
+
+    assert result["ok"] is True
+
+
+def test_structure_checks_are_off_by_default_and_match_columnar():
+    plan = tangled_plan()
+    assert validate_business_plan(plan, ALL_FLAGS)["ok"] is True
+
+    columnar = ColumnarPlan.from_business_plan(plan)
+    assert validate_business_plan(columnar, ALL_FLAGS, structure=True) == validate_business_plan(
+        plan, ALL_FLAGS, structure=True
+    )